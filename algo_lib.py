@@ -19,12 +19,84 @@ Python 版本：3.10+（3.8+ 也通常没问题）
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
 from collections import deque, defaultdict
-from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import bisect
 import heapq
+import itertools
 import math
+import mmap
+import operator
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+try:  # 可选依赖：仅 *_np 等向量化版本需要
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("this function requires numpy (pip install numpy)")
+
+
+# ---- 简单的 mmap 友好二进制容器（索引类的 save / load 共用）----
+# 布局：magic(8) | 元数据个数 | 数组个数 | 元数据 int64... | 每个数组 (类型码, 长度) | 数组数据（各自 8 字节对齐）
+
+def _save_arrays(path: str, magic: bytes, meta: Sequence[int], arrays: Sequence[Any]) -> None:
+    """把若干 array / bytes / memoryview 连同整数元数据写入 path。"""
+    head = struct.pack("<8sqq", magic, len(meta), len(arrays)) + struct.pack(f"<{len(meta)}q", *meta)
+    blobs: List[bytes] = []
+    for a in arrays:
+        tc = "B" if isinstance(a, (bytes, bytearray)) else _typecode(a)
+        head += struct.pack("<8sq", tc.encode(), len(a))
+        blobs.append(a.tobytes() if not isinstance(a, bytes) else a)
+    with open(path, "wb") as f:
+        for chunk in [head] + blobs:
+            f.write(chunk)
+            f.write(b"\0" * (-len(chunk) % 8))
+
+
+def _load_arrays(path: str, magic: bytes) -> Tuple[mmap.mmap, List[int], List[memoryview]]:
+    """只读 mmap 映射 _save_arrays 写出的文件，返回 (mmap, 元数据, 各数组的 memoryview)，零拷贝。"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    got, n_meta, n_arr = struct.unpack_from("<8sqq", mm, 0)
+    if got != magic:
+        mm.close()
+        raise ValueError(f"{path!r} is not a {magic.rstrip(bytes(1)).decode()} file")
+    pos = 24
+    meta = list(struct.unpack_from(f"<{n_meta}q", mm, pos))
+    pos += 8 * n_meta
+    descs = []
+    for _ in range(n_arr):
+        tc, length = struct.unpack_from("<8sq", mm, pos)
+        descs.append((tc.rstrip(b"\0").decode(), length))
+        pos += 16
+    buf = memoryview(mm)
+    views: List[memoryview] = []
+    for tc, length in descs:
+        nbytes = length * struct.calcsize(tc)
+        views.append(buf[pos:pos + nbytes].cast(tc))
+        pos += nbytes + (-nbytes % 8)
+    buf.release()
+    return mm, meta, views
+
+
+def _close_mapping(mm: Optional[mmap.mmap], views: Iterable[Any]) -> None:
+    """先释放所有 memoryview，再关闭 mmap。"""
+    for view in views:
+        if isinstance(view, memoryview):
+            view.release()
+    if mm is not None:
+        mm.close()
 
 
 # ============================================================
@@ -121,6 +193,185 @@ class DSU:
         return True
 
 
+class ArrayDSU:
+    """
+    array('i') 存储的并查集：每个元素 8 字节（p + sz），list 版约 16 字节 + int 对象。
+    - find: 路径减半；union: 按大小合并
+    - union_many(pairs)：一次调用批量合并，循环内联 find，省去方法调用开销
+    - count / size(x)：O(1) 连通分量数与所在分量大小
+    """
+
+    def __init__(self, n: int):
+        self.p = array("i", range(n))
+        self.sz = array("i", [1]) * n
+        self.count = n
+
+    def find(self, x: int) -> int:
+        p = self.p
+        while p[x] != x:
+            p[x] = p[p[x]]
+            x = p[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        sz = self.sz
+        if sz[ra] < sz[rb]:
+            ra, rb = rb, ra
+        self.p[rb] = ra
+        sz[ra] += sz[rb]
+        self.count -= 1
+        return True
+
+    def union_many(self, pairs: Iterable[Tuple[int, int]]) -> int:
+        """批量合并，返回实际发生合并的次数。pairs 可为 (a, b) 序列或 NumPy (k, 2) 数组。"""
+        if np is not None and isinstance(pairs, np.ndarray):
+            pairs = pairs.tolist()
+        p, sz = self.p, self.sz
+        merged = 0
+        for a, b in pairs:
+            while p[a] != a:
+                p[a] = p[p[a]]
+                a = p[a]
+            while p[b] != b:
+                p[b] = p[p[b]]
+                b = p[b]
+            if a == b:
+                continue
+            if sz[a] < sz[b]:
+                a, b = b, a
+            p[b] = a
+            sz[a] += sz[b]
+            merged += 1
+        self.count -= merged
+        return merged
+
+    def same(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    def size(self, x: int) -> int:
+        """x 所在分量的大小。"""
+        return self.sz[self.find(x)]
+
+    def roots(self) -> array:
+        """每个元素的代表元（顺带完全压缩路径），O(n α(n))。"""
+        find = self.find
+        return array("i", (find(x) for x in range(len(self.p))))
+
+    def component_sizes(self) -> Dict[int, int]:
+        """代表元 -> 分量大小。"""
+        p, sz = self.p, self.sz
+        return {x: sz[x] for x in range(len(p)) if p[x] == x}
+
+
+class RollbackDSU:
+    """
+    可撤销并查集：按大小合并、不做路径压缩（find 为 O(log n)），每次合并压栈，
+    rollback(snapshot) 逆序撤销到快照时刻。
+    用途：离线动态连通性（线段树分治）、回溯搜索中的连通性维护。
+    """
+
+    def __init__(self, n: int):
+        self.p = array("i", range(n))
+        self.sz = array("i", [1]) * n
+        self.count = n
+        self.history: List[int] = []  # 被挂到别处的根；-1 表示该次 union 未合并
+
+    def find(self, x: int) -> int:
+        p = self.p
+        while p[x] != x:
+            x = p[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            self.history.append(-1)
+            return False
+        if self.sz[ra] < self.sz[rb]:
+            ra, rb = rb, ra
+        self.p[rb] = ra
+        self.sz[ra] += self.sz[rb]
+        self.count -= 1
+        self.history.append(rb)
+        return True
+
+    def size(self, x: int) -> int:
+        return self.sz[self.find(x)]
+
+    def snapshot(self) -> int:
+        """当前版本号，供 rollback 使用。"""
+        return len(self.history)
+
+    def rollback(self, snap: int = -1) -> None:
+        """撤销到 snapshot() 返回的版本；缺省只撤销最近一次 union。"""
+        target = len(self.history) - 1 if snap < 0 else snap
+        p, sz = self.p, self.sz
+        while len(self.history) > target:
+            rb = self.history.pop()
+            if rb == -1:
+                continue
+            ra = p[rb]
+            sz[ra] -= sz[rb]
+            p[rb] = rb
+            self.count += 1
+
+
+class WeightedDSU:
+    """
+    带权（势能）并查集：维护 pot(x) 之间的差值约束。
+    - union(a, b, w) 加入约束 pot(b) - pot(a) = w；与已有约束矛盾时返回 False
+    - diff(a, b) 返回 pot(b) - pot(a)，不在同一集合返回 None
+    用途：区间和约束、相对重量 / 汇率一致性校验等。
+    """
+
+    def __init__(self, n: int):
+        self.p = list(range(n))
+        self.sz = [1] * n
+        self.d = [0] * n  # d[x] = pot(x) - pot(p[x])
+        self.count = n
+
+    def find(self, x: int) -> int:
+        p, d = self.p, self.d
+        path = []
+        while p[x] != x:
+            path.append(x)
+            x = p[x]
+        # 自顶向下压缩，使 d 变成到根的势能差
+        for y in reversed(path):
+            if p[y] != x:
+                d[y] += d[p[y]]
+                p[y] = x
+        return x
+
+    def potential(self, x: int) -> int:
+        """pot(x) - pot(root(x))。"""
+        self.find(x)
+        return self.d[x] if self.p[x] != x else 0
+
+    def union(self, a: int, b: int, w: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        pa, pb = self.potential(a), self.potential(b)
+        if ra == rb:
+            return pb - pa == w
+        # 需要 pot(rb) - pot(ra) = w + pa - pb
+        w = w + pa - pb
+        if self.sz[ra] < self.sz[rb]:
+            ra, rb, w = rb, ra, -w
+        self.p[rb] = ra
+        self.d[rb] = w
+        self.sz[ra] += self.sz[rb]
+        self.count -= 1
+        return True
+
+    def diff(self, a: int, b: int) -> Optional[int]:
+        if self.find(a) != self.find(b):
+            return None
+        return self.potential(b) - self.potential(a)
+
+
 # ----------------------------
 # 1.4 Trie（前缀树）
 # ----------------------------
@@ -136,18 +387,24 @@ class Trie:
     """
     前缀树：insert / search / starts_with
     - 插入/查询：O(L)，L 为字符串长度
+    子类可通过 node_cls 换用带额外字段的节点类型（见 AhoCorasick）。
     """
 
+    node_cls = TrieNode
+
     def __init__(self):
-        self.root = TrieNode()
+        self.root = self.node_cls()
 
     def insert(self, w: str) -> None:
+        self._insert(w).end = True
+
+    def _insert(self, w: str) -> TrieNode:
         cur = self.root
         for ch in w:
             if ch not in cur.children:
-                cur.children[ch] = TrieNode()
+                cur.children[ch] = self.node_cls()
             cur = cur.children[ch]
-        cur.end = True
+        return cur
 
     def starts_with(self, p: str) -> bool:
         cur = self.root
@@ -166,6 +423,399 @@ class Trie:
         return cur.end
 
 
+class ACNode(TrieNode):
+    __slots__ = ("fail", "out", "pid")
+
+    def __init__(self):
+        super().__init__()
+        self.fail: Optional[ACNode] = None
+        self.out: Optional[ACNode] = None  # 输出链：沿 fail 最近的一个终止节点
+        self.pid: int = -1                 # 以此结尾的模式串编号
+
+
+class AhoCorasick(Trie):
+    """
+    Aho-Corasick 多模式匹配：在 Trie 上加 fail 链（最长真后缀对应的节点）和输出链。
+    - insert 全部模式后调用 build()（BFS 建 fail 链），O(模式总长 × 平均分支)
+    - finditer / find_all：一次扫描报告所有模式的所有出现，O(|text| + 匹配数)
+    - stream：逐块输入（如邮件正文分块、爬虫分段），状态跨块保留，偏移为全局偏移
+    相比对每个模式调用一次 kmp_search 的 O(模式数 × |text|)，文本只扫一遍。
+    """
+
+    node_cls = ACNode
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        super().__init__()
+        self.patterns: List[str] = []
+        self._built = False
+        for p in patterns:
+            self.insert(p)
+        if self.patterns:
+            self.build()
+
+    def insert(self, w: str) -> None:
+        if w == "":
+            raise ValueError("empty pattern")
+        node = self._insert(w)
+        if not node.end:
+            node.end = True
+            node.pid = len(self.patterns)
+            self.patterns.append(w)
+        self._built = False
+
+    def build(self) -> None:
+        root = self.root
+        root.fail = root
+        q: deque = deque()
+        for child in root.children.values():
+            child.fail = root
+            q.append(child)
+        while q:
+            u = q.popleft()
+            for ch, v in u.children.items():
+                f = u.fail
+                while f is not root and ch not in f.children:
+                    f = f.fail
+                v.fail = f.children[ch] if ch in f.children and f.children[ch] is not v else root
+                v.out = v.fail if v.fail.end else v.fail.out
+                q.append(v)
+        self._built = True
+
+    def _scan(self, text: Iterable[str], state: ACNode, base: int) -> Iterator[Tuple[int, str]]:
+        """产出匹配；生成器的返回值为扫描结束时的状态节点（供 stream 续接）。"""
+        if not self._built:
+            raise RuntimeError("call build() after inserting patterns")
+        root, pats = self.root, self.patterns
+        node = state
+        for i, ch in enumerate(text, base):
+            while node is not root and ch not in node.children:
+                node = node.fail
+            node = node.children.get(ch, root)
+            m = node if node.end else node.out
+            while m is not None:
+                p = pats[m.pid]
+                yield i - len(p) + 1, p
+                m = m.out
+        return node
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """逐个产出 (起始下标, 模式串)，按结束位置递增。"""
+        return self._scan(text, self.root, 0)
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        return list(self.finditer(text))
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        """
+        流式匹配：chunks 依次为文本的各段，跨段出现的模式也能被报告；
+        产出的起始下标相对于整个流。
+        """
+        node: ACNode = self.root
+        base = 0
+        for chunk in chunks:
+            node = yield from self._scan(chunk, node, base)
+            base += len(chunk)
+
+
+class PackedTrie:
+    """
+    批量构建的压缩前缀树（Radix / Patricia），整棵树放在几个扁平数组里：
+    - 单词按 UTF-8 字节序排序去重后拼成一个 blob（+ 偏移数组）
+    - 每个节点只存 5 个 int32：depth（到该节点为止的前缀长度）、child_start / child_cnt
+      （子节点在节点数组中连续，按首字节有序）、lo / hi（子树对应的排序后单词区间）
+    - 边上的标签不单独存：就是 blob 中 word[lo][父 depth : depth]
+    因为子树 = 一段连续单词区间，前缀计数 O(1)、前缀枚举按字典序直接切片。
+
+    复杂度：构建 O(总字节数 + 节点数·log n)；查询 O(|p| + 分叉数·log 字符集)。
+    save / load：写成单个文件，load 用 mmap 零拷贝映射，自动补全 worker 秒级启动。
+    """
+
+    MAGIC = b"PTRIE1\0\0"
+
+    def __init__(self, blob: Any, word_off: Any, depth: Any, child_start: Any, child_cnt: Any, lo: Any, hi: Any):
+        self.blob = blob
+        self.word_off = word_off
+        self.depth = depth
+        self.child_start = child_start
+        self.child_cnt = child_cnt
+        self.lo = lo
+        self.hi = hi
+        self._mm: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, words: Iterable[str]) -> "PackedTrie":
+        """从单词表批量构建（无需预先排序，内部会排序去重）。"""
+        ws = sorted({w.encode("utf-8") for w in words})
+        word_off = array("q", [0])
+        for w in ws:
+            word_off.append(word_off[-1] + len(w))
+        depth, child_start, child_cnt, lo, hi = (array("i") for _ in range(5))
+        depth.append(0)
+        lo.append(0)
+        hi.append(len(ws))
+        i = 0
+        while i < len(depth):  # BFS：同一节点的子节点在数组中连续
+            d, a, b = depth[i], lo[i], hi[i]
+            if a < b and len(ws[a]) == d:
+                a += 1  # 恰好以该节点结尾的单词排在区间最前面
+            child_start.append(len(depth))
+            cnt = 0
+            while a < b:
+                byte = ws[a][d]
+                prefix = ws[a][:d]
+                e = b if byte == 255 else bisect.bisect_left(ws, prefix + bytes((byte + 1,)), a, b)
+                first, last = ws[a], ws[e - 1]
+                cd = d + 1
+                lim = min(len(first), len(last))
+                while cd < lim and first[cd] == last[cd]:
+                    cd += 1
+                depth.append(cd)
+                lo.append(a)
+                hi.append(e)
+                cnt += 1
+                a = e
+            child_cnt.append(cnt)
+            i += 1
+        return cls(b"".join(ws), word_off, depth, child_start, child_cnt, lo, hi)
+
+    def __len__(self) -> int:
+        return len(self.word_off) - 1
+
+    def _word(self, i: int) -> bytes:
+        return bytes(self.blob[self.word_off[i]:self.word_off[i + 1]])
+
+    def _child(self, node: int, d: int, byte: int) -> int:
+        """node 的子节点中第 d 个字节为 byte 的那个；没有返回 -1。"""
+        blob, off, lo = self.blob, self.word_off, self.lo
+        a = self.child_start[node]
+        b = a + self.child_cnt[node]
+        while a < b:
+            mid = (a + b) // 2
+            x = blob[off[lo[mid]] + d]
+            if x < byte:
+                a = mid + 1
+            elif x > byte:
+                b = mid
+            else:
+                return mid
+        return -1
+
+    def _locate(self, p: bytes) -> int:
+        """子树恰好是所有以 p 为前缀的单词的节点；不存在返回 -1。"""
+        node, d = 0, 0
+        while d < len(p):
+            child = self._child(node, d, p[d])
+            if child < 0:
+                return -1
+            cd = self.depth[child]
+            k = min(cd, len(p))
+            start = self.word_off[self.lo[child]]
+            if self.blob[start + d:start + k] != p[d:k]:
+                return -1
+            node, d = child, cd
+        return node
+
+    def __contains__(self, w: str) -> bool:
+        p = w.encode("utf-8")
+        node = self._locate(p)
+        return node >= 0 and self.lo[node] < self.hi[node] and self._word(self.lo[node]) == p
+
+    def count_prefix(self, p: str) -> int:
+        """以 p 为前缀的单词数，O(|p|)。"""
+        node = self._locate(p.encode("utf-8"))
+        return 0 if node < 0 else self.hi[node] - self.lo[node]
+
+    def starts_with(self, p: str) -> bool:
+        return self.count_prefix(p) > 0
+
+    def complete(self, p: str, limit: Optional[int] = None) -> List[str]:
+        """按字典序枚举以 p 为前缀的单词，最多 limit 个。"""
+        node = self._locate(p.encode("utf-8"))
+        if node < 0:
+            return []
+        a, b = self.lo[node], self.hi[node]
+        if limit is not None:
+            b = min(b, a + limit)
+        return [self._word(i).decode("utf-8") for i in range(a, b)]
+
+    def longest_prefix(self, s: str) -> Optional[str]:
+        """s 的最长的、恰好在词表中的前缀；没有返回 None。"""
+        p = s.encode("utf-8")
+        off, lo = self.word_off, self.lo
+        node, d, best = 0, 0, -1
+        while True:
+            w = lo[node]
+            if w < self.hi[node] and off[w + 1] - off[w] == d:
+                best = d
+            if d == len(p):
+                break
+            child = self._child(node, d, p[d])
+            if child < 0:
+                break
+            cd = self.depth[child]
+            start = off[lo[child]]
+            if cd > len(p) or self.blob[start + d:start + cd] != p[d:cd]:
+                break
+            node, d = child, cd
+        return p[:best].decode("utf-8") if best >= 0 else None
+
+    def nbytes(self) -> int:
+        """blob 与各数组占用的字节数。"""
+        return len(self.blob) + sum(len(x) * x.itemsize for x in
+                                    (self.word_off, self.depth, self.child_start, self.child_cnt, self.lo, self.hi))
+
+    def save(self, path: str) -> None:
+        _save_arrays(path, self.MAGIC, [], [bytes(self.blob), self.word_off, self.depth,
+                                            self.child_start, self.child_cnt, self.lo, self.hi])
+
+    @classmethod
+    def load(cls, path: str) -> "PackedTrie":
+        """mmap 只读映射；用完可调用 close()。"""
+        mm, _, views = _load_arrays(path, cls.MAGIC)
+        tr = cls(*views)
+        tr._mm = mm
+        return tr
+
+    def close(self) -> None:
+        if self._mm is not None:
+            _close_mapping(self._mm, (self.blob, self.word_off, self.depth, self.child_start,
+                                      self.child_cnt, self.lo, self.hi))
+            self._mm = None
+
+
+# ----------------------------
+# 1.5 CSR 图（压缩稀疏行）
+# ----------------------------
+class CSRGraph:
+    """
+    压缩稀疏行（CSR）有向图：节点为 0..n-1 的整数。
+    - offsets[u] : offsets[u+1] 是 u 的出边在 targets/weights 中的区间
+    - targets / weights 为 array 连续存储，每条边 8 字节，而 dict-of-lists 每条边
+      需要一个 tuple + 若干 int 对象（约 100 字节）
+    - 构建 O(V+E)（按起点计数排序），遍历邻居是切片而非 dict 查找
+
+    用途：
+    - 百万级边的静态图（路网、依赖图），dijkstra / bfs / dfs / topo_sort /
+      bellman_ford 均可直接接受 CSRGraph
+    注意：无权图 weights 为 None；若权重含浮点数则用 array('d')。
+    """
+
+    __slots__ = ("n", "offsets", "targets", "weights")
+
+    def __init__(self, n: int, offsets: array, targets: array, weights: Optional[array] = None):
+        if len(offsets) != n + 1:
+            raise ValueError("offsets must have length n + 1")
+        if weights is not None and len(weights) != len(targets):
+            raise ValueError("weights and targets must have the same length")
+        self.n = n
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, n: int, edges: Iterable[Sequence[Any]]) -> "CSRGraph":
+        """
+        从边表构建：edges 元素为 (u, v) 或 (u, v, w)，须全部带权或全部不带权（混用抛 ValueError）。
+        两趟扫描（计数 + 填充）；edges 不是 Sequence（如生成器）时先物化成 list。
+        同一起点的边保持输入顺序。
+        """
+        if not isinstance(edges, Sequence):
+            edges = list(edges)
+        m = len(edges)
+        arity = len(edges[0]) if m else 2
+        if arity not in (2, 3):
+            raise ValueError("edges must be (u, v) or (u, v, w)")
+        weighted = arity == 3
+
+        offsets = array("q", bytes(8 * (n + 1)))
+        is_float = False
+        for e in edges:
+            if len(e) != arity:
+                raise ValueError("either all edges or none must carry a weight")
+            offsets[e[0] + 1] += 1
+            if weighted:
+                is_float = is_float or isinstance(e[2], float)
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        pos = offsets[:-1]
+        targets = array("q", bytes(8 * m))
+        weights = array("d" if is_float else "q", bytes(8 * m)) if weighted else None
+        for e in edges:
+            u = e[0]
+            k = pos[u]
+            pos[u] = k + 1
+            targets[k] = e[1]
+            if weights is not None:
+                weights[k] = e[2]
+        return cls(n, offsets, targets, weights)
+
+    @classmethod
+    def from_adj(cls, g: Dict[int, List[Any]], n: Optional[int] = None) -> "CSRGraph":
+        """
+        从现有 dict 邻接表构建：g[u] = [v, ...] 或 g[u] = [(v, w), ...]。
+        节点必须是非负整数；n 缺省时取出现过的最大编号 + 1。
+        """
+        if n is None:
+            n = 0
+            for u, nbrs in g.items():
+                n = max(n, u + 1)
+                for e in nbrs:
+                    n = max(n, (e[0] if isinstance(e, tuple) else e) + 1)
+
+        def gen() -> Iterator[Tuple[Any, ...]]:
+            for u, nbrs in g.items():
+                for e in nbrs:
+                    yield (u,) + e if isinstance(e, tuple) else (u, e)
+
+        return cls.from_edges(n, gen())
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def neighbors(self, u: int) -> array:
+        """u 的出边终点（array 切片）。"""
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def weighted_neighbors(self, u: int) -> Iterator[Tuple[int, Any]]:
+        """u 的出边 (v, w)；无权图 w 视为 1。"""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        if self.weights is None:
+            return zip(self.targets[lo:hi], itertools.repeat(1, hi - lo))
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    def edges(self) -> Iterator[Tuple[int, int, Any]]:
+        """按起点顺序遍历全部边 (u, v, w)。"""
+        for u in range(self.n):
+            yield from ((u, v, w) for v, w in self.weighted_neighbors(u))
+
+    def edge_arrays(self) -> Tuple[Any, Any, Any]:
+        """
+        导出 NumPy 边数组 (u, v, w)：v / w 直接共享底层 array 缓冲区（零拷贝），
+        u 由 offsets 展开。无权图 w 为全 1。需要 numpy。
+        """
+        _require_numpy()
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        v = np.frombuffer(self.targets, dtype=np.int64)
+        u = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(offsets))
+        if self.weights is None:
+            w = np.ones(len(v), dtype=np.int64)
+        else:
+            w = np.frombuffer(self.weights, dtype=np.float64 if _typecode(self.weights) == "d" else np.int64)
+        return u, v, w
+
+    def nbytes(self) -> int:
+        """底层数组占用的字节数（不含对象头）。"""
+        total = self.offsets.itemsize * len(self.offsets) + self.targets.itemsize * len(self.targets)
+        if self.weights is not None:
+            total += self.weights.itemsize * len(self.weights)
+        return total
+
+
 # ============================================================
 # 2) 排序与二分
 # ============================================================
@@ -221,6 +871,356 @@ def mergesort(a: List[int]) -> List[int]:
     return out
 
 
+def insertion_sort_range(a: List[Any], lo: int, hi: int) -> None:
+    """对闭区间 a[lo..hi] 插入排序（原地、稳定），小区间上比分治更快。"""
+    for i in range(lo + 1, hi + 1):
+        x = a[i]
+        j = i - 1
+        while j >= lo and x < a[j]:
+            a[j + 1] = a[j]
+            j -= 1
+        a[j + 1] = x
+
+
+def _heapsort_range(a: List[Any], lo: int, hi: int) -> None:
+    """对闭区间 a[lo..hi] 原地堆排序（introsort 的兜底，最坏 O(n log n)）。"""
+    n = hi - lo + 1
+
+    def sift(root: int, end: int) -> None:
+        x = a[lo + root]
+        while True:
+            child = 2 * root + 1
+            if child >= end:
+                break
+            if child + 1 < end and a[lo + child] < a[lo + child + 1]:
+                child += 1
+            if not (x < a[lo + child]):
+                break
+            a[lo + root] = a[lo + child]
+            root = child
+        a[lo + root] = x
+
+    for i in range(n // 2 - 1, -1, -1):
+        sift(i, n)
+    for end in range(n - 1, 0, -1):
+        a[lo], a[lo + end] = a[lo + end], a[lo]
+        sift(0, end)
+
+
+def _median3(x: Any, y: Any, z: Any) -> Any:
+    if y < x:
+        x, y = y, x
+    if z < y:
+        y = x if z < x else z
+    return y
+
+
+def introsort(a: List[Any], cutoff: int = 16) -> List[Any]:
+    """
+    内省排序（原地、不稳定）：
+    - 三数取中（大区间用 ninther）选枢轴 + Hoare 双指针划分（有序 / 逆序输入依然均衡）
+    - 三路处理重复值：若区间左邻元素（必 <= 区间内所有元素）等于枢轴，
+      说明整段 == 枢轴的元素可以一次性归位并跳过（pdqsort 的做法），大量重复值时 O(n)
+    - 区间长度 <= cutoff 时插入排序
+    - 划分深度超过 2·log2(n) 时改用堆排序，最坏 O(n log n)
+    - 显式栈、先处理较小的一半，栈深 O(log n)，不受递归深度限制
+    """
+    n = len(a)
+    if n < 2:
+        return a
+    stack = [(0, n - 1, 2 * n.bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while True:
+            if hi - lo < cutoff:
+                insertion_sort_range(a, lo, hi)
+                break
+            if depth == 0:
+                _heapsort_range(a, lo, hi)
+                break
+            depth -= 1
+            mid = (lo + hi) // 2
+            if hi - lo > 128:
+                # 大区间用 Tukey ninther（三组三数取中再取中），更难被构造的输入击穿
+                step = (hi - lo) // 8
+                pivot = _median3(_median3(a[lo], a[lo + step], a[lo + 2 * step]),
+                                 _median3(a[mid - step], a[mid], a[mid + step]),
+                                 _median3(a[hi - 2 * step], a[hi - step], a[hi]))
+            else:
+                pivot = _median3(a[lo], a[mid], a[hi])
+            if lo > 0 and not (a[lo - 1] < pivot):
+                # 左邻 == 枢轴：把所有 == 枢轴的元素挪到左边并整体跳过
+                i = lo
+                for k in range(lo, hi + 1):
+                    v = a[k]
+                    if not (pivot < v):
+                        a[i], a[k] = v, a[i]
+                        i += 1
+                lo = i
+                continue
+            i, j = lo, hi
+            while i <= j:
+                while a[i] < pivot:
+                    i += 1
+                while pivot < a[j]:
+                    j -= 1
+                if i <= j:
+                    a[i], a[j] = a[j], a[i]
+                    i += 1
+                    j -= 1
+            # a[lo..j] <= pivot <= a[i..hi]
+            if j - lo < hi - i:
+                stack.append((i, hi, depth))
+                hi = j
+            else:
+                stack.append((lo, j, depth))
+                lo = i
+    return a
+
+
+def mergesort_bottom_up(a: List[Any], run: int = 32) -> List[Any]:
+    """
+    自底向上归并排序（原地结果、稳定）：
+    先对长度 run 的小段插入排序，再按 run, 2run, 4run... 两两归并；
+    整个过程只分配一个与 a 等长的缓冲区，源 / 目标每轮互换，没有递归和切片拷贝。
+    时间 O(n log n)，额外空间 O(n)。
+    """
+    n = len(a)
+    for lo in range(0, n, run):
+        insertion_sort_range(a, lo, min(lo + run, n) - 1)
+    src, dst = a, a[:]
+    width = run
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                if src[j] < src[i]:
+                    dst[k] = src[j]
+                    j += 1
+                else:
+                    dst[k] = src[i]
+                    i += 1
+                k += 1
+            if i < mid:
+                dst[k:hi] = src[i:mid]
+            else:
+                dst[k:hi] = src[j:hi]
+        src, dst = dst, src
+        width *= 2
+    if src is not a:
+        a[:] = src
+    return a
+
+
+def counting_sort(a: Sequence[int], lo: Optional[int] = None, hi: Optional[int] = None) -> List[int]:
+    """
+    计数排序：值域 [lo, hi] 较小的整数，O(n + 值域)。lo / hi 缺省取 min / max。
+    返回新列表；有值落在 [lo, hi] 之外时抛 ValueError。
+    """
+    if not a:
+        return []
+    mn, mx = min(a), max(a)
+    lo = mn if lo is None else lo
+    hi = mx if hi is None else hi
+    if mn < lo or mx > hi:
+        raise ValueError(f"values must lie in [{lo}, {hi}], got [{mn}, {mx}]")
+    cnt = [0] * (hi - lo + 1)
+    for x in a:
+        cnt[x - lo] += 1
+    out: List[int] = []
+    for v, c in enumerate(cnt, lo):
+        if c:
+            out.extend([v] * c)
+    return out
+
+
+def radix_sort(a: Sequence[int], bits: int = 8) -> List[int]:
+    """
+    LSD 基数排序（整数，稳定）：每轮按 bits 位分桶，轮数 = 最大值位数 / bits。
+    负数取反后单独排序再拼接。返回新列表。时间 O(n · 位数 / bits)。
+    """
+    neg = [-x for x in a if x < 0]
+    pos = [x for x in a if x >= 0]
+
+    def lsd(xs: List[int]) -> List[int]:
+        if not xs:
+            return xs
+        mask = (1 << bits) - 1
+        shift = 0
+        top = max(xs)
+        while top >> shift:
+            buckets: List[List[int]] = [[] for _ in range(1 << bits)]
+            for x in xs:
+                buckets[(x >> shift) & mask].append(x)
+            xs = [x for b in buckets for x in b]
+            shift += bits
+        return xs
+
+    return [-x for x in reversed(lsd(neg))] + lsd(pos)
+
+
+# ---- 外部排序：数据大于内存时，分段排序落盘 + k 路归并 ----
+
+@dataclass
+class ExternalSortStats:
+    """external_sort_file 的运行统计。"""
+    records: int = 0
+    runs: int = 0
+    bytes_spilled: int = 0
+    run_seconds: float = 0.0
+    merge_seconds: float = 0.0
+    # 进程级高水位（字节，取不到时为 0）：max(本进程, 已回收子进程 / 进程池 worker) 的 ru_maxrss。
+    # 覆盖整个进程生命周期，不单属于这一次排序，只能作为上界参考
+    peak_rss: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """记录数 / 秒。"""
+        total = self.run_seconds + self.merge_seconds
+        return self.records / total if total > 0 else 0.0
+
+
+def _peak_rss() -> int:
+    """本进程与已回收子进程中最大的峰值常驻内存（字节）。"""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover  (Windows)
+        return 0
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _sort_run(args: Tuple[str, int, int, str, str]) -> int:
+    """读 src 中 [start, start+count) 条记录，排序后写到 out；返回写出的记录数（可在子进程中运行）。"""
+    src, start, count, typecode, out = args
+    itemsize = array(typecode).itemsize
+    if np is not None:
+        data = np.fromfile(src, dtype=np.dtype(typecode), count=count, offset=start * itemsize)
+        data.sort(kind="stable")
+        data.tofile(out)
+        return len(data)
+    buf = array(typecode)
+    with open(src, "rb") as f:
+        f.seek(start * itemsize)
+        try:
+            buf.fromfile(f, count)
+        except EOFError:
+            pass
+    buf = array(typecode, sorted(buf))
+    with open(out, "wb") as f:
+        buf.tofile(f)
+    return len(buf)
+
+
+def _read_run(path: str, typecode: str, block: int) -> Iterator[Any]:
+    """按块流式读取一个已排序 run。"""
+    with open(path, "rb") as f:
+        while True:
+            buf = array(typecode)
+            try:
+                buf.fromfile(f, block)
+            except EOFError:
+                pass
+            if not buf:
+                return
+            yield from buf
+
+
+def external_sort_file(src: str, dst: str, typecode: str = "q", run_size: int = 1 << 22,
+                       workers: int = 1, tmpdir: Optional[str] = None, block: int = 1 << 16) -> ExternalSortStats:
+    """
+    外部排序：src 为定长记录的二进制文件（array / NumPy tofile 的格式，typecode 如 "q" / "i" / "d"），
+    排序结果写入 dst。
+    1) 按 run_size 条记录切段，每段在内存中排序后写成临时 run 文件（workers > 1 时进程池并行，
+       子进程各自按偏移读取，不经 IPC 传数据）
+    2) heapq.merge 对所有 run 做 k 路归并，每个 run 只保留 block 条的读缓冲，输出同样分块写出
+    内存占用约为 max(run_size, k · block) 条记录。返回吞吐与峰值内存统计。
+    """
+    itemsize = array(typecode).itemsize
+    total, extra = divmod(os.path.getsize(src), itemsize)
+    if extra:
+        raise ValueError(f"{src!r} size is not a multiple of the {itemsize}-byte record size")
+    stats = ExternalSortStats(records=total)
+    with tempfile.TemporaryDirectory(dir=tmpdir) as tmp:
+        jobs = [(src, start, min(run_size, total - start), typecode, os.path.join(tmp, f"run{i:06d}.bin"))
+                for i, start in enumerate(range(0, total, run_size))]
+        t0 = time.perf_counter()
+        if workers > 1 and len(jobs) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_sort_run, jobs))
+        else:
+            for job in jobs:
+                _sort_run(job)
+        stats.run_seconds = time.perf_counter() - t0
+        stats.runs = len(jobs)
+        stats.bytes_spilled = sum(os.path.getsize(j[-1]) for j in jobs)
+
+        t0 = time.perf_counter()
+        with open(dst, "wb") as out:
+            if len(jobs) == 1:
+                with open(jobs[0][-1], "rb") as f:
+                    while True:
+                        chunk = f.read(block * itemsize)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+            else:
+                buf = array(typecode)
+                for x in heapq.merge(*(_read_run(j[-1], typecode, block) for j in jobs)):
+                    buf.append(x)
+                    if len(buf) >= block:
+                        buf.tofile(out)
+                        buf = array(typecode)
+                buf.tofile(out)
+        stats.merge_seconds = time.perf_counter() - t0
+    stats.peak_rss = _peak_rss()
+    return stats
+
+
+def external_sorted(records: Iterable[Any], key: Optional[Callable[[Any], Any]] = None,
+                    run_size: int = 100_000, tmpdir: Optional[str] = None, block: int = 1024) -> Iterator[Any]:
+    """
+    通用外部排序（任意可 pickle 的记录，如 tuple / str）：按 run_size 条切段排序，
+    每段以 block 条一批 pickle 落盘，最后 heapq.merge(key=key) 流式产出。稳定。
+    """
+    import pickle
+
+    def spill(batch: List[Any], path: str) -> None:
+        batch.sort(key=key)
+        with open(path, "wb") as f:
+            for i in range(0, len(batch), block):
+                pickle.dump(batch[i:i + block], f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def read(path: str) -> Iterator[Any]:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield from pickle.load(f)
+                except EOFError:
+                    return
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as tmp:
+        paths: List[str] = []
+        batch: List[Any] = []
+        for rec in records:
+            batch.append(rec)
+            if len(batch) >= run_size:
+                paths.append(os.path.join(tmp, f"run{len(paths):06d}.pkl"))
+                spill(batch, paths[-1])
+                batch = []
+        if not paths:  # 全部放得进内存
+            yield from sorted(batch, key=key)
+            return
+        if batch:
+            paths.append(os.path.join(tmp, f"run{len(paths):06d}.pkl"))
+            spill(batch, paths[-1])
+        yield from heapq.merge(*(read(p) for p in paths), key=key)
+
+
 def binary_search_leftmost_ge(a: Sequence[int], x: int) -> int:
     """
     返回第一个 >= x 的位置（lower_bound）。
@@ -237,32 +1237,168 @@ def binary_search_leftmost_gt(a: Sequence[int], x: int) -> int:
     return bisect.bisect_right(a, x)
 
 
+def searchsorted_many(a: Sequence[Any], queries: Sequence[Any], side: str = "left") -> Any:
+    """
+    批量二分：返回每个 queries[i] 在有序序列 a 中的插入位置（side="left" 同 bisect_left，"right" 同 bisect_right）。
+    - 有 NumPy：np.searchsorted，返回数组
+    - 无 NumPy：查询很少时逐个 bisect；否则把查询排序后与 a 做一次归并式扫描，
+      O(n + q log q)，返回 list
+    """
+    if side not in ("left", "right"):
+        raise ValueError("side must be 'left' or 'right'")
+    if np is not None:
+        return np.searchsorted(np.asarray(a), np.asarray(queries), side=side)
+    n, q = len(a), len(queries)
+    if q * max(1, n.bit_length()) < n:
+        find = bisect.bisect_left if side == "left" else bisect.bisect_right
+        return [find(a, x) for x in queries]
+    res = [0] * q
+    i = 0
+    if side == "left":
+        for j in sorted(range(q), key=queries.__getitem__):
+            x = queries[j]
+            while i < n and a[i] < x:
+                i += 1
+            res[j] = i
+    else:
+        for j in sorted(range(q), key=queries.__getitem__):
+            x = queries[j]
+            while i < n and not x < a[i]:
+                i += 1
+            res[j] = i
+    return res
+
+
+class EytzingerIndex:
+    """
+    Eytzinger（BFS 顺序）布局的静态有序索引：把有序数组按完全二叉树层序重排，
+    下降路径 1 → 2k / 2k+1 在内存中逐层连续，适合对同一列做大量重复查找。
+    - lower_bound(x) / upper_bound(x)：返回原有序数组中的下标（同 bisect_left / bisect_right）
+    - lower_bound_many(xs)：NumPy 下所有查询同步逐层下降（log n 次向量操作），否则逐个查
+    有 NumPy 时 keys / rank 在构建时就存成连续的 ndarray，批量查询不再做任何 O(n) 转换；
+    否则为 list。构建 O(n)；单次查询 O(log n)。
+    """
+    __slots__ = ("n", "keys", "rank")
+
+    def __init__(self, a: Sequence[Any]):
+        n = self.n = len(a)
+        rank = [n] * (n + 1)  # rank[k]：层序第 k 个结点在原数组中的下标；rank[0] = n 表示“不存在”
+        # 中序遍历完全二叉树，依次填入有序元素
+        i, k, st = 0, 1, []
+        while st or k <= n:
+            while k <= n:
+                st.append(k)
+                k <<= 1
+            k = st.pop()
+            rank[k] = i
+            i += 1
+            k = 2 * k + 1
+        if np is not None and n:
+            self.rank = np.asarray(rank, dtype=np.int64)
+            # keys[0] 只是占位（取 a[0]），下降时不会被当作真实结点比较
+            self.keys = np.asarray(a)[np.minimum(self.rank, n - 1)]
+        else:
+            self.rank = rank
+            self.keys = [None] + [a[r] for r in rank[1:]]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _descend(self, x: Any, strict: bool) -> int:
+        keys, n, k = self.keys, self.n, 1
+        if strict:
+            while k <= n:
+                k = 2 * k + 1 if not x < keys[k] else 2 * k
+        else:
+            while k <= n:
+                k = 2 * k + 1 if keys[k] < x else 2 * k
+        # 去掉末尾连续的“右转”和最后一次“左转”，回到答案结点
+        k >>= ((~k) & (k + 1)).bit_length()
+        return int(self.rank[k])
+
+    def lower_bound(self, x: Any) -> int:
+        return self._descend(x, False)
+
+    def upper_bound(self, x: Any) -> int:
+        return self._descend(x, True)
+
+    def lower_bound_many(self, xs: Sequence[Any], side: str = "left") -> Any:
+        """批量查找。NumPy 模式下返回数组，否则返回 list。"""
+        if side not in ("left", "right"):
+            raise ValueError("side must be 'left' or 'right'")
+        if np is None or self.n == 0:
+            return [self._descend(x, side == "right") for x in xs]
+        keys = self.keys
+        xs = np.asarray(xs)
+        k = np.ones(len(xs), dtype=np.int64)
+        for _ in range(self.n.bit_length()):
+            live = k <= self.n
+            kk = np.where(live, k, 0)
+            step = keys[kk] <= xs if side == "right" else keys[kk] < xs
+            k = np.where(live, 2 * k + step, k)
+        low = (~k) & (k + 1)
+        k >>= np.frexp(low.astype(np.float64))[1].astype(np.int64)
+        return self.rank[k]
+
+
 # ============================================================
 # 3) DFS / BFS / 回溯
 # ============================================================
 
-def dfs_reachable(g: Dict[Any, List[Any]], start: Any) -> set:
+def dfs_reachable(g: Union[Dict[Any, List[Any]], CSRGraph], start: Any) -> set:
     """
     DFS：返回从 start 可达的节点集合。
     时间 O(V+E)。
+    显式栈实现，不受递归深度限制。
     """
-    seen = set()
-
-    def go(u: Any) -> None:
-        seen.add(u)
+    if isinstance(g, CSRGraph):
+        return _dfs_reachable_csr(g, start)
+    seen = {start}
+    st = [start]
+    while st:
+        u = st.pop()
         for v in g.get(u, []):
             if v not in seen:
-                go(v)
-
-    go(start)
+                seen.add(v)
+                st.append(v)
     return seen
 
 
-def bfs_shortest_unweighted(g: Dict[Any, List[Any]], s: Any) -> Dict[Any, int]:
+def _dfs_reachable_csr(g: CSRGraph, start: int) -> set:
+    off, tg = g.offsets, g.targets
+    seen = bytearray(g.n)
+    seen[start] = 1
+    st = [start]
+    while st:
+        u = st.pop()
+        for k in range(off[u], off[u + 1]):
+            v = tg[k]
+            if not seen[v]:
+                seen[v] = 1
+                st.append(v)
+    return {i for i in range(g.n) if seen[i]}
+
+
+def bfs_shortest_unweighted(g: Union[Dict[Any, List[Any]], CSRGraph], s: Any) -> Dict[Any, int]:
     """
     BFS：无权图最短路（从 s 出发到各点的最短边数）。
     时间 O(V+E)。
+    g 为 CSRGraph 时忽略权重，用数组记录距离。
     """
+    if isinstance(g, CSRGraph):
+        off, tg = g.offsets, g.targets
+        dl = array("q", [-1]) * g.n
+        dl[s] = 0
+        q = deque([s])
+        while q:
+            u = q.popleft()
+            du = dl[u] + 1
+            for k in range(off[u], off[u + 1]):
+                v = tg[k]
+                if dl[v] < 0:
+                    dl[v] = du
+                    q.append(v)
+        return {v: d for v, d in enumerate(dl) if d >= 0}
     dist: Dict[Any, int] = {s: 0}
     q = deque([s])
     while q:
@@ -304,13 +1440,15 @@ def permutations(nums: List[int]) -> List[List[int]]:
 # 4) 图算法
 # ============================================================
 
-def dijkstra(g: Dict[Any, List[Tuple[Any, int]]], s: Any) -> Dict[Any, int]:
+def dijkstra(g: Union[Dict[Any, List[Tuple[Any, int]]], CSRGraph], s: Any) -> Dict[Any, int]:
     """
     Dijkstra：非负权最短路。
-    g[u] = [(v, w), ...]
+    g[u] = [(v, w), ...]，或 CSRGraph（距离存数组，省去 dict 查找）。
     时间 O((V+E) log V)。
     """
     INF = 10**18
+    if isinstance(g, CSRGraph):
+        return _dijkstra_csr(g, s)
     dist: Dict[Any, int] = {s: 0}
     pq: List[Tuple[int, Any]] = [(0, s)]
     while pq:
@@ -325,14 +1463,436 @@ def dijkstra(g: Dict[Any, List[Tuple[Any, int]]], s: Any) -> Dict[Any, int]:
     return dist
 
 
-def bellman_ford(n: int, edges: List[Tuple[int, int, int]], s: int) -> Optional[List[int]]:
+def _dijkstra_csr(g: CSRGraph, s: int) -> Dict[int, int]:
+    INF = 10**18
+    off, tg, wt = g.offsets, g.targets, g.weights
+    dist = [INF] * g.n
+    dist[s] = 0
+    pq: List[Tuple[int, int]] = [(0, s)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        for k in range(off[u], off[u + 1]):
+            v = tg[k]
+            nd = d + (wt[k] if wt is not None else 1)
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return {v: d for v, d in enumerate(dist) if d != INF}
+
+
+@dataclass
+class ShortestPaths:
+    """
+    最短路结果：dist + 前驱树 parent。
+    - 数组模式（整数节点）：dist / parent 为 list，未到达为 INF / -1
+    - 字典模式：dist / parent 为 dict，未到达的节点不出现
+    源点的 parent 为 -1（数组）或 None（字典）。
+    settled：给定 targets 时为已出堆（距离确定）的节点集合，其余节点的 dist 只是暂定值；None 表示全部确定。
+    """
+    dist: Union[List[int], Dict[Any, int]]
+    parent: Union[List[int], Dict[Any, Any], None]
+    settled: Optional[set] = None
+
+    INF = 10**18
+
+    def distance(self, v: Any) -> Optional[int]:
+        """到 v 的距离；不可达（或提前结束未确定）返回 None。"""
+        if self.settled is not None and v not in self.settled:
+            return None
+        if isinstance(self.dist, dict):
+            return self.dist.get(v)
+        d = self.dist[v]
+        return None if d == self.INF else d
+
+    def path_to(self, t: Any) -> Optional[List[Any]]:
+        """沿前驱回溯出源点到 t 的路径；不可达返回 None。需要 with_parent=True。"""
+        if self.parent is None:
+            raise ValueError("parent tree was not recorded; pass with_parent=True")
+        if self.distance(t) is None:
+            return None
+        root = None if isinstance(self.parent, dict) else -1
+        path = [t]
+        while True:
+            p = self.parent[path[-1]]
+            if p == root:
+                break
+            path.append(p)
+        path.reverse()
+        return path
+
+
+def dijkstra_multi(
+    g: Union[Dict[Any, List[Tuple[Any, int]]], List[List[Tuple[int, int]]], CSRGraph],
+    sources: Iterable[Any],
+    targets: Optional[Iterable[Any]] = None,
+    n: Optional[int] = None,
+    with_parent: bool = False,
+) -> ShortestPaths:
+    """
+    多源 + 提前结束的 Dijkstra，可选记录前驱树。
+    - sources：所有源点距离为 0（等价于加一个超级源点）
+    - targets：给定时，目标集合全部出堆（距离确定）即停止；未出堆节点的 distance() 返回 None
+    - n：整数节点 0..n-1 时传入（g 为 list / CSRGraph 时自动取），dist/parent 用 list，
+      避免 dist.get(v, INF) 的哈希开销
+    时间 O((V+E) log V)，提前结束时只扩展到最远目标为止。
+    """
+    INF = ShortestPaths.INF
+    if isinstance(g, CSRGraph):
+        n = g.n
+    elif isinstance(g, list):
+        n = len(g)
+    remaining = set(targets) if targets is not None else None
+    settled = set() if remaining is not None else None
+    pq: List[Tuple[int, Any]] = []
+
+    if n is not None:
+        dist_a = [INF] * n
+        par_a = [-1] * n if with_parent else None
+        for s in sources:
+            dist_a[s] = 0
+            pq.append((0, s))
+        heapq.heapify(pq)
+        adj = _adj_fn(g)
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d != dist_a[u]:
+                continue
+            if remaining is not None:
+                settled.add(u)
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for v, w in adj(u):
+                nd = d + w
+                if nd < dist_a[v]:
+                    dist_a[v] = nd
+                    if par_a is not None:
+                        par_a[v] = u
+                    heapq.heappush(pq, (nd, v))
+        return ShortestPaths(dist_a, par_a, settled)
+
+    dist: Dict[Any, int] = {}
+    par: Optional[Dict[Any, Any]] = {} if with_parent else None
+    for s in sources:
+        dist[s] = 0
+        if par is not None:
+            par[s] = None
+        pq.append((0, s))
+    heapq.heapify(pq)
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        if remaining is not None:
+            settled.add(u)
+            remaining.discard(u)
+            if not remaining:
+                break
+        for v, w in g.get(u, []):
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                if par is not None:
+                    par[v] = u
+                heapq.heappush(pq, (nd, v))
+    return ShortestPaths(dist, par, settled)
+
+
+def dijkstra_path(g: Any, s: Any, t: Any, n: Optional[int] = None) -> Tuple[Optional[int], Optional[List[Any]]]:
+    """
+    点到点最短路：返回 (距离, 路径)；不可达返回 (None, None)。
+    t 出堆即停止。
+    """
+    res = dijkstra_multi(g, [s], targets=[t], n=n, with_parent=True)
+    return res.distance(t), res.path_to(t)
+
+
+def _typecode(buf: Any) -> str:
+    """array.typecode / memoryview.format 统一取类型码。"""
+    return buf.typecode if isinstance(buf, array) else buf.format
+
+
+def _adj_fn(g: Any) -> Callable[[Any], Iterable[Tuple[Any, Any]]]:
+    """统一三种图表示的邻接访问：u -> 可迭代的 (v, w)。"""
+    if isinstance(g, CSRGraph):
+        return g.weighted_neighbors
+    if isinstance(g, list):
+        return g.__getitem__
+    return lambda u: g.get(u, ())
+
+
+def _nbr_fn(g: Any) -> Callable[[Any], Iterable[Any]]:
+    """无权版本：u -> 可迭代的 v。"""
+    if isinstance(g, CSRGraph):
+        return g.neighbors
+    if isinstance(g, list):
+        return g.__getitem__
+    return lambda u: g.get(u, ())
+
+
+def reverse_graph(g: Any) -> Any:
+    """
+    反向图（所有边反向），表示形式与输入相同：dict / list / CSRGraph。
+    邻接元素既可以是 v 也可以是 (v, w)。时间 O(V+E)。
+    """
+    if isinstance(g, CSRGraph):
+        return CSRGraph.from_edges(g.n, [(v, u, w) for u, v, w in g.edges()] if g.weights is not None
+                                   else [(v, u) for u, v, _ in g.edges()])
+    items = enumerate(g) if isinstance(g, list) else g.items()
+    rg: Any = [[] for _ in g] if isinstance(g, list) else defaultdict(list)
+    for u, nbrs in items:
+        for e in nbrs:
+            if isinstance(e, tuple):
+                rg[e[0]].append((u,) + e[1:])
+            else:
+                rg[e].append(u)
+    return rg if isinstance(g, list) else dict(rg)
+
+
+@dataclass
+class SearchResult:
+    """点到点搜索结果：dist/path 为 None 表示不可达；settled 为出堆/出队并扩展的节点数。"""
+    dist: Optional[int]
+    path: Optional[List[Any]]
+    settled: int
+
+
+def _join_paths(par_f: Dict[Any, Any], par_b: Dict[Any, Any], meet: Any) -> List[Any]:
+    path = [meet]
+    while par_f[path[-1]] is not None:
+        path.append(par_f[path[-1]])
+    path.reverse()
+    while par_b[path[-1]] is not None:
+        path.append(par_b[path[-1]])
+    return path
+
+
+def astar(g: Any, s: Any, t: Any, h: Optional[Callable[[Any], int]] = None) -> SearchResult:
+    """
+    A* 点到点最短路（非负权）。
+    h(v)：v 到 t 的可采纳估计（不高估）；h=None 时退化为 Dijkstra，可作为基线对比 settled。
+    不一致（非单调）的 h 也能得到正确结果，只是节点可能被重复扩展。
+    f 相同时优先扩展 g 更大（离目标更近）的节点，网格等大量平局的图上扩展数明显更少。
+    """
+    INF = 10**18
+    adj = _adj_fn(g)
+    if h is None:
+        h = lambda v: 0
+    dist: Dict[Any, int] = {s: 0}
+    par: Dict[Any, Any] = {s: None}
+    pq: List[Tuple[int, int, Any]] = [(h(s), 0, s)]
+    settled = 0
+    while pq:
+        _, neg_d, u = heapq.heappop(pq)
+        d = -neg_d
+        if d != dist[u]:
+            continue
+        settled += 1
+        if u == t:
+            return SearchResult(d, _join_paths(par, {t: None}, t), settled)
+        for v, w in adj(u):
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                par[v] = u
+                heapq.heappush(pq, (nd + h(v), -nd, v))
+    return SearchResult(None, None, settled)
+
+
+def bidirectional_dijkstra(g: Any, s: Any, t: Any, rg: Any = None) -> SearchResult:
+    """
+    双向 Dijkstra：从 s 正向、从 t 在反向图上同时搜索，每次扩展堆顶较小的一侧。
+    停止条件：两侧堆顶之和 >= 当前最优 s-t 距离。
+    rg：反向图；无向图可直接传 g，缺省时用 reverse_graph(g) 现建（多次查询请预先建好）。
+    距离只存在 dict 中，规模与搜索范围成正比，而不是 O(V)。
+    """
+    if s == t:
+        return SearchResult(0, [s], 0)
+    INF = 10**18
+    if rg is None:
+        rg = reverse_graph(g)
+    adj = (_adj_fn(g), _adj_fn(rg))
+    dist: Tuple[Dict[Any, int], Dict[Any, int]] = ({s: 0}, {t: 0})
+    par: Tuple[Dict[Any, Any], Dict[Any, Any]] = ({s: None}, {t: None})
+    pq: Tuple[List[Tuple[int, Any]], List[Tuple[int, Any]]] = ([(0, s)], [(0, t)])
+    best, meet, settled = INF, None, 0
+    while pq[0] and pq[1]:
+        if pq[0][0][0] + pq[1][0][0] >= best:
+            break
+        side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+        d, u = heapq.heappop(pq[side])
+        mine, other = dist[side], dist[1 - side]
+        if d != mine[u]:
+            continue
+        settled += 1
+        for v, w in adj[side](u):
+            nd = d + w
+            if nd < mine.get(v, INF):
+                mine[v] = nd
+                par[side][v] = u
+                heapq.heappush(pq[side], (nd, v))
+            if v in other and mine[v] + other[v] < best:
+                best, meet = mine[v] + other[v], v
+    if meet is None:
+        return SearchResult(None, None, settled)
+    return SearchResult(best, _join_paths(par[0], par[1], meet), settled)
+
+
+def bidirectional_bfs(g: Any, s: Any, t: Any, rg: Any = None) -> SearchResult:
+    """
+    双向 BFS（无权）：每轮整层扩展较小的一侧前沿，两侧相遇即得最短路。
+    g[u] = [v, ...] 或 CSRGraph；rg 同 bidirectional_dijkstra。
+    """
+    if s == t:
+        return SearchResult(0, [s], 0)
+    if rg is None:
+        rg = reverse_graph(g)
+    nb = (_nbr_fn(g), _nbr_fn(rg))
+    dist: Tuple[Dict[Any, int], Dict[Any, int]] = ({s: 0}, {t: 0})
+    par: Tuple[Dict[Any, Any], Dict[Any, Any]] = ({s: None}, {t: None})
+    front: List[List[Any]] = [[s], [t]]
+    settled = 0
+    while front[0] and front[1]:
+        side = 0 if len(front[0]) <= len(front[1]) else 1
+        mine, other = dist[side], dist[1 - side]
+        best, meet = None, None
+        nxt: List[Any] = []
+        for u in front[side]:
+            settled += 1
+            du = mine[u] + 1
+            for v in nb[side](u):
+                if v not in mine:
+                    mine[v] = du
+                    par[side][v] = u
+                    nxt.append(v)
+                if v in other and (best is None or mine[v] + other[v] < best):
+                    best, meet = mine[v] + other[v], v
+        if meet is not None:
+            return SearchResult(best, _join_paths(par[0], par[1], meet), settled)
+        front[side] = nxt
+    return SearchResult(None, None, settled)
+
+
+class ALTIndex:
+    """
+    ALT 预处理索引（A* + Landmarks + Triangle inequality），用于同一静态图上的大量点到点查询。
+    - 预处理：选 k 个地标 L（最远点启发式），用 Dijkstra 求 d(L, v) 与 d(v, L)，O(k (V+E) log V)
+    - 查询：A*，h(v) = max_L max(d(L,t) - d(L,v), d(v,L) - d(t,L))，可采纳且一致，
+      通常只扩展最短路附近的少量节点
+    - save / load：图（CSR）与距离表按 8 字节对齐写成一个二进制文件；load 用 mmap
+      零拷贝映射，多个 worker 进程共享同一份页缓存，启动无需重建
+    节点必须是 0..n-1 的整数，边权非负。
+    """
+
+    MAGIC = b"ALTIDX1\0"
+    INF = 10**18
+
+    def __init__(self, graph: CSRGraph, landmarks: Sequence[int], d_from: Sequence[Any], d_to: Sequence[Any]):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.d_from = d_from  # d_from[v * k + i] = d(L_i, v)
+        self.d_to = d_to      # d_to[v * k + i]   = d(v, L_i)
+        self._mm: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, g: Union[Dict[int, List[Tuple[int, int]]], CSRGraph], k: int = 8,
+              n: Optional[int] = None, seed: int = 0) -> "ALTIndex":
+        """
+        从 g[u] = [(v, w)] 或 CSRGraph 离线构建索引；空图抛 ValueError。
+        还有节点与所有已选地标都不连通时，下一个地标优先放进这样的分量，保证每个分量都有地标。
+        """
+        graph = g if isinstance(g, CSRGraph) else CSRGraph.from_adj(g, n)
+        n = graph.n
+        if n == 0:
+            raise ValueError("cannot build an ALTIndex on an empty graph")
+        rgraph = reverse_graph(graph)
+        k = max(1, min(k, n))
+        tc = graph.weights.typecode if graph.weights is not None else "q"
+        d_from = array(tc, bytes(8 * n * k))
+        d_to = array(tc, bytes(8 * n * k))
+        landmarks = array("q")
+        # 最远点启发式：每次选离已选地标（取最小距离）最远的可达节点；
+        # 存在与所有地标都不连通的节点时，先在那个分量里补一个地标
+        closest = [cls.INF] * n
+        cur = seed % n
+        for i in range(k):
+            landmarks.append(cur)
+            fwd = dijkstra_multi(graph, [cur]).dist
+            bwd = dijkstra_multi(rgraph, [cur]).dist
+            for v in range(n):
+                d_from[v * k + i] = fwd[v]
+                d_to[v * k + i] = bwd[v]
+                d = min(fwd[v], bwd[v])
+                if d < closest[v]:
+                    closest[v] = d
+            uncovered = next((v for v in range(n) if closest[v] == cls.INF), None)
+            if uncovered is not None:
+                cur = uncovered
+            else:
+                cur = max(range(n), key=closest.__getitem__)
+        return cls(graph, landmarks, d_from, d_to)
+
+    def heuristic(self, v: int, t: int) -> int:
+        """v 到 t 的下界。"""
+        INF = self.INF
+        k = len(self.landmarks)
+        df, dt = self.d_from, self.d_to
+        best = 0
+        bv, bt = v * k, t * k
+        for i in range(k):
+            a, b = df[bt + i], df[bv + i]
+            if a < INF and b < INF and a - b > best:
+                best = a - b
+            a, b = dt[bv + i], dt[bt + i]
+            if a < INF and b < INF and a - b > best:
+                best = a - b
+        return best
+
+    def query(self, s: int, t: int) -> SearchResult:
+        """点到点最短路（距离 + 路径 + 扩展节点数）。"""
+        return astar(self.graph, s, t, lambda v: self.heuristic(v, t))
+
+    def distance(self, s: int, t: int) -> Optional[int]:
+        return self.query(s, t).dist
+
+    def save(self, path: str) -> None:
+        """写出单个 8 字节对齐的二进制文件：landmarks / offsets / targets / weights / 距离表。"""
+        g = self.graph
+        arrays = [self.landmarks, g.offsets, g.targets, self.d_from, self.d_to]
+        if g.weights is not None:
+            arrays.append(g.weights)
+        _save_arrays(path, self.MAGIC, [g.n], arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ALTIndex":
+        """mmap 只读映射索引文件；数组为 memoryview，不复制数据。用完可调用 close()。"""
+        mm, (n,), views = _load_arrays(path, cls.MAGIC)
+        landmarks, offsets, targets, d_from, d_to = views[:5]
+        weights = views[5] if len(views) > 5 else None
+        idx = cls(CSRGraph(n, offsets, targets, weights), landmarks, d_from, d_to)
+        idx._mm = mm
+        return idx
+
+    def close(self) -> None:
+        """释放 load() 得到的 mmap（之后索引不可再用）。"""
+        if self._mm is not None:
+            g = self.graph
+            _close_mapping(self._mm, (self.landmarks, g.offsets, g.targets, g.weights, self.d_from, self.d_to))
+            self._mm = None
+
+
+def bellman_ford(n: int, edges: Union[List[Tuple[int, int, int]], CSRGraph], s: int) -> Optional[List[int]]:
     """
     Bellman-Ford：可处理负权；可检测负环。
-    edges: (u, v, w)
+    edges: (u, v, w)，或 CSRGraph（按起点顺序展开为边表）
     返回 dist 数组；若存在可达负环则返回 None。
     时间 O(VE)。
     """
     INF = 10**18
+    if isinstance(edges, CSRGraph):
+        return _bellman_ford_csr(edges, s)
     dist = [INF] * n
     dist[s] = 0
 
@@ -351,12 +1911,143 @@ def bellman_ford(n: int, edges: List[Tuple[int, int, int]], s: int) -> Optional[
     return dist
 
 
-def topo_sort(n: int, edges: List[Tuple[int, int]]) -> Optional[List[int]]:
+def _bellman_ford_csr(g: CSRGraph, s: int) -> Optional[List[int]]:
+    INF = 10**18
+    off, tg, wt = g.offsets, g.targets, g.weights
+
+    def relax_round() -> bool:
+        updated = False
+        for u in range(g.n):
+            du = dist[u]
+            if du == INF:
+                continue
+            for k in range(off[u], off[u + 1]):
+                nd = du + (wt[k] if wt is not None else 1)
+                v = tg[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    updated = True
+        return updated
+
+    dist = [INF] * g.n
+    dist[s] = 0
+    for _ in range(g.n - 1):
+        if not relax_round():
+            return dist
+    return None if relax_round() else dist
+
+
+def _walk_to_cycle(parent: Sequence[int], x: int, n: int) -> Optional[List[int]]:
+    """从 x 沿 parent 走 n 步必落在前驱图的环上（若有）；返回按边方向排列的环。"""
+    for _ in range(n):
+        x = parent[x]
+        if x < 0:
+            return None
+    cycle = [x]
+    y = parent[x]
+    while y != x:
+        cycle.append(y)
+        y = parent[y]
+    cycle.reverse()
+    return cycle
+
+
+def bellman_ford_np(n: int, u: Any, v: Any, w: Any, s: int) -> Tuple[Any, Optional[List[int]]]:
+    """
+    NumPy 向量化 Bellman-Ford：每轮对全部边做一次数组化松弛（np.minimum.at）。
+    u, v, w：等长边数组（可用 CSRGraph.edge_arrays() 得到）。
+    返回 (dist, None)；若存在从 s 可达的负环，返回 (None, cycle)，
+    cycle 为环上节点，cycle[i] -> cycle[i+1] -> ... -> cycle[0] 均为边。
+    dist 为 int64（整数权，不可达为 10**18）或 float64（不可达为 inf）数组。
+    时间 O(VE)，但每轮是 O(E) 的 C 级数组运算。
+    """
+    _require_numpy()
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    w = np.asarray(w)
+    if w.dtype.kind in "iub" or w.size == 0:  # 空边表时 np.asarray([]) 是 float64，按整数权处理
+        w = w.astype(np.int64, copy=False)
+        INF: Any = 10**18
+    else:
+        w = w.astype(np.float64, copy=False)
+        INF = np.inf
+    dist = np.full(n, INF, dtype=w.dtype)
+    dist[s] = 0
+    parent = np.full(n, -1, dtype=np.int64)
+
+    def relax_round() -> Any:
+        du = dist[u]
+        ok = du < INF
+        cand = du[ok] + w[ok]
+        vv = v[ok]
+        new = dist.copy()
+        np.minimum.at(new, vv, cand)
+        improved = new < dist
+        if improved.any():
+            # 对每个被改进的 v，任取一条达到新值的边作为前驱
+            hit = (cand == new[vv]) & improved[vv]
+            parent[vv[hit]] = u[ok][hit]
+            dist[improved] = new[improved]
+        return np.flatnonzero(improved)
+
+    for _ in range(max(n - 1, 0)):
+        if len(relax_round()) == 0:
+            return dist, None
+    changed = relax_round()
+    # 仍能松弛 => 有可达负环；继续松弛直到它出现在前驱图中
+    while len(changed):
+        cycle = _walk_to_cycle(parent, int(changed[0]), n)
+        if cycle is not None:
+            return None, cycle
+        changed = relax_round()
+    return dist, None
+
+
+def spfa(n: int, edges: Union[List[Tuple[int, int, int]], CSRGraph], s: int) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+    """
+    SPFA（队列优化 Bellman-Ford）：只重新松弛距离刚变小的节点的出边，
+    稀疏更新时远快于逐轮全量松弛；最坏仍为 O(VE)。
+    返回值同 bellman_ford_np：(dist, None) 或 (None, cycle)。
+    负环判定：某节点最短路边数达到 n。
+    """
+    INF = 10**18
+    if not isinstance(edges, CSRGraph):
+        edges = CSRGraph.from_edges(n, edges)
+    adj = edges.weighted_neighbors
+    dist = [INF] * n
+    parent = [-1] * n
+    cnt = [0] * n
+    in_q = bytearray(n)
+    dist[s] = 0
+    q = deque([s])
+    in_q[s] = 1
+    while q:
+        x = q.popleft()
+        in_q[x] = 0
+        dx = dist[x]
+        for y, wt in adj(x):
+            nd = dx + wt
+            if nd < dist[y]:
+                dist[y] = nd
+                parent[y] = x
+                cnt[y] = cnt[x] + 1
+                if cnt[y] >= n:
+                    return None, _walk_to_cycle(parent, y, n)
+                if not in_q[y]:
+                    in_q[y] = 1
+                    q.append(y)
+    return dist, None
+
+
+def topo_sort(n: int, edges: Union[List[Tuple[int, int]], CSRGraph]) -> Optional[List[int]]:
     """
     拓扑排序（Kahn / BFS 入度法）。
+    edges 也可直接传 CSRGraph（无需再建邻接表）。
     若有环返回 None。
     时间 O(V+E)。
     """
+    if isinstance(edges, CSRGraph):
+        return _topo_sort_csr(edges)
     g = defaultdict(list)
     indeg = [0] * n
     for u, v in edges:
@@ -376,6 +2067,244 @@ def topo_sort(n: int, edges: List[Tuple[int, int]]) -> Optional[List[int]]:
     return order if len(order) == n else None
 
 
+def _topo_sort_csr(g: CSRGraph) -> Optional[List[int]]:
+    off, tg = g.offsets, g.targets
+    indeg = array("q", bytes(8 * g.n))
+    for v in tg:
+        indeg[v] += 1
+    q = deque([i for i in range(g.n) if indeg[i] == 0])
+    order: List[int] = []
+    while q:
+        u = q.popleft()
+        order.append(u)
+        for k in range(off[u], off[u + 1]):
+            v = tg[k]
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                q.append(v)
+    return order if len(order) == g.n else None
+
+
+# ---- 显式栈 DFS 家族：SCC / 桥 / 割点 / 缩点 ----
+# 全部在整数 CSR 上迭代实现（每个节点一个“下一条边”指针），10^6 级节点也不会爆栈；
+# dict 邻接表先经 _as_indexed 转成 CSR，结果再映射回原标签。
+
+def _as_indexed(g: Any) -> Tuple[CSRGraph, Optional[List[Any]]]:
+    """dict 邻接表（元素 v 或 (v, w)）-> (CSRGraph, labels)；CSRGraph 原样返回，labels 为 None。"""
+    if isinstance(g, CSRGraph):
+        return g, None
+    labels: List[Any] = []
+    index: Dict[Any, int] = {}
+    for u, nbrs in g.items():
+        if u not in index:
+            index[u] = len(labels)
+            labels.append(u)
+        for e in nbrs:
+            v = e[0] if isinstance(e, tuple) else e
+            if v not in index:
+                index[v] = len(labels)
+                labels.append(v)
+    edges = [(index[u], index[e[0] if isinstance(e, tuple) else e]) for u, nbrs in g.items() for e in nbrs]
+    return CSRGraph.from_edges(len(labels), edges), labels
+
+
+def dfs_order(g: Union[Dict[Any, List[Any]], CSRGraph], starts: Optional[Iterable[Any]] = None) -> Tuple[List[Any], List[Any]]:
+    """
+    显式栈 DFS 引擎：返回 (先序, 后序)。
+    starts 缺省时按节点顺序遍历整张图（DFS 森林）。
+    后序的逆序即 DAG 的一个拓扑序。时间 O(V+E)。
+    """
+    csr, labels = _as_indexed(g)
+    off, tg = csr.offsets, csr.targets
+    if starts is None:
+        roots: Iterable[int] = range(csr.n)
+    elif labels is None:
+        roots = starts
+    else:
+        pos = {x: i for i, x in enumerate(labels)}
+        roots = [pos[x] for x in starts if x in pos]
+    it = off[:-1]
+    seen = bytearray(csr.n)
+    pre: List[int] = []
+    post: List[int] = []
+    for r in roots:
+        if seen[r]:
+            continue
+        seen[r] = 1
+        pre.append(r)
+        st = [r]
+        while st:
+            u = st[-1]
+            k = it[u]
+            if k < off[u + 1]:
+                it[u] = k + 1
+                v = tg[k]
+                if not seen[v]:
+                    seen[v] = 1
+                    pre.append(v)
+                    st.append(v)
+            else:
+                st.pop()
+                post.append(u)
+    if labels is not None:
+        return [labels[i] for i in pre], [labels[i] for i in post]
+    return pre, post
+
+
+def _tarjan_csr(g: CSRGraph) -> List[List[int]]:
+    off, tg = g.offsets, g.targets
+    n = g.n
+    index = [-1] * n
+    low = [0] * n
+    on_st = bytearray(n)
+    it = off[:-1]
+    st: List[int] = []
+    comps: List[List[int]] = []
+    t = 0
+    for r in range(n):
+        if index[r] != -1:
+            continue
+        index[r] = low[r] = t
+        t += 1
+        st.append(r)
+        on_st[r] = 1
+        call = [r]
+        while call:
+            u = call[-1]
+            k = it[u]
+            if k < off[u + 1]:
+                it[u] = k + 1
+                v = tg[k]
+                if index[v] == -1:
+                    index[v] = low[v] = t
+                    t += 1
+                    st.append(v)
+                    on_st[v] = 1
+                    call.append(v)
+                elif on_st[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                call.pop()
+                if call and low[u] < low[call[-1]]:
+                    low[call[-1]] = low[u]
+                if low[u] == index[u]:
+                    comp: List[int] = []
+                    while True:
+                        x = st.pop()
+                        on_st[x] = 0
+                        comp.append(x)
+                        if x == u:
+                            break
+                    comps.append(comp)
+    return comps
+
+
+def strongly_connected_components(g: Union[Dict[Any, List[Any]], CSRGraph]) -> List[List[Any]]:
+    """
+    强连通分量（Tarjan，迭代版）。
+    返回分量列表，顺序为缩点 DAG 的逆拓扑序（汇点分量在前）。
+    时间 O(V+E)。
+    """
+    csr, labels = _as_indexed(g)
+    comps = _tarjan_csr(csr)
+    if labels is not None:
+        return [[labels[i] for i in c] for c in comps]
+    return comps
+
+
+def condensation(g: Union[Dict[Any, List[Any]], CSRGraph]) -> Tuple[Union[List[int], Dict[Any, int]], CSRGraph]:
+    """
+    缩点：返回 (comp, dag)。
+    - comp[v]：v 所属分量编号（CSRGraph 输入为 list，dict 输入为 dict）
+    - dag：分量之间的 CSRGraph（去重、无自环），编号即拓扑序（边总是小号 -> 大号）
+    """
+    csr, labels = _as_indexed(g)
+    comps = _tarjan_csr(csr)
+    k = len(comps)
+    comp = [0] * csr.n
+    for i, c in enumerate(comps):
+        for x in c:
+            comp[x] = k - 1 - i
+    edges = sorted({(comp[u], comp[v]) for u, v, _ in csr.edges() if comp[u] != comp[v]})
+    dag = CSRGraph.from_edges(k, edges)
+    if labels is not None:
+        return {labels[i]: comp[i] for i in range(csr.n)}, dag
+    return comp, dag
+
+
+def _lowlink_csr(g: CSRGraph) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """无向图（每条边双向存储）的迭代 lowlink：返回 (桥, 割点)。重边只跳过一次父边。"""
+    off, tg = g.offsets, g.targets
+    n = g.n
+    tin = [-1] * n
+    low = [0] * n
+    it = off[:-1]
+    skipped = bytearray(n)
+    is_art = bytearray(n)
+    bridges_out: List[Tuple[int, int]] = []
+    t = 0
+    for root in range(n):
+        if tin[root] != -1:
+            continue
+        tin[root] = low[root] = t
+        t += 1
+        children = 0
+        st = [(root, -1)]
+        while st:
+            u, p = st[-1]
+            k = it[u]
+            if k < off[u + 1]:
+                it[u] = k + 1
+                v = tg[k]
+                if v == p and not skipped[u]:
+                    skipped[u] = 1
+                    continue
+                if tin[v] == -1:
+                    tin[v] = low[v] = t
+                    t += 1
+                    st.append((v, u))
+                    if u == root:
+                        children += 1
+                elif tin[v] < low[u]:
+                    low[u] = tin[v]
+            else:
+                st.pop()
+                if p != -1:
+                    if low[u] < low[p]:
+                        low[p] = low[u]
+                    if low[u] > tin[p]:
+                        bridges_out.append((p, u))
+                    if p != root and low[u] >= tin[p]:
+                        is_art[p] = 1
+        if children > 1:
+            is_art[root] = 1
+    return bridges_out, [i for i in range(n) if is_art[i]]
+
+
+def bridges(g: Union[Dict[Any, List[Any]], CSRGraph]) -> List[Tuple[Any, Any]]:
+    """
+    桥（割边）：删去后连通分量数增加的边。g 为无向图，每条边两个方向都要出现在邻接表中。
+    时间 O(V+E)。
+    """
+    csr, labels = _as_indexed(g)
+    out, _ = _lowlink_csr(csr)
+    if labels is not None:
+        return [(labels[a], labels[b]) for a, b in out]
+    return out
+
+
+def articulation_points(g: Union[Dict[Any, List[Any]], CSRGraph]) -> List[Any]:
+    """
+    割点：删去后连通分量数增加的节点。g 的要求同 bridges。
+    时间 O(V+E)。
+    """
+    csr, labels = _as_indexed(g)
+    _, out = _lowlink_csr(csr)
+    if labels is not None:
+        return [labels[i] for i in out]
+    return out
+
+
 def kruskal_mst(n: int, edges: List[Tuple[int, int, int]]) -> Optional[int]:
     """
     Kruskal 最小生成树（无向图）。
@@ -396,6 +2325,131 @@ def kruskal_mst(n: int, edges: List[Tuple[int, int, int]]) -> Optional[int]:
     return total if used == n - 1 else None
 
 
+@dataclass
+class SpanningForest:
+    """
+    最小生成森林：total 为总权重，edges 为选中边在输入中的下标，
+    components 为连通分量数（== 1 时即最小生成树）。
+    """
+    total: Any
+    edges: List[int]
+    components: int
+
+    @property
+    def is_tree(self) -> bool:
+        return self.components == 1
+
+
+def kruskal_msf(n: int, edges: Sequence[Tuple[int, int, int]]) -> SpanningForest:
+    """
+    Kruskal 最小生成森林（纯 Python）：输入同 kruskal_mst，edges: (w, u, v)，
+    但返回选中的边且不要求连通。时间 O(E log E)。
+    """
+    order = sorted(range(len(edges)), key=lambda i: edges[i][0])
+    dsu = ArrayDSU(n)
+    chosen: List[int] = []
+    total = 0
+    for i in order:
+        w, u, v = edges[i]
+        if dsu.union(u, v):
+            chosen.append(i)
+            total += w
+            if dsu.count == 1:
+                break
+    return SpanningForest(total, chosen, dsu.count)
+
+
+def _pointer_jump(p: Any) -> Any:
+    """把并查集父数组压成代表元数组：反复 p = p[p] 直到不变（NumPy 向量化）。"""
+    comp = np.frombuffer(p, dtype=np.int32).astype(np.int64) if isinstance(p, array) else np.array(p, dtype=np.int64)
+    while True:
+        nxt = comp[comp]
+        if np.array_equal(nxt, comp):
+            return comp
+        comp = nxt
+
+
+def filter_kruskal_np(n: int, u: Any, v: Any, w: Any, base_size: int = 1 << 16) -> SpanningForest:
+    """
+    Filter-Kruskal 最小生成森林（NumPy）：
+    - 按采样中位数把边分成轻 / 重两半，先递归处理轻边
+    - 处理重边前先整体过滤掉端点已连通的边（一次向量化的 comp[u] != comp[v]）
+    - 边数 <= base_size 时 argsort 后逐条 union
+    稠密图上大部分重边在过滤阶段就被丢弃，无需排序。
+    u, v, w：等长边数组；返回的 edges 为数组下标。
+    """
+    _require_numpy()
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    w = np.asarray(w)
+    dsu = ArrayDSU(n)
+    chosen: List[int] = []
+    rng = np.random.default_rng(0)
+    # 栈元素 (边下标, 是否需要先过滤)；先压重边再压轻边，保证按权重从小到大处理
+    stack: List[Tuple[Any, bool]] = [(np.arange(len(w)), False)]
+    while stack and dsu.count > 1:
+        idx, need_filter = stack.pop()
+        if need_filter:
+            comp = _pointer_jump(dsu.p)
+            idx = idx[comp[u[idx]] != comp[v[idx]]]
+        if len(idx) == 0:
+            continue
+        wi = w[idx]
+        if len(idx) > base_size:
+            pivot = np.median(rng.choice(wi, size=min(len(wi), 1024), replace=False))
+            light = wi <= pivot
+            if not light.all():
+                stack.append((idx[~light], True))
+                stack.append((idx[light], False))
+                continue
+        idx = idx[np.argsort(wi, kind="stable")]
+        for e, a, b in zip(idx.tolist(), u[idx].tolist(), v[idx].tolist()):
+            if dsu.union(a, b):
+                chosen.append(e)
+    chosen.sort()
+    total = w[chosen].sum().item() if chosen else 0
+    return SpanningForest(total, chosen, dsu.count)
+
+
+def boruvka_np(n: int, u: Any, v: Any, w: Any) -> SpanningForest:
+    """
+    Borůvka 最小生成森林（NumPy）：每轮为每个分量选出最轻的外连边并全部合并，
+    分量数每轮至少减半，最多 O(log V) 轮。
+    开始时 argsort 一次得到 (w, 下标) 的全序名次，之后每轮只需 O(E) 的 np.minimum.at；
+    按名次比较也保证了权重相同时不成环。
+    """
+    _require_numpy()
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    w = np.asarray(w)
+    m = len(w)
+    order = np.argsort(w, kind="stable")
+    rank = np.empty(m, dtype=np.int64)
+    rank[order] = np.arange(m)
+    dsu = ArrayDSU(n)
+    chosen: List[int] = []
+    active = np.arange(m)
+    comp = np.arange(n)
+    while len(active) and dsu.count > 1:
+        cu, cv = comp[u[active]], comp[v[active]]
+        keep = cu != cv
+        active, cu, cv = active[keep], cu[keep], cv[keep]
+        if len(active) == 0:
+            break
+        r = rank[active]
+        best_rank = np.full(n, m, dtype=np.int64)
+        np.minimum.at(best_rank, cu, r)
+        np.minimum.at(best_rank, cv, r)
+        best = order[np.unique(best_rank[best_rank < m])]
+        for e, a, b in zip(best.tolist(), u[best].tolist(), v[best].tolist()):
+            if dsu.union(a, b):
+                chosen.append(e)
+        comp = _pointer_jump(dsu.p)
+    chosen.sort()
+    total = w[chosen].sum().item() if chosen else 0
+    return SpanningForest(total, chosen, dsu.count)
+
+
 # ============================================================
 # 5) 动态规划 DP
 # ============================================================
@@ -414,6 +2468,146 @@ def knapsack_01(weights: List[int], values: List[int], cap: int) -> int:
     return dp[cap]
 
 
+def knapsack_01_np(weights: Sequence[int], values: Sequence[int], cap: int,
+                   return_items: bool = False) -> Any:
+    """
+    0/1 背包（NumPy 按行向量化）：每件物品整行更新 dp[w:] = max(dp[w:], dp[:cap+1-w] + v)，
+    右侧先算出新数组，所以天然是“从旧行转移”，无需倒序枚举。
+    return_items=True 时额外记录每件物品的取舍位图（packbits，n · cap / 8 字节），返回 (最大价值, 物品下标列表)。
+    """
+    _require_numpy()
+    dp = np.zeros(cap + 1, dtype=np.int64)
+    takes: List[Any] = []
+    for w, val in zip(weights, values):
+        if w > cap:
+            takes.append(None)
+            continue
+        cand = dp[:cap + 1 - w] + val
+        if return_items:
+            better = cand > dp[w:]
+            takes.append(np.packbits(better))
+            dp[w:][better] = cand[better]
+        else:
+            np.maximum(dp[w:], cand, out=dp[w:])
+    best = int(dp[cap])
+    if not return_items:
+        return best
+    items: List[int] = []
+    c = cap
+    for i in range(len(takes) - 1, -1, -1):
+        w = weights[i]
+        t = takes[i]
+        if t is not None and c >= w and (t[(c - w) >> 3] >> (7 - ((c - w) & 7))) & 1:
+            items.append(i)
+            c -= w
+    items.reverse()
+    return best, items
+
+
+def knapsack_unbounded_np(weights: Sequence[int], values: Sequence[int], cap: int,
+                          return_items: bool = False) -> Any:
+    """
+    完全背包（每件物品可取任意次，NumPy）：按余数类把 dp 排成 (cap/w) × w 的矩阵，
+    dp'[r + jw] = max_{t<=j}(dp[r + tw] - t·v) + j·v，即沿列的 np.maximum.accumulate，每件物品 O(cap) 向量操作。
+    return_items=True 时返回 (最大价值, 每件物品的选取次数)，由最终 dp 逆推。
+    """
+    _require_numpy()
+    dp = np.zeros(cap + 1, dtype=np.int64)
+    for w, val in zip(weights, values):
+        if w > cap or val <= 0:
+            continue
+        if w == 0:
+            raise ValueError("zero-weight item with positive value: unbounded optimum")
+        rows = -(-(cap + 1) // w)
+        pad = np.full(rows * w, np.iinfo(np.int64).min // 2, dtype=np.int64)
+        pad[:cap + 1] = dp
+        mat = pad.reshape(rows, w)
+        shift = (np.arange(rows, dtype=np.int64) * val)[:, None]
+        mat = np.maximum.accumulate(mat - shift, axis=0) + shift
+        dp = mat.reshape(-1)[:cap + 1].copy()
+    best = int(dp[cap])
+    if not return_items:
+        return best
+    counts = [0] * len(weights)
+    c = cap
+    while c > 0 and dp[c] > 0:
+        if dp[c] == dp[c - 1]:
+            c -= 1
+            continue
+        for i, (w, val) in enumerate(zip(weights, values)):
+            if 0 < w <= c and val > 0 and dp[c - w] + val == dp[c]:
+                counts[i] += 1
+                c -= w
+                break
+    return best, counts
+
+
+def knapsack_bounded_np(weights: Sequence[int], values: Sequence[int], counts: Sequence[int], cap: int,
+                        return_items: bool = False) -> Any:
+    """
+    多重背包（第 i 件最多取 counts[i] 次）：二进制拆分成 1, 2, 4, ..., 余数 份的 0/1 物品，
+    再交给 knapsack_01_np，物品数从 Σcnt 降到 Σlog cnt。
+    return_items=True 时返回 (最大价值, 每件物品的选取次数)。
+    """
+    ws: List[int] = []
+    vs: List[int] = []
+    owner: List[Tuple[int, int]] = []  # (原物品下标, 份数)
+    for i, (w, val, cnt) in enumerate(zip(weights, values, counts)):
+        if w > 0:
+            cnt = min(cnt, cap // w)
+        k = 1
+        while cnt > 0:
+            take = min(k, cnt)
+            ws.append(w * take)
+            vs.append(val * take)
+            owner.append((i, take))
+            cnt -= take
+            k <<= 1
+    res = knapsack_01_np(ws, vs, cap, return_items)
+    if not return_items:
+        return res
+    best, picked = res
+    used = [0] * len(weights)
+    for j in picked:
+        i, take = owner[j]
+        used[i] += take
+    return best, used
+
+
+def knapsack_multi_np(weights: Sequence[Sequence[int]], values: Sequence[int], caps: Sequence[int]) -> int:
+    """
+    多维 0/1 背包：weights[i] 为第 i 件物品在各维的消耗，caps 为各维容量。
+    dp 为形状 (caps + 1) 的 NumPy 数组，每件物品用一组切片整块更新，时间 O(n · Π(cap + 1))。
+    """
+    _require_numpy()
+    dp = np.zeros(tuple(c + 1 for c in caps), dtype=np.int64)
+    for ws, val in zip(weights, values):
+        if any(w > c for w, c in zip(ws, caps)):
+            continue
+        dst = tuple(slice(w, None) for w in ws)
+        src = tuple(slice(0, c + 1 - w) for w, c in zip(ws, caps))
+        np.maximum(dp[dst], dp[src] + val, out=dp[dst])
+    return int(dp[tuple(caps)])
+
+
+def subset_sums_bitset(nums: Iterable[int], cap: int) -> int:
+    """
+    子集和（Python 大整数位集）：返回位掩码，第 s 位为 1 表示某个子集和恰为 s（0 <= s <= cap）。
+    每个数一次 bits |= bits << x，时间 O(n · cap / w)。
+    """
+    mask = (1 << (cap + 1)) - 1
+    bits = 1
+    for x in nums:
+        if 0 <= x <= cap:
+            bits |= (bits << x) & mask
+    return bits
+
+
+def subset_sum(nums: Iterable[int], target: int) -> bool:
+    """是否存在子集和恰为 target（非负整数）。"""
+    return target >= 0 and bool(subset_sums_bitset(nums, target) >> target & 1)
+
+
 def lis_length(nums: List[int]) -> int:
     """
     LIS（最长递增子序列）长度：O(n log n)。
@@ -433,7 +2627,7 @@ def edit_distance(a: str, b: str) -> int:
     """
     编辑距离（Levenshtein）。
     dp[i][j]：a[:i] 到 b[:j] 的最少操作次数。
-    时间 O(nm)，空间 O(nm)（可优化到 O(min(n,m))）。
+    时间 O(nm)，空间 O(nm)（两行滚动版见 edit_distance_two_row）。
     """
     n, m = len(a), len(b)
     dp = [[0] * (m + 1) for _ in range(n + 1)]
@@ -455,6 +2649,330 @@ def edit_distance(a: str, b: str) -> int:
     return dp[n][m]
 
 
+def _edit_last_row(a: Sequence[Any], b: Sequence[Any]) -> List[int]:
+    """返回 row[j] = edit_distance(a, b[:j])，两行滚动，空间 O(len(b))。"""
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, y in enumerate(b, 1):
+            if x == y:
+                cur[j] = prev[j - 1]
+            else:
+                d = prev[j]
+                if cur[j - 1] < d:
+                    d = cur[j - 1]
+                if prev[j - 1] < d:
+                    d = prev[j - 1]
+                cur[j] = d + 1
+        prev = cur
+    return prev
+
+
+def edit_distance_two_row(a: Sequence[Any], b: Sequence[Any]) -> int:
+    """编辑距离，只保留两行：时间 O(nm)，空间 O(min(n, m))。"""
+    if len(a) < len(b):
+        a, b = b, a
+    return _edit_last_row(a, b)[-1]
+
+
+def edit_distance_banded(a: Sequence[Any], b: Sequence[Any], k: int) -> int:
+    """
+    带阈值的编辑距离（Ukkonen 带状 DP）：只计算 |i - j| <= k 的对角带，
+    距离 <= k 时返回距离，否则返回 -1；某一行带内最小值已 > k 时提前结束。
+    行按对角线偏移存储（下标 d = j - i + k），时间 O(k · min(n, m))，空间 O(k)。
+    """
+    n, m = len(a), len(b)
+    if k < 0 or abs(n - m) > k:
+        return -1
+    big = k + 1
+    width = 2 * k + 1
+    # 两端各留一个哨兵格，prev[d + 1] 即 (i-1, j)，prev[d] 即 (i-1, j-1)，cur[d - 1] 即 (i, j-1)
+    prev = [big] * (width + 2)
+    for j in range(0, min(m, k) + 1):
+        prev[j + k + 1] = j
+    for i in range(1, n + 1):
+        cur = [big] * (width + 2)
+        x = a[i - 1]
+        row_min = big
+        if i <= k:
+            cur[k - i + 1] = row_min = i
+        for j in range(max(1, i - k), min(m, i + k) + 1):
+            d = j - i + k + 1
+            if x == b[j - 1]:
+                v = prev[d]
+            else:
+                v = prev[d + 1]
+                if cur[d - 1] < v:
+                    v = cur[d - 1]
+                if prev[d] < v:
+                    v = prev[d]
+                v += 1
+                if v > big:
+                    v = big
+            cur[d] = v
+            if v < row_min:
+                row_min = v
+        if row_min > k:
+            return -1
+        prev = cur
+    res = prev[m - n + k + 1]
+    return res if res <= k else -1
+
+
+def myers_distance(a: Sequence[Any], b: Sequence[Any]) -> int:
+    """
+    Myers / Hyyrö 位并行编辑距离：把较短串的一整列 DP 差分编码成两个位向量，
+    每读入另一串的一个字符只做常数次整数位运算。Python 大整数天然支持任意长度，
+    时间 O(ceil(m / w) · n)，空间 O(σ + m / w)。
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq: Dict[Any, int] = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for c in a:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def _align_full(a: Sequence[Any], b: Sequence[Any]) -> List[Tuple[Any, Any]]:
+    """小规模子问题：完整 DP 表 + 回溯。"""
+    n, m = len(a), len(b)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dp[i][0] = i
+    for j in range(m + 1):
+        dp[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+    out: List[Tuple[Any, Any]] = []
+    i, j = n, m
+    while i or j:
+        if i and j and dp[i][j] == dp[i - 1][j - 1] + (a[i - 1] != b[j - 1]):
+            out.append((a[i - 1], b[j - 1]))
+            i -= 1
+            j -= 1
+        elif i and dp[i][j] == dp[i - 1][j] + 1:
+            out.append((a[i - 1], None))
+            i -= 1
+        else:
+            out.append((None, b[j - 1]))
+            j -= 1
+    out.reverse()
+    return out
+
+
+def hirschberg_alignment(a: Sequence[Any], b: Sequence[Any],
+                         leaf_cells: int = 4096) -> Tuple[int, List[Tuple[Any, Any]]]:
+    """
+    Hirschberg 线性空间对齐：返回 (编辑距离, 对齐列表)。
+    对齐列表每项为 (x, y)：x == y 为匹配，x != y 为替换，(x, None) 为删除，(None, y) 为插入。
+    把 a 从中间切开，用正向 / 反向两行 DP 找 b 的最佳切点，递归两半；
+    子问题 ≤ leaf_cells 个格子时直接用完整 DP 回溯。时间 O(nm)，空间 O(n + m)。
+    """
+    out: List[Tuple[Any, Any]] = []
+    st: List[Tuple[Sequence[Any], Sequence[Any]]] = [(a, b)]
+    while st:  # 显式栈，先左后右输出
+        x, y = st.pop()
+        if len(x) <= 1 or len(y) <= 1 or len(x) * len(y) <= leaf_cells:
+            out.extend(_align_full(x, y))
+            continue
+        mid = len(x) // 2
+        left = _edit_last_row(x[:mid], y)
+        right = _edit_last_row(x[mid:][::-1], y[::-1])
+        m = len(y)
+        cut = min(range(m + 1), key=lambda j: left[j] + right[m - j])
+        st.append((x[mid:], y[cut:]))
+        st.append((x[:mid], y[:cut]))
+    return sum(1 for p, q in out if p != q), out
+
+
+# ---- 相似度连接：找出所有编辑距离 <= k 的字符串对 ----
+
+class BKTree:
+    """
+    BK 树（度量树）：利用三角不等式，查询 d(q, node) = d 时只需进入边标号在 [d-k, d+k] 内的子树。
+    结点以扁平数组存放（words[i]、children[i]: {距离: 子结点}），便于 pickle 到子进程。
+    dist 须是真正的度量，默认用位并行的 myers_distance。
+    """
+    __slots__ = ("words", "children", "dist")
+
+    def __init__(self, words: Iterable[str] = (), dist: Optional[Callable[[str, str], int]] = None):
+        self.words: List[str] = []
+        self.children: List[Dict[int, int]] = []
+        self.dist = dist or myers_distance
+        for w in words:
+            self.add(w)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, word: str) -> int:
+        """插入 word，返回其结点编号（重复插入同一个词也会得到新结点）。"""
+        idx = len(self.words)
+        self.words.append(word)
+        self.children.append({})
+        if idx == 0:
+            return idx
+        node = 0
+        while True:
+            d = self.dist(word, self.words[node])
+            nxt = self.children[node].get(d)
+            if nxt is None:
+                self.children[node][d] = idx
+                return idx
+            node = nxt
+
+    def search(self, word: str, k: int) -> List[Tuple[int, int]]:
+        """返回所有 d(word, w) <= k 的 (结点编号, 距离)。"""
+        if not self.words:
+            return []
+        res: List[Tuple[int, int]] = []
+        st = [0]
+        while st:
+            node = st.pop()
+            d = self.dist(word, self.words[node])
+            if d <= k:
+                res.append((node, d))
+            for e, child in self.children[node].items():
+                if d - k <= e <= d + k:
+                    st.append(child)
+        return res
+
+
+def _qgrams(s: str, q: int) -> Dict[str, int]:
+    cnt: Dict[str, int] = defaultdict(int)
+    for i in range(len(s) - q + 1):
+        cnt[s[i:i + q]] += 1
+    return cnt
+
+
+def _qgram_candidates(strings: Sequence[str], k: int, q: int) -> Iterator[Tuple[int, int]]:
+    """
+    长度过滤 + q-gram 计数过滤：编辑距离 <= k 的两串（较长者长 L）至少共享 L - q + 1 - k·q 个 q-gram。
+    按长度递增处理，倒排表中只保留长度差 <= k 的串；阈值 <= 0 时退化为只按长度过滤。
+    """
+    order = sorted(range(len(strings)), key=lambda i: len(strings[i]))
+    lens = [len(strings[i]) for i in order]
+    grams: List[Dict[str, int]] = [{}] * len(strings)
+    postings: Dict[str, List[int]] = defaultdict(list)   # gram -> 已处理的串（按长度递增）
+    post_lens: Dict[str, List[int]] = defaultdict(list)
+    for pos, i in enumerate(order):
+        li = lens[pos]
+        gi = grams[i] = _qgrams(strings[i], q)
+        need = li - q + 1 - k * q
+        lo = bisect.bisect_left(lens, li - k, 0, pos)
+        if need <= 0:
+            for j in order[lo:pos]:
+                yield j, i
+        else:
+            overlap: Dict[int, int] = defaultdict(int)
+            for g, c in gi.items():
+                plist = postings.get(g)
+                if not plist:
+                    continue
+                for t in range(bisect.bisect_left(post_lens[g], li - k), len(plist)):
+                    j = plist[t]
+                    cj = grams[j][g]
+                    overlap[j] += c if c < cj else cj
+            for j, c in overlap.items():
+                if c >= need:
+                    yield j, i
+        for g in gi:
+            postings[g].append(i)
+            post_lens[g].append(li)
+
+
+def _verify_pairs(args: Tuple[List[Tuple[int, int, str, str]], int]) -> List[Tuple[int, int, int]]:
+    """进程池任务：用带阈值的编辑距离验证候选对。"""
+    batch, k = args
+    out = []
+    for i, j, a, b in batch:
+        d = edit_distance_banded(a, b, k)
+        if d >= 0:
+            out.append((i, j, d) if i < j else (j, i, d))
+    return out
+
+
+_JOIN_TREE: Optional[BKTree] = None
+
+
+def _bk_init(tree: Optional[BKTree]) -> None:
+    global _JOIN_TREE
+    _JOIN_TREE = tree
+
+
+def _bk_probe(args: Tuple[List[int], List[str], int]) -> List[Tuple[int, int, int]]:
+    """进程池任务：对一批串做 BK 树查询，只保留 i < j 的结果。"""
+    ids, words, k = args
+    return [(i, j, d) for i, w in zip(ids, words) for j, d in _JOIN_TREE.search(w, k) if i < j]
+
+
+def similarity_join(strings: Sequence[str], k: int, q: int = 3, method: str = "qgram",
+                    workers: int = 1, batch: int = 4096) -> List[Tuple[int, int, int]]:
+    """
+    自相似连接：返回所有 i < j 且 edit_distance(strings[i], strings[j]) <= k 的 (i, j, 距离)，按 (i, j) 排序。
+    - method="qgram"：长度 + q-gram 计数过滤生成候选，再用 edit_distance_banded(k) 验证
+    - method="bktree"：建 BKTree（结点编号即输入下标），逐串做半径 k 的查询
+    workers > 1 时把验证 / 查询按 batch 分块交给进程池。
+    q 越大倒排表越短、过滤越快，但阈值 L - q + 1 - k·q 也越低；短串或大 k 时取小一些。
+    """
+    if k < 0:
+        return []
+    if method == "qgram":
+        jobs: List[Any] = []
+        cur: List[Tuple[int, int, str, str]] = []
+        for i, j in _qgram_candidates(strings, k, q):
+            cur.append((i, j, strings[i], strings[j]))
+            if len(cur) >= batch:
+                jobs.append((cur, k))
+                cur = []
+        if cur:
+            jobs.append((cur, k))
+        task, init, initargs = _verify_pairs, None, ()
+    elif method == "bktree":
+        tree = BKTree(strings)
+        jobs = [(list(range(lo, min(lo + batch, len(strings)))), list(strings[lo:lo + batch]), k)
+                for lo in range(0, len(strings), batch)]
+        task, init, initargs = _bk_probe, _bk_init, (tree,)
+    else:
+        raise ValueError(f"unknown method: {method!r}")
+
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=init, initargs=initargs) as pool:
+            parts = list(pool.map(task, jobs))
+    else:
+        try:
+            if init is not None:
+                init(*initargs)
+            parts = [task(job) for job in jobs]
+        finally:
+            _bk_init(None)
+    res = [t for part in parts for t in part]
+    res.sort()
+    return res
+
+
 # ============================================================
 # 6) 字符串算法
 # ============================================================
@@ -495,11 +3013,122 @@ def kmp_search(s: str, p: str) -> int:
     return -1
 
 
+class KMPMatcher:
+    """
+    流式 KMP：模式建一次，文本分块 feed，跨块边界保留自动机状态，返回全部（可重叠）匹配的起始偏移。
+    - 文本块可为 str、bytes、bytearray 或 memoryview（按元素比较，不解码、不拼接）
+    - 状态为 0 时，对支持 find 的块直接跳到模式首元素的下一次出现
+    - finditer(chunks)：对任意块迭代器逐个产出偏移
+    """
+    __slots__ = ("pattern", "pi", "state", "pos")
+
+    def __init__(self, pattern: Union[str, bytes]):
+        if not pattern:
+            raise ValueError("pattern must be non-empty")
+        self.pattern = pattern
+        self.pi = kmp_build(pattern)
+        self.state = 0  # 已匹配的模式前缀长度
+        self.pos = 0    # 已读入的元素总数
+
+    def reset(self) -> None:
+        self.state = 0
+        self.pos = 0
+
+    def feed(self, chunk: Union[str, bytes, bytearray, memoryview]) -> List[int]:
+        """读入一块，返回本块内完成的所有匹配的起始偏移（相对整个流）。"""
+        if isinstance(chunk, memoryview) and chunk.format != "B":
+            chunk = chunk.cast("B")
+        p, pi, m = self.pattern, self.pi, len(self.pattern)
+        find = getattr(chunk, "find", None)
+        first = p[:1]
+        base = self.pos - m + 1
+        j = self.state
+        out: List[int] = []
+        i, n = 0, len(chunk)
+        while i < n:
+            if j == 0 and find is not None:
+                i = find(first, i)
+                if i < 0:
+                    break
+            c = chunk[i]
+            while j > 0 and c != p[j]:
+                j = pi[j - 1]
+            if c == p[j]:
+                j += 1
+                if j == m:
+                    out.append(base + i)
+                    j = pi[j - 1]
+            i += 1
+        self.state = j
+        self.pos += n
+        return out
+
+    def finditer(self, chunks: Iterable[Union[str, bytes, bytearray, memoryview]]) -> Iterator[int]:
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+
+def z_function(s: Sequence[Any]) -> List[int]:
+    """Z 函数：z[i] = LCP(s, s[i:])，约定 z[0] = len(s)。O(n)。"""
+    n = len(s)
+    z = [0] * n
+    if n:
+        z[0] = n
+    l = r = 0
+    for i in range(1, n):
+        k = min(z[i - l], r - i) if i < r else 0
+        while i + k < n and s[k] == s[i + k]:
+            k += 1
+        z[i] = k
+        if i + k > r:
+            l, r = i, i + k
+    return z
+
+
+def z_extend(text: Sequence[Any], p: Sequence[Any]) -> List[int]:
+    """
+    扩展 Z（exKMP）：ext[i] = LCP(text[i:], p)。
+    复用 p 的 Z 函数，不需要拼接 p + 分隔符 + text，对 bytes / memoryview 同样零拷贝。O(n + m)。
+    """
+    n, m = len(text), len(p)
+    z = z_function(p)
+    ext = [0] * n
+    l = r = 0  # text[l:r] == p[:r-l]
+    for i in range(n):
+        if i < r:
+            k = z[i - l]
+            if k < r - i:
+                ext[i] = k
+                continue
+            k = r - i
+        else:
+            k = 0
+        while i + k < n and k < m and text[i + k] == p[k]:
+            k += 1
+        ext[i] = k
+        if i + k > r:
+            l, r = i, i + k
+    return ext
+
+
+def z_find_all(text: Sequence[Any], p: Sequence[Any]) -> List[int]:
+    """p 在 text 中所有（可重叠）出现的起点。"""
+    if not p:
+        return list(range(len(text) + 1))
+    m = len(p)
+    return [i for i, k in enumerate(z_extend(text, p)) if k >= m]
+
+
+def z_count_many(text: Sequence[Any], patterns: Iterable[Sequence[Any]]) -> Dict[Any, int]:
+    """批量统计每个模式在 text 中的出现次数（可重叠）：{模式: 次数}。"""
+    return {p: len(z_find_all(text, p)) for p in patterns}
+
+
 def rolling_hash_getter(s: str, base: int = 911382323, mod: int = 10**9 + 7) -> Callable[[int, int], int]:
     """
     Rolling Hash：预处理后 O(1) 取得子串 hash。
     get(l,r) 表示 s[l:r] 的 hash。
-    说明：哈希存在碰撞可能，工程中可双模或与其他判定结合。
+    说明：哈希存在碰撞可能，工程中可双模或与其他判定结合（见 RollingHash）。
     """
     n = len(s)
     p = [1] * (n + 1)
@@ -514,6 +3143,454 @@ def rolling_hash_getter(s: str, base: int = 911382323, mod: int = 10**9 + 7) ->
     return get
 
 
+class RollingHash:
+    """
+    双模多项式哈希：两个 31 位素数模、每个实例随机取底数，合成 62 位哈希值，碰撞概率约 n² / 2^62。
+    hash(s[l:r]) = Σ (s[j] + 1) · B^(r-1-j)（编码 +1，避免 "\\0" 前缀与空串同哈希）。
+    - 有 NumPy：幂 / 逆元幂按块倍增生成，前缀哈希由 cumsum 一次算出（乘积 < 2^62，int64 不溢出）
+    - get_many(ranges) / window_hashes(m)：批量取哈希，NumPy 模式下返回数组，否则返回 list
+    """
+
+    MODS = (2147483647, 2147483629)
+
+    def __init__(self, text: Union[str, bytes], bases: Optional[Tuple[int, int]] = None, seed: Optional[int] = None):
+        if bases is None:
+            rnd = random.Random(seed)
+            bases = tuple(rnd.randrange(1 << 16, m - 1) for m in self.MODS)
+        self.text = text
+        self.bases = bases
+        self.n = n = len(text)
+        self.h: List[Any] = []
+        self.p: List[Any] = []
+        if np is not None:
+            codes = _text_codes(text).astype(np.int64) + 1
+            for b, m in zip(bases, self.MODS):
+                pw = self._powers_np(b, m, n + 1)
+                inv = self._powers_np(pow(b, m - 2, m), m, n + 1)
+                # Σ_{j<i} c_j · B^(-j-1) 再乘 B^i，即得前缀哈希
+                acc = np.zeros(n + 1, dtype=np.int64)
+                np.cumsum(codes * inv[1:] % m, out=acc[1:])
+                self.h.append(acc % m * pw % m)
+                self.p.append(pw)
+        else:
+            codes = _text_codes(text)
+            for b, m in zip(bases, self.MODS):
+                h, pw = [0] * (n + 1), [1] * (n + 1)
+                for i, c in enumerate(codes):
+                    h[i + 1] = (h[i] * b + c + 1) % m
+                    pw[i + 1] = pw[i] * b % m
+                self.h.append(h)
+                self.p.append(pw)
+
+    @staticmethod
+    def _powers_np(b: int, m: int, length: int) -> Any:
+        """[b^0, b^1, ..., b^(length-1)] mod m，按块倍增：P[L:2L] = P[:L] · b^L。"""
+        pw = np.ones(length, dtype=np.int64)
+        filled = 1
+        while filled < length:
+            step = min(filled, length - filled)
+            pw[filled:filled + step] = pw[:step] * pow(b, filled, m) % m
+            filled += step
+        return pw
+
+    def __len__(self) -> int:
+        return self.n
+
+    def get(self, l: int, r: int) -> int:
+        """text[l:r] 的哈希（62 位整数）。"""
+        (h1, h2), (p1, p2), (m1, m2) = self.h, self.p, self.MODS
+        a = (int(h1[r]) - int(h1[l]) * int(p1[r - l])) % m1
+        b = (int(h2[r]) - int(h2[l]) * int(p2[r - l])) % m2
+        return a << 31 | b
+
+    def get_many(self, ranges: Iterable[Tuple[int, int]]) -> Any:
+        """批量取 text[l:r] 的哈希。"""
+        if np is None:
+            return [self.get(l, r) for l, r in ranges]
+        lr = np.asarray(list(ranges) if not isinstance(ranges, np.ndarray) else ranges, dtype=np.int64).reshape(-1, 2)
+        return self._combine(lr[:, 0], lr[:, 1])
+
+    def _combine(self, ls: Any, rs: Any) -> Any:
+        out = []
+        for h, pw, m in zip(self.h, self.p, self.MODS):
+            out.append((h[rs] - h[ls] * pw[rs - ls] % m) % m)
+        return out[0] << 31 | out[1]
+
+    def window_hashes(self, m: int) -> Any:
+        """所有长度为 m 的窗口 text[i:i+m] 的哈希，i = 0..n-m。"""
+        if m > self.n:
+            return np.zeros(0, dtype=np.int64) if np is not None else []
+        if np is None:
+            return [self.get(i, i + m) for i in range(self.n - m + 1)]
+        ls = np.arange(self.n - m + 1, dtype=np.int64)
+        return self._combine(ls, ls + m)
+
+    def hash_of(self, s: Union[str, bytes]) -> int:
+        """用同一组底数计算任意串的哈希，可直接与 get() 比较。"""
+        codes = [ord(c) for c in s] if isinstance(s, str) else list(s)
+        out = 0
+        for b, m in zip(self.bases, self.MODS):
+            h = 0
+            for c in codes:
+                h = (h * b + c + 1) % m
+            out = out << 31 | h
+        return out
+
+
+def rabin_karp_multi(text: Union[str, bytes], patterns: Iterable[Union[str, bytes]],
+                     rh: Optional[RollingHash] = None) -> Dict[Any, List[int]]:
+    """
+    Rabin–Karp 多模式匹配：模式按长度分组，每种长度只算一遍窗口哈希，
+    与该组模式哈希集合比对后再逐个核对原文（排除碰撞）。返回 {模式: 出现位置列表（升序，可重叠）}。
+    总时间 O(n · 不同长度数 + 命中数 · m)。
+    """
+    rh = rh or RollingHash(text)
+    res: Dict[Any, List[int]] = {}
+    by_len: Dict[int, Dict[int, List[Any]]] = defaultdict(lambda: defaultdict(list))
+    for pat in patterns:
+        if pat in res:
+            continue
+        res[pat] = []
+        if 0 < len(pat) <= len(text):
+            by_len[len(pat)][rh.hash_of(pat)].append(pat)
+    for m, table in by_len.items():
+        wins = rh.window_hashes(m)
+        if np is not None:
+            keys = np.fromiter(table.keys(), dtype=np.int64, count=len(table))
+            hits = np.flatnonzero(np.isin(wins, keys)).tolist()
+            hit_hashes = wins[hits].tolist()
+        else:
+            hits = [i for i, x in enumerate(wins) if x in table]
+            hit_hashes = [wins[i] for i in hits]
+        for i, x in zip(hits, hit_hashes):
+            for pat in table[x]:
+                if text[i:i + m] == pat:
+                    res[pat].append(i)
+    return res
+
+
+def duplicate_substrings(text: Union[str, bytes], m: int,
+                         rh: Optional[RollingHash] = None) -> Dict[Any, List[int]]:
+    """
+    所有出现至少两次的长度为 m 的子串：{子串: 出现位置列表}。
+    窗口哈希排序后分组（NumPy 下 argsort），同一哈希组内再按原文核对。
+    """
+    rh = rh or RollingHash(text)
+    if m <= 0 or m > len(text):
+        return {}
+    wins = rh.window_hashes(m)
+    if np is not None:
+        order = np.argsort(wins, kind="stable")
+        sw = wins[order]
+        bounds = np.flatnonzero(np.diff(sw)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(sw)]))
+        multi = ends - starts >= 2
+        groups = [order[a:b].tolist() for a, b in zip(starts[multi].tolist(), ends[multi].tolist())]
+    else:
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for i, x in enumerate(wins):
+            buckets[x].append(i)
+        groups = [g for g in buckets.values() if len(g) >= 2]
+    res: Dict[Any, List[int]] = {}
+    for g in groups:
+        exact: Dict[Any, List[int]] = defaultdict(list)
+        for i in g:
+            exact[text[i:i + m]].append(i)
+        for sub, pos in exact.items():
+            if len(pos) >= 2:
+                res[sub] = sorted(pos)
+    return res
+
+
+def longest_duplicate_substring(text: Union[str, bytes], rh: Optional[RollingHash] = None) -> Union[str, bytes]:
+    """最长的出现至少两次（可重叠）的子串：对长度二分 + duplicate_substrings。O(n log n)。"""
+    rh = rh or RollingHash(text)
+    lo, hi, best = 1, len(text) - 1, text[:0]
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        dup = duplicate_substrings(text, mid, rh)
+        if dup:
+            best = min(dup, key=lambda t: dup[t][0])
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+# ---- 后缀数组 / LCP / 后缀自动机：对同一大文本反复查询多个模式 ----
+
+def _text_codes(text: Union[str, bytes]) -> Any:
+    """str 按码点、bytes 按字节转成整数序列（NumPy 下为数组）。"""
+    if np is not None:
+        if isinstance(text, str):
+            return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        return np.frombuffer(bytes(text), dtype=np.uint8)
+    return [ord(c) for c in text] if isinstance(text, str) else list(text)
+
+
+def suffix_array(text: Union[str, bytes]) -> array:
+    """
+    后缀数组（倍增）：sa[i] 为字典序第 i 小的后缀起点。
+    - 有 NumPy：每轮把 (rank[i], rank[i+k]) 合成一个 int64 键后整体 argsort，O(n log² n) 但全是向量操作
+    - 无 NumPy：同样的倍增，用 list.sort
+    返回 array('i')。
+    """
+    n = len(text)
+    if n == 0:
+        return array("i")
+    codes = _text_codes(text)
+    if np is not None:
+        _, rank = np.unique(codes, return_inverse=True)
+        rank = rank.astype(np.int64).reshape(-1)
+        k = 1
+        while True:
+            second = np.zeros(n, dtype=np.int64)
+            second[:n - k] = rank[k:] + 1
+            key = rank * (n + 1) + second
+            sa = np.argsort(key, kind="stable")
+            sk = key[sa]
+            rank = np.empty(n, dtype=np.int64)
+            rank[sa[0]] = 0
+            rank[sa[1:]] = np.cumsum(sk[1:] != sk[:-1])
+            if rank[sa[-1]] == n - 1 or k >= n:
+                break
+            k <<= 1
+        return array("i", sa.astype(np.int32).tobytes())
+    alpha = {c: i for i, c in enumerate(sorted(set(codes)))}
+    rk = [alpha[c] for c in codes]
+    sa = list(range(n))
+    k = 1
+    while True:
+        key = [(rk[i], rk[i + k] + 1 if i + k < n else 0) for i in range(n)]
+        sa.sort(key=key.__getitem__)
+        nr = [0] * n
+        for t in range(1, n):
+            nr[sa[t]] = nr[sa[t - 1]] + (key[sa[t]] != key[sa[t - 1]])
+        rk = nr
+        if rk[sa[-1]] == n - 1 or k >= n:
+            break
+        k <<= 1
+    return array("i", sa)
+
+
+def lcp_kasai(text: Union[str, bytes], sa: Sequence[int]) -> array:
+    """Kasai LCP：lcp[i] = LCP(后缀 sa[i-1], 后缀 sa[i])，lcp[0] = 0。O(n)。"""
+    n = len(sa)
+    rank = [0] * n
+    for i, p in enumerate(sa):
+        rank[p] = i
+    lcp = array("i", bytes(4 * n))
+    h = 0
+    for i in range(n):
+        r = rank[i]
+        if r == 0:
+            h = 0
+            continue
+        j = sa[r - 1]
+        while i + h < n and j + h < n and text[i + h] == text[j + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return lcp
+
+
+class SuffixIndex:
+    """
+    基于后缀数组 + LCP 的静态文本索引（str 或 bytes），建一次、查多次：
+    - find_range(p) / count(p) / find_all(p) / contains(p)：二分 SA，O(|p| log n)
+    - longest_repeated()：最大 LCP
+    - distinct_substrings()：n(n+1)/2 - Σlcp
+    save / load：SA、LCP 以 mmap 零拷贝映射（文本解码一次载入内存）。
+    """
+
+    MAGIC = b"SUFIDX1\0"
+
+    def __init__(self, text: Union[str, bytes], sa: Any = None, lcp: Any = None):
+        self.text = text
+        self.sa = suffix_array(text) if sa is None else sa
+        self.lcp = lcp_kasai(text, self.sa) if lcp is None else lcp
+        self._mm: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def find_range(self, p: Union[str, bytes]) -> Tuple[int, int]:
+        """返回以 p 为前缀的后缀在 SA 中的区间 [lo, hi)。"""
+        text, sa, m = self.text, self.sa, len(p)
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = sa[mid]
+            if text[i:i + m] < p:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = sa[mid]
+            if text[i:i + m] == p:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def count(self, p: Union[str, bytes]) -> int:
+        """p 的出现次数（可重叠）。"""
+        lo, hi = self.find_range(p)
+        return hi - lo
+
+    def contains(self, p: Union[str, bytes]) -> bool:
+        return self.count(p) > 0
+
+    def find_all(self, p: Union[str, bytes]) -> List[int]:
+        """p 的所有出现位置（升序）。"""
+        lo, hi = self.find_range(p)
+        return sorted(self.sa[lo:hi])
+
+    def longest_repeated(self) -> Union[str, bytes]:
+        """至少出现两次（可重叠）的最长子串；没有返回空串。"""
+        if len(self.lcp) < 2:
+            return self.text[:0]
+        best = max(range(len(self.lcp)), key=self.lcp.__getitem__)
+        i = self.sa[best]
+        return self.text[i:i + self.lcp[best]]
+
+    def distinct_substrings(self) -> int:
+        """不同非空子串个数。"""
+        n = len(self.text)
+        return n * (n + 1) // 2 - sum(self.lcp)
+
+    def save(self, path: str) -> None:
+        is_str = isinstance(self.text, str)
+        raw = self.text.encode("utf-32-le") if is_str else bytes(self.text)
+        _save_arrays(path, self.MAGIC, [int(is_str)], [raw, self.sa, self.lcp])
+
+    @classmethod
+    def load(cls, path: str) -> "SuffixIndex":
+        """mmap 只读映射 SA / LCP；用完可调用 close()。"""
+        mm, meta, (raw, sa, lcp) = _load_arrays(path, cls.MAGIC)
+        text = bytes(raw)
+        raw.release()
+        idx = cls(text.decode("utf-32-le") if meta[0] else text, sa, lcp)
+        idx._mm = mm
+        return idx
+
+    def close(self) -> None:
+        if self._mm is not None:
+            _close_mapping(self._mm, (self.sa, self.lcp))
+            self._mm = None
+
+
+class SuffixAutomaton:
+    """
+    后缀自动机（SAM）：识别 text 全部子串的最小 DFA，状态数 <= 2n，O(n) 在线构建。
+    - contains(p) / count(p)：O(|p|)，count 为出现次数（endpos 集合大小）
+    - distinct_substrings()：Σ(len[v] - len[link[v]])
+    - longest_common_substring(t)：与另一串的最长公共子串
+    """
+    __slots__ = ("next", "link", "length", "occ", "last", "_counts")
+
+    def __init__(self, text: Union[str, bytes, Iterable[Any]] = ""):
+        self.next: List[Dict[Any, int]] = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.occ = [0]
+        self.last = 0
+        self._counts: Optional[List[int]] = None
+        for c in text:
+            self.extend(c)
+
+    def extend(self, c: Any) -> None:
+        nxt, link, length, occ = self.next, self.link, self.length, self.occ
+        cur = len(nxt)
+        nxt.append({})
+        length.append(length[self.last] + 1)
+        link.append(0)
+        occ.append(1)
+        p = self.last
+        while p != -1 and c not in nxt[p]:
+            nxt[p][c] = cur
+            p = link[p]
+        if p != -1:
+            q = nxt[p][c]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(nxt)
+                nxt.append(dict(nxt[q]))
+                length.append(length[p] + 1)
+                link.append(link[q])
+                occ.append(0)
+                while p != -1 and nxt[p].get(c) == q:
+                    nxt[p][c] = clone
+                    p = link[p]
+                link[q] = link[cur] = clone
+        self.last = cur
+        self._counts = None
+
+    def _walk(self, p: Iterable[Any]) -> int:
+        v = 0
+        for c in p:
+            v = self.next[v].get(c, -1)
+            if v < 0:
+                return -1
+        return v
+
+    def contains(self, p: Iterable[Any]) -> bool:
+        return self._walk(p) >= 0
+
+    def count(self, p: Iterable[Any]) -> int:
+        """p 的出现次数（空串按 n 计，与 SuffixIndex 一致）。首次调用时按 len 计数排序、沿后缀链接累加 endpos 大小，O(n)。"""
+        v = self._walk(p)
+        if v < 0:
+            return 0
+        if v == 0:
+            return self.length[self.last]
+        return self._endpos_counts()[v]
+
+    def _endpos_counts(self) -> List[int]:
+        cnt = self._counts
+        if cnt is None:
+            length, link = self.length, self.link
+            buckets = [0] * (length[self.last] + 2)
+            for l in length:
+                buckets[l] += 1
+            for i in range(1, len(buckets)):
+                buckets[i] += buckets[i - 1]
+            order = [0] * len(length)
+            for v in range(len(length) - 1, -1, -1):
+                buckets[length[v]] -= 1
+                order[buckets[length[v]]] = v
+            cnt = self.occ[:]
+            for v in reversed(order):
+                if link[v] >= 0:
+                    cnt[link[v]] += cnt[v]
+            self._counts = cnt
+        return cnt
+
+    def distinct_substrings(self) -> int:
+        length, link = self.length, self.link
+        return sum(length[v] - length[link[v]] for v in range(1, len(length)))
+
+    def longest_common_substring(self, t: Sequence[Any]) -> Tuple[int, int]:
+        """返回 (长度, t 中的结束位置 + 1)，即 t[end - 长度:end] 同时是两串的子串。"""
+        nxt, link, length = self.next, self.link, self.length
+        v, l, best, end = 0, 0, 0, 0
+        for i, c in enumerate(t):
+            while v and c not in nxt[v]:
+                v = link[v]
+                l = length[v]
+            if c in nxt[v]:
+                v = nxt[v][c]
+                l += 1
+            if l > best:
+                best, end = l, i + 1
+        return best, end
+
+
 # ============================================================
 # 7) 区间 / 查询：前缀和、差分、线段树
 # ============================================================
@@ -522,10 +3599,12 @@ def prefix_sum_getter(a: Sequence[int]) -> Callable[[int, int], int]:
     """
     前缀和：O(1) 区间求和。
     range_sum(l,r) 返回 a[l:r] 的和。
+    a 为 NumPy 数组时用 prefix_sums_np（cumsum），否则用 itertools.accumulate（保持 Python 大整数精度）。
     """
-    ps = [0]
-    for x in a:
-        ps.append(ps[-1] + x)
+    if np is not None and isinstance(a, np.ndarray):
+        ps: Any = prefix_sums_np(a)
+    else:
+        ps = [0, *itertools.accumulate(a)]
 
     def range_sum(l: int, r: int) -> int:
         return ps[r] - ps[l]
@@ -538,7 +3617,12 @@ def difference_range_add(n: int, ops: List[Tuple[int, int, int]]) -> List[int]:
     差分：对区间 [l, r]（闭区间）加 val。
     ops: (l, r, val)
     时间 O(n + len(ops))。
+    装了 NumPy 且 Σ|val| < 2^63（累加不会溢出 int64）时转交 difference_range_add_np，否则走纯 Python 大整数。
     """
+    if np is not None and ops:
+        ls, rs, vals = zip(*ops)
+        if sum(abs(v) for v in vals) < 1 << 63:
+            return difference_range_add_np(n, ls, rs, vals).tolist()
     diff = [0] * (n + 1)
     for l, r, val in ops:
         diff[l] += val
@@ -552,6 +3636,78 @@ def difference_range_add(n: int, ops: List[Tuple[int, int, int]]) -> List[int]:
     return out
 
 
+# ---- NumPy 向量化版本：一次处理百万级数据 / 操作，返回数组 ----
+
+def _sum_dtype(dt: Any) -> Any:
+    """累加用的 dtype：无符号整数保持 uint64（提升到 int64 公共类型会变成 float64 丢精度），其余与 int64 取公共类型。"""
+    return np.dtype(np.uint64) if dt.kind == "u" else np.result_type(dt, np.int64)
+
+
+def prefix_sums_np(a: Any) -> Any:
+    """一维前缀和数组 ps（长度 n+1，ps[0] = 0），a[l:r] 的和 = ps[r] - ps[l]。"""
+    _require_numpy()
+    a = np.asarray(a)
+    ps = np.zeros(len(a) + 1, dtype=_sum_dtype(a.dtype))
+    np.cumsum(a, out=ps[1:])
+    return ps
+
+
+def range_sums_np(ps: Any, ls: Any, rs: Any) -> Any:
+    """批量区间和：返回 a[ls[i]:rs[i]] 的和组成的数组（半开区间，同 prefix_sum_getter）。"""
+    _require_numpy()
+    return ps[np.asarray(rs)] - ps[np.asarray(ls)]
+
+
+def prefix_sums_2d_np(m: Any) -> Any:
+    """
+    二维前缀和 P（形状 (R+1, C+1)，首行首列为 0）：
+    矩形 m[r1:r2, c1:c2] 的和 = P[r2,c2] - P[r1,c2] - P[r2,c1] + P[r1,c1]。
+    """
+    _require_numpy()
+    m = np.asarray(m)
+    R, C = m.shape
+    P = np.zeros((R + 1, C + 1), dtype=_sum_dtype(m.dtype))
+    np.cumsum(m, axis=0, out=P[1:, 1:])
+    np.cumsum(P[1:, 1:], axis=1, out=P[1:, 1:])
+    return P
+
+
+def rect_sums_np(P: Any, r1: Any, c1: Any, r2: Any, c2: Any) -> Any:
+    """批量矩形和（半开区间 [r1, r2) × [c1, c2)），P 来自 prefix_sums_2d_np。"""
+    _require_numpy()
+    r1, c1, r2, c2 = (np.asarray(x) for x in (r1, c1, r2, c2))
+    return P[r2, c2] - P[r1, c2] - P[r2, c1] + P[r1, c1]
+
+
+def difference_range_add_np(n: int, ls: Any, rs: Any, vals: Any) -> Any:
+    """
+    批量差分：对每个闭区间 [ls[i], rs[i]] 加 vals[i]，返回长度 n 的结果数组。
+    np.add.at 处理重复端点，O(n + 操作数)，全程无 Python 循环。rs[i] >= n 视为延伸到末尾。
+    """
+    _require_numpy()
+    ls = np.asarray(ls, dtype=np.int64)
+    rs = np.asarray(rs, dtype=np.int64)
+    vals = np.asarray(vals)
+    diff = np.zeros(n + 1, dtype=_sum_dtype(vals.dtype))
+    np.add.at(diff, ls, vals)
+    np.subtract.at(diff, np.minimum(rs + 1, n), vals)
+    return np.cumsum(diff[:n])
+
+
+def difference_rect_add_np(R: int, C: int, r1: Any, c1: Any, r2: Any, c2: Any, vals: Any) -> Any:
+    """二维差分：对每个闭矩形 [r1..r2] × [c1..c2] 加 vals[i]，返回 (R, C) 数组；越界的 r2 / c2 截到边上。"""
+    _require_numpy()
+    r1, c1, r2, c2 = (np.asarray(x, dtype=np.int64) for x in (r1, c1, r2, c2))
+    vals = np.asarray(vals)
+    diff = np.zeros((R + 1, C + 1), dtype=_sum_dtype(vals.dtype))
+    r2, c2 = np.minimum(r2 + 1, R), np.minimum(c2 + 1, C)
+    np.add.at(diff, (r1, c1), vals)
+    np.subtract.at(diff, (r1, c2), vals)
+    np.subtract.at(diff, (r2, c1), vals)
+    np.add.at(diff, (r2, c2), vals)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:R, :C]
+
+
 class SegTreeSum:
     """
     线段树：区间和 + 单点更新。
@@ -612,6 +3768,375 @@ class SegTreeSum:
         return go(1, 0, self.n - 1)
 
 
+class SegTree:
+    """
+    非递归线段树（幺半群通用版）：叶子放在 [size, 2*size)，size 为 >= n 的 2 的幂。
+    - op：满足结合律的二元运算；e：单位元（如 sum 用 (operator.add, 0)，min 用 (min, INF)）
+    - build O(n)，set / query O(log n)，每次操作只是一个 while 循环，没有递归和闭包
+    - query(l, r) 为闭区间 [l, r]，与 SegTreeSum 一致；op 不要求交换律
+    - query_many / update_many：批量接口，省去逐次方法调用的开销
+    """
+
+    def __init__(self, a: Sequence[Any], op: Callable[[Any, Any], Any], e: Any):
+        self.n = len(a)
+        self.op = op
+        self.e = e
+        self.size = 1 << max(self.n - 1, 0).bit_length()
+        self.d = [e] * (2 * self.size)
+        self.d[self.size:self.size + self.n] = a
+        for i in range(self.size - 1, 0, -1):
+            self.d[i] = op(self.d[2 * i], self.d[2 * i + 1])
+
+    def set(self, pos: int, val: Any) -> None:
+        if not (0 <= pos < self.n):
+            raise IndexError("pos out of range")
+        d, op = self.d, self.op
+        i = pos + self.size
+        d[i] = val
+        i >>= 1
+        while i:
+            d[i] = op(d[2 * i], d[2 * i + 1])
+            i >>= 1
+
+    def get(self, pos: int) -> Any:
+        return self.d[pos + self.size]
+
+    def query(self, ql: int, qr: int) -> Any:
+        """闭区间 [ql, qr] 的 op 聚合。"""
+        if not (0 <= ql <= qr < self.n):
+            raise IndexError("query range out of bounds")
+        d, op = self.d, self.op
+        sml = smr = self.e
+        l, r = ql + self.size, qr + self.size + 1
+        while l < r:
+            if l & 1:
+                sml = op(sml, d[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                smr = op(d[r], smr)
+            l >>= 1
+            r >>= 1
+        return op(sml, smr)
+
+    def query_many(self, ranges: Iterable[Tuple[int, int]]) -> List[Any]:
+        query = self.query
+        return [query(l, r) for l, r in ranges]
+
+    def update_many(self, updates: Iterable[Tuple[int, Any]]) -> None:
+        """批量单点赋值：先改所有叶子，再只重算受影响的祖先（每层去重）。"""
+        d, op, size = self.d, self.op, self.size
+        dirty = set()
+        for pos, val in updates:
+            if not (0 <= pos < self.n):
+                raise IndexError("pos out of range")
+            d[pos + size] = val
+            dirty.add((pos + size) >> 1)
+        while dirty:
+            nxt = set()
+            for i in dirty:
+                d[i] = op(d[2 * i], d[2 * i + 1])
+                if i > 1:
+                    nxt.add(i >> 1)
+            dirty = nxt
+
+
+class LazySegTree:
+    """
+    非递归懒标记线段树（AtCoder Library 风格），支持区间修改 + 区间查询。
+    参数（幺半群作用）：
+    - op / e：节点值的合并与单位元
+    - mapping(f, x)：把标记 f 作用到节点值 x；composition(f, g)：先 g 后 f 的复合标记；idf：恒等标记
+    apply(l, r, f) 与 query(l, r) 均为闭区间，O(log n)；自底向上 push/pull，无递归。
+    """
+
+    def __init__(self, a: Sequence[Any], op: Callable[[Any, Any], Any], e: Any,
+                 mapping: Callable[[Any, Any], Any], composition: Callable[[Any, Any], Any], idf: Any):
+        self.n = len(a)
+        self.op, self.e = op, e
+        self.mapping, self.composition, self.idf = mapping, composition, idf
+        self.log = max(self.n - 1, 0).bit_length()
+        self.size = 1 << self.log
+        self.d = [e] * (2 * self.size)
+        self.lz = [idf] * self.size
+        self.d[self.size:self.size + self.n] = a
+        for i in range(self.size - 1, 0, -1):
+            self._pull(i)
+
+    def _pull(self, k: int) -> None:
+        self.d[k] = self.op(self.d[2 * k], self.d[2 * k + 1])
+
+    def _apply_node(self, k: int, f: Any) -> None:
+        self.d[k] = self.mapping(f, self.d[k])
+        if k < self.size:
+            self.lz[k] = self.composition(f, self.lz[k])
+
+    def _push(self, k: int) -> None:
+        f = self.lz[k]
+        if f is not self.idf:
+            self._apply_node(2 * k, f)
+            self._apply_node(2 * k + 1, f)
+            self.lz[k] = self.idf
+
+    def _check(self, l: int, r: int) -> None:
+        if not (0 <= l <= r < self.n):
+            raise IndexError("range out of bounds")
+
+    def get(self, pos: int) -> Any:
+        return self.query(pos, pos)
+
+    def set(self, pos: int, val: Any) -> None:
+        self._check(pos, pos)
+        p = pos + self.size
+        for i in range(self.log, 0, -1):
+            self._push(p >> i)
+        self.d[p] = val
+        for i in range(1, self.log + 1):
+            self._pull(p >> i)
+
+    def query(self, ql: int, qr: int) -> Any:
+        """闭区间 [ql, qr] 的 op 聚合。"""
+        self._check(ql, qr)
+        l, r = ql + self.size, qr + self.size + 1
+        for i in range(self.log, 0, -1):
+            if ((l >> i) << i) != l:
+                self._push(l >> i)
+            if ((r >> i) << i) != r:
+                self._push((r - 1) >> i)
+        d, op = self.d, self.op
+        sml = smr = self.e
+        while l < r:
+            if l & 1:
+                sml = op(sml, d[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                smr = op(d[r], smr)
+            l >>= 1
+            r >>= 1
+        return op(sml, smr)
+
+    def apply(self, ql: int, qr: int, f: Any) -> None:
+        """对闭区间 [ql, qr] 施加标记 f。"""
+        self._check(ql, qr)
+        l, r = ql + self.size, qr + self.size + 1
+        for i in range(self.log, 0, -1):
+            if ((l >> i) << i) != l:
+                self._push(l >> i)
+            if ((r >> i) << i) != r:
+                self._push((r - 1) >> i)
+        l2, r2 = l, r
+        while l < r:
+            if l & 1:
+                self._apply_node(l, f)
+                l += 1
+            if r & 1:
+                r -= 1
+                self._apply_node(r, f)
+            l >>= 1
+            r >>= 1
+        l, r = l2, r2
+        for i in range(1, self.log + 1):
+            if ((l >> i) << i) != l:
+                self._pull(l >> i)
+            if ((r >> i) << i) != r:
+                self._pull((r - 1) >> i)
+
+    def query_many(self, ranges: Iterable[Tuple[int, int]]) -> List[Any]:
+        query = self.query
+        return [query(l, r) for l, r in ranges]
+
+    def apply_many(self, ops: Iterable[Tuple[int, int, Any]]) -> None:
+        apply = self.apply
+        for l, r, f in ops:
+            apply(l, r, f)
+
+
+class RangeTree(LazySegTree):
+    """
+    区间加 / 区间赋值 + 区间 sum / min / max 的现成实例。
+    节点值 (sum, min, max, len)，标记 (assign 或 None, add)：先赋值再加。
+    """
+
+    _E = (0, math.inf, -math.inf, 0)
+    _ID = (None, 0)
+
+    def __init__(self, a: Sequence[int]):
+        super().__init__([(x, x, x, 1) for x in a], self._op, self._E,
+                         self._mapping, self._composition, self._ID)
+
+    @staticmethod
+    def _op(x: Tuple, y: Tuple) -> Tuple:
+        return (x[0] + y[0], x[1] if x[1] < y[1] else y[1], x[2] if x[2] > y[2] else y[2], x[3] + y[3])
+
+    @staticmethod
+    def _mapping(f: Tuple, x: Tuple) -> Tuple:
+        if x[3] == 0:
+            return x
+        assign, add = f
+        if assign is not None:
+            v = assign + add
+            return (v * x[3], v, v, x[3])
+        return (x[0] + add * x[3], x[1] + add, x[2] + add, x[3])
+
+    @staticmethod
+    def _composition(f: Tuple, g: Tuple) -> Tuple:
+        if f[0] is not None:
+            return f
+        return (g[0], g[1] + f[1])
+
+    def range_add(self, l: int, r: int, v: int) -> None:
+        self.apply(l, r, (None, v))
+
+    def range_assign(self, l: int, r: int, v: int) -> None:
+        self.apply(l, r, (v, 0))
+
+    def range_sum(self, l: int, r: int) -> int:
+        return self.query(l, r)[0]
+
+    def range_min(self, l: int, r: int) -> int:
+        return self.query(l, r)[1]
+
+    def range_max(self, l: int, r: int) -> int:
+        return self.query(l, r)[2]
+
+
+class SparseTable:
+    """
+    稀疏表：静态数组上的幂等区间查询（min / max / gcd / and / or），O(n log n) 预处理、O(1) 查询。
+    table[k][i] = op(a[i .. i + 2^k - 1])；查询 [l, r] 用两个长度 2^k 的块覆盖（幂等所以重叠无妨）。
+    - op 取 "min" / "max" / "gcd" / "and" / "or" 时，若装了 NumPy 且 a 为数值，逐层用 ufunc 向量化构建，
+      query_many 也整批向量化（百万级窗口查询一次调用完成）
+    - op 也可传任意幂等的二元函数（纯 Python 构建）
+    区间为闭区间 [l, r]。
+    """
+
+    _OPS: Dict[str, Tuple[Callable[[Any, Any], Any], str]] = {
+        "min": (min, "minimum"),
+        "max": (max, "maximum"),
+        "gcd": (math.gcd, "gcd"),
+        "and": (operator.and_, "bitwise_and"),
+        "or": (operator.or_, "bitwise_or"),
+    }
+
+    def __init__(self, a: Sequence[Any], op: Union[str, Callable[[Any, Any], Any]] = "min"):
+        self.n = len(a)
+        if self.n == 0:
+            raise ValueError("SparseTable requires non-empty array")
+        ufunc = None
+        if isinstance(op, str):
+            op, uname = self._OPS[op]
+            if np is not None:
+                ufunc = getattr(np, uname)
+        self.op = op
+        self.ufunc = ufunc
+        levels = self.n.bit_length()
+        if ufunc is not None:
+            base = np.asarray(a)
+            kind = base.dtype.kind
+            if not (kind in "iu" or (kind == "f" and ufunc in (np.minimum, np.maximum))):
+                ufunc = self.ufunc = None  # 大整数 / 字符串等退回纯 Python
+        if ufunc is not None:
+            # 二维表 levels × n，每层末尾不足 2^k 的位置保持原值（不会被查询用到）
+            t = np.empty((levels, self.n), dtype=base.dtype)
+            t[0] = base
+            for k in range(1, levels):
+                half = 1 << (k - 1)
+                t[k] = t[k - 1]
+                ufunc(t[k - 1][:-half], t[k - 1][half:], out=t[k][:self.n - half])
+            self.table: Any = t
+        else:
+            table = [list(a)]
+            for k in range(1, levels):
+                prev, half = table[-1], 1 << (k - 1)
+                table.append([op(prev[i], prev[i + half]) for i in range(self.n - (1 << k) + 1)])
+            self.table = table
+
+    def query(self, l: int, r: int) -> Any:
+        """闭区间 [l, r] 的聚合值，O(1)。"""
+        if not (0 <= l <= r < self.n):
+            raise IndexError("query range out of bounds")
+        k = (r - l + 1).bit_length() - 1
+        row = self.table[k]
+        x, y = row[l], row[r - (1 << k) + 1]
+        return self.op(x, y) if self.ufunc is None else self.ufunc(x, y).item()
+
+    def query_many(self, ls: Sequence[int], rs: Sequence[int]) -> Any:
+        """批量查询：ls[i]..rs[i]（闭区间）。NumPy 模式下返回数组，否则返回 list。"""
+        if self.ufunc is None:
+            return [self.query(l, r) for l, r in zip(ls, rs)]
+        ls = np.asarray(ls, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        if len(ls) and (ls.min() < 0 or rs.max() >= self.n or (ls > rs).any()):
+            raise IndexError("query range out of bounds")
+        k = np.log2(rs - ls + 1).astype(np.int64)
+        # log2 的浮点误差在 2 的幂附近修正一次
+        k -= (np.left_shift(1, k) > rs - ls + 1)
+        k += (np.left_shift(1, k + 1) <= rs - ls + 1)
+        return self.ufunc(self.table[k, ls], self.table[k, rs - np.left_shift(1, k) + 1])
+
+
+def mo_queries(
+    queries: Sequence[Tuple[int, int]],
+    add: Callable[[int], None],
+    remove: Callable[[int], None],
+    answer: Callable[[], Any],
+    n: Optional[int] = None,
+) -> List[Any]:
+    """
+    Mo 算法（离线分块）：回答任意“可增删维护”的区间查询（区间不同值个数、众数次数等）。
+    - 用户提供 add(i) / remove(i)：把下标 i 加入 / 移出当前窗口；answer()：当前窗口的答案
+    - 查询按 (l // B, r 奇偶交替) 排序，B ≈ n / sqrt(q)，总移动 O((n + q) sqrt n)
+    queries 为闭区间 [l, r]；返回按原查询顺序排列的答案。
+    """
+    q = len(queries)
+    if q == 0:
+        return []
+    if n is None:
+        n = max(r for _, r in queries) + 1
+    B = max(1, int(n / math.sqrt(q)))
+    order = sorted(range(q), key=lambda i: (queries[i][0] // B,
+                                            queries[i][1] if (queries[i][0] // B) & 1 == 0 else -queries[i][1]))
+    res: List[Any] = [None] * q
+    cl, cr = 0, -1  # 当前窗口 [cl, cr]，初始为空
+    for i in order:
+        l, r = queries[i]
+        while cr < r:
+            cr += 1
+            add(cr)
+        while cl > l:
+            cl -= 1
+            add(cl)
+        while cr > r:
+            remove(cr)
+            cr -= 1
+        while cl < l:
+            remove(cl)
+            cl += 1
+        res[i] = answer()
+    return res
+
+
+def range_distinct_counts(a: Sequence[Any], queries: Sequence[Tuple[int, int]]) -> List[int]:
+    """mo_queries 示例：每个闭区间 [l, r] 内不同值的个数。"""
+    cnt: Dict[Any, int] = defaultdict(int)
+    distinct = 0
+
+    def add(i: int) -> None:
+        nonlocal distinct
+        cnt[a[i]] += 1
+        if cnt[a[i]] == 1:
+            distinct += 1
+
+    def remove(i: int) -> None:
+        nonlocal distinct
+        cnt[a[i]] -= 1
+        if cnt[a[i]] == 0:
+            distinct -= 1
+
+    return mo_queries(queries, add, remove, lambda: distinct, len(a))
+
+
 # ============================================================
 # 8) 常见技巧：双指针 / 滑动窗口 / 单调栈
 # ============================================================
@@ -693,6 +4218,154 @@ def sieve(n: int) -> List[int]:
     return [i for i, ok in enumerate(is_prime) if ok]
 
 
+def sieve_odd(n: int) -> bytearray:
+    """
+    只筛奇数的埃氏筛：flags[i] 表示 2i+1 是否为素数（flags[0] 对应 1，置 0）。
+    每 1 字节一个标志、偶数不存，约 n / 2 字节；划掉倍数用 bytearray 切片赋值（C 层循环）。
+    """
+    if n < 2:
+        return bytearray()
+    size = (n + 1) // 2
+    flags = bytearray(b"\x01") * size
+    flags[0] = 0
+    zeros = memoryview(bytes(size))
+    for i in range(1, (math.isqrt(n) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            flags[start::p] = zeros[:(size - 1 - start) // p + 1]
+    return flags
+
+
+def primes_upto(n: int) -> List[int]:
+    """[2, n] 内的全部素数（基于 sieve_odd，内存约 n / 2 字节）。"""
+    if n < 2:
+        return []
+    flags = sieve_odd(n)
+    return [2] + [2 * i + 1 for i in itertools.compress(range(len(flags)), flags)]
+
+
+def _odd_segment(a: int, b: int, base: Sequence[int], zeros: memoryview) -> bytearray:
+    """奇数段 [a, b)（a 为奇数）：seg[i] 表示 a + 2i 是否为素数。base 为 ≤ sqrt(b) 的奇素数。"""
+    size = (b - a + 1) // 2
+    seg = bytearray(b"\x01") * size
+    for p in base:
+        pp = p * p
+        if pp >= b:
+            break
+        start = pp if pp >= a else a + (-a % p)
+        if start % 2 == 0:
+            start += p
+        i = (start - a) // 2
+        if i < size:
+            seg[i::p] = zeros[:(size - 1 - i) // p + 1]
+    if a == 1 and size:
+        seg[0] = 0
+    return seg
+
+
+def iter_primes(lo: int = 2, hi: Optional[int] = None, segment: int = 1 << 20) -> Iterator[int]:
+    """
+    分段筛，按段流式产出 [lo, hi] 内的素数（hi=None 时无限产出）。
+    每段只筛奇数、用 bytearray 切片赋值划掉倍数；基素数表按需扩展到 sqrt(段右端)。内存 O(segment + sqrt(hi))。
+    """
+    if hi is not None and hi < max(lo, 2):
+        return
+    if lo <= 2:
+        yield 2
+    a = max(lo, 3) | 1
+    base: List[int] = []
+    base_lim = 0
+    zeros = memoryview(bytes(segment // 2 + 1))
+    while hi is None or a <= hi:
+        b = a + segment if hi is None else min(a + segment, hi + 1)
+        root = math.isqrt(b)
+        if root > base_lim:
+            base_lim = max(root, 2 * base_lim)
+            base = primes_upto(base_lim)[1:]
+        seg = _odd_segment(a, b, base, zeros)
+        yield from (a + 2 * i for i in itertools.compress(range(len(seg)), seg))
+        a += 2 * len(seg)
+
+
+def count_primes(lo: int, hi: int, segment: int = 1 << 20) -> int:
+    """[lo, hi] 内素数个数：分段奇数筛，每段 bytearray.count(1)，不产出素数本身。"""
+    if hi < max(lo, 2):
+        return 0
+    total = 1 if lo <= 2 else 0
+    a = max(lo, 3) | 1
+    base = primes_upto(math.isqrt(hi))[1:]
+    zeros = memoryview(bytes(segment // 2 + 1))
+    while a <= hi:
+        b = min(a + segment, hi + 1)
+        seg = _odd_segment(a, b, base, zeros)
+        total += seg.count(1)
+        a += 2 * len(seg)
+    return total
+
+
+def sieve_np(n: int) -> Any:
+    """NumPy 奇数筛：返回 [2, n] 内全部素数的 int64 数组。"""
+    _require_numpy()
+    if n < 2:
+        return np.zeros(0, dtype=np.int64)
+    size = (n + 1) // 2
+    flags = np.ones(size, dtype=bool)
+    flags[0] = False
+    for i in range(1, (math.isqrt(n) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            flags[p * p // 2::p] = False
+    primes = 2 * np.flatnonzero(flags) + 1
+    return np.concatenate((np.array([2], dtype=np.int64), primes.astype(np.int64)))
+
+
+def linear_sieve(n: int) -> Tuple[List[int], array]:
+    """
+    线性筛（欧拉筛）：每个合数只被其最小素因子划掉一次，O(n)。
+    返回 (素数列表, spf)，spf[x] 为 x 的最小素因子（spf[0] = spf[1] = 0），spf 为 array('i')。
+    """
+    spf = array("i", bytes(4 * (n + 1)))
+    primes: List[int] = []
+    for i in range(2, n + 1):
+        if spf[i] == 0:
+            spf[i] = i
+            primes.append(i)
+        si = spf[i]
+        for p in primes:
+            if p > si or p * i > n:
+                break
+            spf[p * i] = p
+    return primes, spf
+
+
+def spf_table_np(n: int) -> Any:
+    """NumPy 版最小素因子表：从小到大对每个素数 p，把 p² 起尚未标记的 p 的倍数标为 p。"""
+    _require_numpy()
+    spf = np.zeros(n + 1, dtype=np.int32)
+    for p in range(2, math.isqrt(n) + 1):
+        if spf[p] == 0:
+            view = spf[p * p::p]
+            view[view == 0] = p
+    rest = np.flatnonzero(spf == 0)
+    spf[rest] = rest
+    spf[:2] = 0
+    return spf
+
+
+def factorize_spf(x: int, spf: Sequence[int]) -> List[Tuple[int, int]]:
+    """用最小素因子表分解 x（1 <= x < len(spf)），返回 [(素数, 指数)]，O(log x)。"""
+    res: List[Tuple[int, int]] = []
+    while x > 1:
+        p = int(spf[x])
+        e = 0
+        while x % p == 0:
+            x //= p
+            e += 1
+        res.append((p, e))
+    return res
+
+
 def mod_pow(a: int, e: int, mod: int) -> int:
     """
     快速幂：计算 a^e mod mod。
@@ -708,10 +4381,229 @@ def mod_pow(a: int, e: int, mod: int) -> int:
     return res
 
 
+def mod_pow_np(bases: Any, e: Any, mod: int) -> Any:
+    """
+    数组版快速幂：逐元素计算 bases^e mod mod，e 可为标量或与 bases 同形的数组（非负）。
+    要求 mod < 2^31，使乘积 < 2^62 能留在 int64 中；所有元素同步按位平方-乘，O(log max(e)) 次向量操作。
+    """
+    _require_numpy()
+    if not 1 <= mod < 1 << 31:
+        raise ValueError("mod must be in [1, 2**31)")
+    b = np.asarray(bases, dtype=np.int64) % mod
+    if np.ndim(e) == 0:
+        e = int(e)
+        if e < 0:
+            raise ValueError("exponent must be non-negative")
+        res = np.full(b.shape, 1 % mod, dtype=np.int64)
+        while e:
+            if e & 1:
+                res = res * b % mod
+            b = b * b % mod
+            e >>= 1
+        return res
+    e = np.asarray(e, dtype=np.int64)
+    if (e < 0).any():
+        raise ValueError("exponent must be non-negative")
+    b, e = np.broadcast_arrays(b, e)
+    b, e = b.copy(), e.copy()
+    res = np.full(b.shape, 1 % mod, dtype=np.int64)
+    while e.any():
+        odd = (e & 1).astype(bool)
+        res[odd] = res[odd] * b[odd] % mod
+        b = b * b % mod
+        e >>= 1
+    return res
+
+
+class ModComb:
+    """
+    预处理阶乘 / 逆阶乘表后 O(1) 求 nCr、nPr（mod 为素数，n < mod）。
+    逆阶乘由 inv_fact[n] = fact[n]^(p-2) 倒推，预处理 O(n)；ncr_many 在 NumPy 下批量查表（要求 mod < 2^31）。
+    """
+    __slots__ = ("n", "mod", "fact", "inv_fact", "_np")
+
+    def __init__(self, n: int, mod: int = 10**9 + 7):
+        self.n = n
+        self.mod = mod
+        fact = [1] * (n + 1)
+        for i in range(1, n + 1):
+            fact[i] = fact[i - 1] * i % mod
+        inv = [1] * (n + 1)
+        inv[n] = pow(fact[n], mod - 2, mod)
+        for i in range(n, 0, -1):
+            inv[i - 1] = inv[i] * i % mod
+        self.fact = fact
+        self.inv_fact = inv
+        self._np: Optional[Tuple[Any, Any]] = None
+
+    def ncr(self, n: int, r: int) -> int:
+        if r < 0 or r > n or n < 0:
+            return 0
+        return self.fact[n] * self.inv_fact[r] % self.mod * self.inv_fact[n - r] % self.mod
+
+    def npr(self, n: int, r: int) -> int:
+        if r < 0 or r > n or n < 0:
+            return 0
+        return self.fact[n] * self.inv_fact[n - r] % self.mod
+
+    def ncr_many(self, ns: Any, rs: Any) -> Any:
+        """批量 nCr。NumPy 模式下返回数组，否则返回 list。"""
+        if np is None or self.mod >= 1 << 31:
+            return [self.ncr(n, r) for n, r in zip(ns, rs)]
+        if self._np is None:
+            self._np = (np.asarray(self.fact, dtype=np.int64), np.asarray(self.inv_fact, dtype=np.int64))
+        fact, inv = self._np
+        ns = np.asarray(ns, dtype=np.int64)
+        rs = np.asarray(rs, dtype=np.int64)
+        ok = (rs >= 0) & (rs <= ns) & (ns >= 0)
+        n0, r0 = np.where(ok, ns, 0), np.where(ok, rs, 0)
+        res = fact[n0] * inv[r0] % self.mod * inv[n0 - r0] % self.mod
+        return np.where(ok, res, 0)
+
+
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def is_prime(n: int) -> bool:
+    """
+    Miller–Rabin：以前 13 个素数为底，对 n < 3.3·10^24 是确定性判定（覆盖全部 64 位整数）；
+    更大的 n 为强伪素数检验。
+    """
+    if n < 2:
+        return False
+    for p in _MR_BASES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def pollard_rho(n: int, seed: Optional[int] = None) -> int:
+    """
+    Pollard-rho（Brent 变体，批量累乘后再求 gcd）：返回 n 的一个非平凡因子；n 为素数时返回 n。
+    期望 O(n^(1/4)) 次模乘。
+    """
+    if n % 2 == 0:
+        return 2
+    if is_prime(n):
+        return n
+    rnd = random.Random(seed)
+    while True:
+        y, c, m = rnd.randrange(1, n), rnd.randrange(1, n), 128
+        g = r = q = 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r <<= 1
+        if g == n:  # 累乘越过了因子，退回逐步求 gcd
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+
+def factorize(n: int) -> List[Tuple[int, int]]:
+    """质因数分解：小素数试除 + Miller–Rabin + Pollard-rho，返回按素数升序的 [(素数, 指数)]。"""
+    if n < 1:
+        raise ValueError("n must be positive")
+    cnt: Dict[int, int] = defaultdict(int)
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47):
+        while n % p == 0:
+            cnt[p] += 1
+            n //= p
+    st = [n] if n > 1 else []
+    while st:
+        x = st.pop()
+        if is_prime(x):
+            cnt[x] += 1
+            continue
+        d = pollard_rho(x)
+        st.append(d)
+        st.append(x // d)
+    return sorted(cnt.items())
+
+
+def ext_gcd(a: int, b: int) -> Tuple[int, int, int]:
+    """扩展欧几里得（迭代）：返回 (g, x, y)，满足 a·x + b·y = g = gcd(a, b)。"""
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q = a // b
+        a, b = b, a - q * b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+
+def crt(residues: Sequence[int], moduli: Sequence[int]) -> Optional[Tuple[int, int]]:
+    """
+    中国剩余定理（模数可不互素）：求 x ≡ residues[i] (mod moduli[i])。
+    有解返回 (x, M)，0 <= x < M = lcm(moduli)；无解返回 None。
+    """
+    x, m = 0, 1
+    for r, mi in zip(residues, moduli):
+        g, p, _ = ext_gcd(m, mi)
+        if (r - x) % g:
+            return None
+        t = (r - x) // g * p % (mi // g)
+        x += m * t
+        m = m // g * mi
+        x %= m
+    return x, m
+
+
 # ============================================================
 # 10) 小测试与示例（自检入口）
 # ============================================================
 
+def _grid_graph(R: int, C: int, w: int = 1) -> Dict[Tuple[int, int], List[Tuple[Tuple[int, int], int]]]:
+    """测试/基准用：R×C 四连通网格图（无向，边权 w）。"""
+    g: Dict[Tuple[int, int], List[Tuple[Tuple[int, int], int]]] = {}
+    for r in range(R):
+        for c in range(C):
+            g[(r, c)] = [((r + dr, c + dc), w) for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                         if 0 <= r + dr < R and 0 <= c + dc < C]
+    return g
+
+
+class _ByKey:
+    """测试稳定性用：只按 v[0] 比较。"""
+    __slots__ = ("v",)
+
+    def __init__(self, v: Tuple[int, int]):
+        self.v = v
+
+    def __lt__(self, other: "_ByKey") -> bool:
+        return self.v[0] < other.v[0]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ByKey) and self.v == other.v
+
+
 def _run_tests() -> None:
     # -------- 链表 --------
     head = build_linked_list([1, 2, 3])
@@ -726,6 +4618,27 @@ def _run_tests() -> None:
     assert dsu.union(0, 2) is False
     assert dsu.find(2) == dsu.find(0)
 
+    adsu = ArrayDSU(6)
+    assert adsu.union_many([(0, 1), (1, 2), (0, 2), (4, 5)]) == 3
+    assert adsu.count == 3 and adsu.size(2) == 3 and adsu.same(4, 5)
+    assert sorted(adsu.component_sizes().values()) == [1, 2, 3]
+    assert len(set(adsu.roots())) == 3
+    rdsu = RollbackDSU(4)
+    rdsu.union(0, 1)
+    snap = rdsu.snapshot()
+    rdsu.union(2, 3)
+    rdsu.union(1, 3)
+    assert rdsu.count == 1 and rdsu.size(0) == 4
+    rdsu.rollback(snap)
+    assert rdsu.count == 3 and rdsu.find(0) == rdsu.find(1) and rdsu.find(2) != rdsu.find(3)
+    rdsu.rollback()
+    assert rdsu.count == 4
+    wdsu = WeightedDSU(4)
+    assert wdsu.union(0, 1, 5) and wdsu.union(2, 1, 2) and wdsu.union(3, 2, 1)
+    assert wdsu.diff(0, 2) == 3 and wdsu.diff(3, 0) == -2
+    assert wdsu.diff(0, 3) == 2
+    assert wdsu.union(0, 3, 2) is True and wdsu.union(0, 3, 7) is False
+
     # -------- Trie --------
     tr = Trie()
     tr.insert("apple")
@@ -733,16 +4646,101 @@ def _run_tests() -> None:
     assert tr.search("app") is False
     assert tr.starts_with("app") is True
 
+    ac = AhoCorasick(["he", "she", "his", "hers"])
+    assert ac.find_all("ahishers") == [(1, "his"), (3, "she"), (4, "he"), (4, "hers")]
+    assert list(ac.stream(["ahi", "sh", "ers"])) == ac.find_all("ahishers")
+    assert AhoCorasick(["aa"]).find_all("aaaa") == [(0, "aa"), (1, "aa"), (2, "aa")]
+    assert AhoCorasick(["abcd", "bc"]).find_all("xabcx") == [(2, "bc")]
+
+    vocab = ["apple", "app", "apply", "apt", "banana", "band", "bandana", "中文", "中国", "", "b"]
+    pt = PackedTrie.build(vocab + ["app"])
+    assert len(pt) == len(vocab) and "app" in pt and "ap" not in pt and "" in pt
+    assert pt.count_prefix("ap") == 4 and pt.count_prefix("") == len(vocab) and pt.count_prefix("c") == 0
+    assert pt.complete("app") == ["app", "apple", "apply"]
+    assert pt.complete("ban", limit=2) == ["banana", "band"]
+    assert pt.complete("中") == ["中国", "中文"]
+    assert pt.longest_prefix("applesauce") == "apple" and pt.longest_prefix("bandit") == "band"
+    assert pt.longest_prefix("xyz") == "" and PackedTrie.build(["ab"]).longest_prefix("a") is None
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "words.trie")
+        pt.save(fn)
+        pt2 = PackedTrie.load(fn)
+        assert pt2.complete("ap") == pt.complete("ap") and "中文" in pt2
+        assert pt2.longest_prefix("bandanas") == "bandana"
+        pt2.close()
+
     # -------- 排序 --------
     a1 = [3, 1, 4, 1, 5, 9, 2]
     assert quicksort_inplace(a1[:]) == sorted(a1)
     assert mergesort(a1[:]) == sorted(a1)
+    rnd_sort = random.Random(41)
+    cases = [[], [1], a1, list(range(500)), list(range(500, 0, -1)), [7] * 300,
+             [rnd_sort.randint(0, 3) for _ in range(400)], [rnd_sort.randint(-10**6, 10**6) for _ in range(1000)]]
+    for case in cases:
+        assert introsort(case[:]) == sorted(case)
+        assert introsort(case[:], cutoff=0) == sorted(case)
+        assert mergesort_bottom_up(case[:]) == sorted(case)
+        assert mergesort_bottom_up(case[:], run=1) == sorted(case)
+        assert radix_sort(case) == sorted(case)
+    big = [rnd_sort.randrange(100) for _ in range(2000)]
+    h = big[:]
+    _heapsort_range(h, 100, 1899)
+    assert h[100:1900] == sorted(big[100:1900]) and h[:100] == big[:100]
+    assert counting_sort([3, -1, 2, 3, 0]) == [-1, 0, 2, 3, 3]
+    assert counting_sort([1, 3], lo=0, hi=5) == [1, 3]
+    for bad_lo, bad_hi in ((0, 3), (-1, 2)):
+        try:
+            counting_sort([-1, 1, 3], lo=bad_lo, hi=bad_hi)
+            raise AssertionError("out-of-range values must be rejected")
+        except ValueError:
+            pass
+    pairs_stable = [(rnd_sort.randint(0, 5), i) for i in range(300)]
+    assert mergesort_bottom_up([_ByKey(p) for p in pairs_stable]) == sorted(_ByKey(p) for p in pairs_stable)
+    assert [x.v for x in mergesort_bottom_up([_ByKey(p) for p in pairs_stable])] == sorted(pairs_stable, key=lambda p: p[0])
+
+    # -------- 外部排序 --------
+    ext_data = array("q", (rnd_sort.randint(-10**12, 10**12) for _ in range(5000)))
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.bin"), os.path.join(tmp, "out.bin")
+        with open(src, "wb") as f:
+            ext_data.tofile(f)
+        for workers in (1, 2):
+            stats = external_sort_file(src, dst, run_size=700, workers=workers, block=64)
+            got = array("q")
+            with open(dst, "rb") as f:
+                got.frombytes(f.read())
+            assert list(got) == sorted(ext_data)
+            assert stats.records == 5000 and stats.runs == 8 and stats.bytes_spilled == 5000 * 8
+        with open(src, "ab") as f:
+            f.write(b"\0\0\0")
+        try:
+            external_sort_file(src, dst)
+            raise AssertionError("trailing partial record must be rejected")
+        except ValueError:
+            pass
+    words_ext = [f"w{rnd_sort.randrange(1000):03d}" for _ in range(2500)]
+    assert list(external_sorted(words_ext, run_size=300)) == sorted(words_ext)
+    recs = [(rnd_sort.randrange(5), i) for i in range(1000)]
+    assert list(external_sorted(recs, key=lambda r: r[0], run_size=128)) == sorted(recs, key=lambda r: r[0])
 
     # -------- 二分 --------
     a2 = [1, 2, 4, 4, 7]
     assert binary_search_leftmost_ge(a2, 4) == 2
     assert binary_search_leftmost_gt(a2, 4) == 4
     assert binary_search_leftmost_ge(a2, 8) == 5
+    rnd_bs = random.Random(17)
+    col = sorted(rnd_bs.randrange(500) for _ in range(300))
+    qs = [rnd_bs.randrange(-5, 505) for _ in range(400)]
+    for side, find in (("left", bisect.bisect_left), ("right", bisect.bisect_right)):
+        expect = [find(col, x) for x in qs]
+        assert list(searchsorted_many(col, qs, side)) == expect
+        assert list(searchsorted_many(col, qs[:3], side)) == expect[:3]
+        for m in (0, 1, 2, 7, 8, 300):
+            ez = EytzingerIndex(col[:m])
+            assert list(ez.lower_bound_many(qs, side)) == [find(col[:m], x) for x in qs]
+        ez = EytzingerIndex(col)
+        look = ez.lower_bound if side == "left" else ez.upper_bound
+        assert [look(x) for x in qs] == expect
 
     # -------- DFS/BFS --------
     g_simple = {
@@ -755,6 +4753,20 @@ def _run_tests() -> None:
     dist = bfs_shortest_unweighted(g_simple, 1)
     assert dist[1] == 0 and dist[4] == 2
 
+    # -------- CSR 图 --------
+    g_csr = CSRGraph.from_adj(g_simple)
+    assert g_csr.n == 5 and g_csr.num_edges == 3
+    assert list(g_csr.neighbors(1)) == [2, 3]
+    for mixed in ([(0, 1), (1, 2, 5)], [(0, 1, 5), (1, 2)]):
+        try:
+            CSRGraph.from_edges(3, iter(mixed))
+            raise AssertionError("mixed weighted / unweighted edges must be rejected")
+        except ValueError:
+            pass
+    assert CSRGraph.from_edges(3, []).num_edges == 0
+    assert dfs_reachable(g_csr, 1) == {1, 2, 3, 4}
+    assert bfs_shortest_unweighted(g_csr, 1) == dist
+
     # -------- 回溯：排列 --------
     perms = permutations([1, 2, 3])
     assert len(perms) == 6
@@ -770,6 +4782,65 @@ def _run_tests() -> None:
     d = dijkstra(g_w, "A")
     assert d["D"] == 4  # A->B(1)->C(2)->D(1)
 
+    g_w_int = {0: [(1, 1), (2, 4)], 1: [(2, 2), (3, 5)], 2: [(3, 1)], 3: []}
+    assert dijkstra(CSRGraph.from_adj(g_w_int), 0) == dijkstra(g_w_int, 0)
+
+    # -------- 多源 / 提前结束 Dijkstra --------
+    assert dijkstra_path(g_w, "A", "D") == (4, ["A", "B", "C", "D"])
+    assert dijkstra_path(g_w_int, 0, 3, n=4) == (4, [0, 1, 2, 3])
+    assert dijkstra_path(CSRGraph.from_adj(g_w_int), 0, 3) == (4, [0, 1, 2, 3])
+    assert dijkstra_path(g_w, "D", "A") == (None, None)
+    ms = dijkstra_multi(g_w_int, [0, 2], n=4, with_parent=True)
+    assert ms.dist == [0, 1, 0, 1] and ms.path_to(3) == [2, 3]
+    early = dijkstra_multi(g_w, ["A"], targets=["B"])
+    assert early.distance("B") == 1 and early.distance("D") is None
+    tent = dijkstra_multi([[(1, 1), (2, 10)], [(2, 1)], []], [0], targets=[1], with_parent=True)
+    assert tent.distance(1) == 1 and tent.distance(2) is None and tent.path_to(2) is None
+    tent_d = dijkstra_multi({0: [(1, 1), (2, 10)], 1: [(2, 1)]}, [0], targets=[1])
+    assert tent_d.distance(2) is None
+    assert dijkstra_multi([[(1, 1), (2, 10)], [(2, 1)], []], [0], targets=[2]).distance(2) == 2
+
+    # -------- 双向 / A* --------
+    assert bidirectional_dijkstra(g_w, "A", "D").dist == 4
+    assert bidirectional_dijkstra(g_w, "A", "D").path == ["A", "B", "C", "D"]
+    assert bidirectional_dijkstra(g_w, "D", "A").path is None
+    assert bidirectional_dijkstra(CSRGraph.from_adj(g_w_int), 0, 3).path == [0, 1, 2, 3]
+    assert astar(g_w, "A", "D").path == ["A", "B", "C", "D"]
+    assert bidirectional_bfs(g_simple, 1, 4) == SearchResult(2, [1, 2, 4], bidirectional_bfs(g_simple, 1, 4).settled)
+    assert bidirectional_bfs(g_csr, 1, 4).path == [1, 2, 4]
+    assert bidirectional_bfs(g_simple, 4, 1).dist is None
+    grid_g = _grid_graph(30, 30)
+    base = astar(grid_g, (0, 0), (29, 29))
+    guided = astar(grid_g, (0, 0), (29, 29), h=lambda v: abs(v[0] - 29) + abs(v[1] - 29))
+    bi = bidirectional_dijkstra(grid_g, (0, 0), (29, 29), rg=grid_g)
+    assert base.dist == guided.dist == bi.dist == 58
+    assert guided.settled < base.settled
+
+    # -------- ALT 索引 --------
+    grid_i = CSRGraph.from_edges(
+        900, [(r * 30 + c, v[0] * 30 + v[1], w) for (r, c), nbrs in grid_g.items() for v, w in nbrs])
+    alt = ALTIndex.build(grid_i, k=4)
+    q = alt.query(0, 899)
+    assert q.dist == 58 and len(q.path) == 59 and q.settled < base.settled
+    assert alt.distance(5, 5) == 0 and alt.distance(31, 417) == dijkstra(grid_i, 31)[417]
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "grid.alt")
+        alt.save(fn)
+        alt2 = ALTIndex.load(fn)
+        assert alt2.query(0, 899).dist == 58 and alt2.distance(31, 417) == alt.distance(31, 417)
+        alt2.close()
+    one_way = ALTIndex.build({0: [(1, 2)], 1: [], 2: [(1, 1)]})
+    assert one_way.distance(0, 1) == 2 and one_way.distance(1, 0) is None
+    two_parts = {0: [(1, 3)], 1: [(2, 4)], 2: [(0, 1)], 3: [(4, 2)], 4: [(5, 2)], 5: [(3, 9)]}
+    alt_tp = ALTIndex.build(two_parts, k=2)
+    assert {v // 3 for v in alt_tp.landmarks} == {0, 1}
+    assert alt_tp.heuristic(3, 5) == 4 and alt_tp.distance(3, 5) == 4 and alt_tp.distance(0, 4) is None
+    try:
+        ALTIndex.build({})
+        raise AssertionError("empty graph must be rejected")
+    except ValueError:
+        pass
+
     # -------- Bellman-Ford --------
     # 例子：无负环
     edges = [
@@ -780,6 +4851,22 @@ def _run_tests() -> None:
     bf = bellman_ford(3, edges, 0)
     assert bf is not None
     assert bf[2] == 3
+    assert bellman_ford(3, CSRGraph.from_edges(3, edges), 0) == bf
+    assert bellman_ford(2, CSRGraph.from_edges(2, [(0, 1, -1), (1, 0, -1)]), 0) is None
+    assert spfa(3, edges, 0) == (bf, None)
+    neg = [(0, 1, 1), (1, 2, 1), (2, 3, -1), (3, 1, -1), (3, 4, 1)]
+    d_neg, cyc = spfa(5, neg, 0)
+    assert d_neg is None and sorted(cyc) == [1, 2, 3]
+    assert all((cyc[i], cyc[(i + 1) % 3]) in {(a, b) for a, b, _ in neg} for i in range(3))
+    if np is not None:
+        d_np, cyc = bellman_ford_np(3, *zip(*edges), 0)
+        assert cyc is None and d_np.tolist() == bf
+        d_np, cyc = bellman_ford_np(5, *CSRGraph.from_edges(5, neg).edge_arrays(), 0)
+        assert d_np is None and sorted(cyc) == [1, 2, 3]
+        d_np, _ = bellman_ford_np(3, [0], [1], [0.5], 0)
+        assert d_np[1] == 0.5 and d_np[2] == np.inf
+        d_np, _ = bellman_ford_np(3, [], [], [], 0)
+        assert d_np.dtype == np.int64 and d_np.tolist() == [0, 10**18, 10**18]
 
     # -------- Topo Sort --------
     order = topo_sort(4, [(0, 1), (0, 2), (1, 3), (2, 3)])
@@ -788,6 +4875,36 @@ def _run_tests() -> None:
     pos = {x: i for i, x in enumerate(order)}
     assert pos[0] < pos[1] and pos[0] < pos[2]
     assert pos[1] < pos[3] and pos[2] < pos[3]
+    dag = CSRGraph.from_edges(4, [(0, 1), (0, 2), (1, 3), (2, 3)])
+    assert topo_sort(4, dag) == order
+    assert topo_sort(2, CSRGraph.from_edges(2, [(0, 1), (1, 0)])) is None
+
+    # -------- 迭代 DFS：SCC / 缩点 / 桥 / 割点 --------
+    g_scc = {"a": ["b"], "b": ["c"], "c": ["a", "d"], "d": ["e"], "e": ["d"], "f": ["e"]}
+    sccs = strongly_connected_components(g_scc)
+    assert sorted(map(sorted, sccs)) == [["a", "b", "c"], ["d", "e"], ["f"]]
+    assert sorted(sccs[0]) == ["d", "e"]  # 汇点分量在前
+    comp, dag = condensation(g_scc)
+    assert comp["a"] == comp["c"] != comp["d"] == comp["e"]
+    assert topo_sort(dag.n, dag) == list(range(dag.n))
+    pre, post = dfs_order({1: [2, 3], 2: [4]})
+    assert pre == [1, 2, 4, 3] and post == [4, 2, 3, 1]
+    # 无向图：0-1-2 三角形，2-3 桥，3-4 桥，另有 5-6 重边（不是桥）
+    und = defaultdict(list)
+    for a, b in [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (5, 6), (5, 6)]:
+        und[a].append(b)
+        und[b].append(a)
+    assert sorted(tuple(sorted(e)) for e in bridges(und)) == [(2, 3), (3, 4)]
+    assert sorted(articulation_points(und)) == [2, 3]
+    chain_n = 200_000  # 远超默认递归深度
+    chain = CSRGraph.from_edges(chain_n, [(i, i + 1) for i in range(chain_n - 1)])
+    assert len(dfs_reachable(chain, 0)) == chain_n
+    assert len(dfs_reachable({i: [i + 1] for i in range(chain_n)}, 0)) == chain_n + 1
+    assert len(strongly_connected_components(chain)) == chain_n
+    assert dfs_order(chain)[1][0] == chain_n - 1
+    path_und = CSRGraph.from_edges(chain_n, [e for i in range(chain_n - 1) for e in ((i, i + 1), (i + 1, i))])
+    assert len(bridges(path_und)) == chain_n - 1
+    assert len(articulation_points(path_und)) == chain_n - 2
 
     # -------- Kruskal MST --------
     mst = kruskal_mst(
@@ -801,26 +4918,186 @@ def _run_tests() -> None:
         ],
     )
     assert mst == 1 + 2 + 3  # 0-1, 1-2, 1-3
+    msf = kruskal_msf(6, [(1, 0, 1), (4, 0, 2), (2, 1, 2), (3, 1, 3), (5, 2, 3), (7, 4, 5)])
+    assert msf.total == 1 + 2 + 3 + 7 and msf.components == 2 and not msf.is_tree
+    assert sorted(msf.edges) == [0, 2, 3, 5]
+    if np is not None:
+        rnd = random.Random(11)
+        rand_edges = [(rnd.randint(1, 20), rnd.randrange(300), rnd.randrange(300)) for _ in range(3000)]
+        ref = kruskal_msf(300, rand_edges)
+        w_a, u_a, v_a = (np.array(x) for x in zip(*rand_edges))
+        for res in (filter_kruskal_np(300, u_a, v_a, w_a, base_size=64),
+                    boruvka_np(300, u_a, v_a, w_a)):
+            assert res.total == ref.total and res.components == ref.components
+            assert len(res.edges) == 300 - res.components
+        assert boruvka_np(4, [0, 2], [1, 3], [5, 6]) == SpanningForest(11, [0, 1], 2)
 
     # -------- DP：0/1 背包 --------
     w = [2, 1, 3]
     v = [4, 2, 3]
     assert knapsack_01(w, v, 4) == 6  # 2+1 价值 4+2
+    rnd_kp = random.Random(20)
+    nums_ss = [rnd_kp.randrange(1, 30) for _ in range(12)]
+    reach = {0}
+    for x in nums_ss:
+        reach |= {t + x for t in reach}
+    bits = subset_sums_bitset(nums_ss, 100)
+    assert [t for t in range(101) if bits >> t & 1] == sorted(t for t in reach if t <= 100)
+    assert subset_sum([3, 34, 4, 12, 5, 2], 9) and not subset_sum([3, 34, 4, 12, 5, 2], 30)
+    if np is not None:
+        for _ in range(30):
+            n_it = rnd_kp.randrange(1, 9)
+            ws = [rnd_kp.randrange(0, 12) for _ in range(n_it)]
+            vs = [rnd_kp.randrange(1, 20) for _ in range(n_it)]
+            cs = [rnd_kp.randrange(1, 4) for _ in range(n_it)]
+            cap = rnd_kp.randrange(0, 30)
+            best01 = max(sum(vs[i] for i in range(n_it) if m >> i & 1) for m in range(1 << n_it)
+                         if sum(ws[i] for i in range(n_it) if m >> i & 1) <= cap)
+            assert knapsack_01_np(ws, vs, cap) == best01
+            got, items = knapsack_01_np(ws, vs, cap, return_items=True)
+            assert got == best01 == sum(vs[i] for i in items) and sum(ws[i] for i in items) <= cap
+            assert len(set(items)) == len(items)
+            # 多重背包：展开成 0/1 物品暴力
+            flat = [(ws[i], vs[i]) for i in range(n_it) for _ in range(cs[i])]
+            bounded = knapsack_01([a for a, _ in flat], [b for _, b in flat], cap)
+            got, used = knapsack_bounded_np(ws, vs, cs, cap, return_items=True)
+            assert got == bounded == sum(u * x for u, x in zip(used, vs))
+            assert sum(u * x for u, x in zip(used, ws)) <= cap and all(u <= c for u, c in zip(used, cs))
+            # 完全背包：朴素正序 DP
+            pos = [i for i in range(n_it) if ws[i] > 0]
+            ref = [0] * (cap + 1)
+            for c in range(cap + 1):
+                for i in pos:
+                    if ws[i] <= c:
+                        ref[c] = max(ref[c], ref[c - ws[i]] + vs[i])
+            got, cnt = knapsack_unbounded_np([ws[i] for i in pos], [vs[i] for i in pos], cap, return_items=True)
+            assert got == ref[cap] == sum(k * vs[i] for k, i in zip(cnt, pos))
+            assert sum(k * ws[i] for k, i in zip(cnt, pos)) <= cap
+            # 二维背包：第二维取随机体积
+            vol = [rnd_kp.randrange(0, 6) for _ in range(n_it)]
+            best2 = max(sum(vs[i] for i in range(n_it) if m >> i & 1) for m in range(1 << n_it)
+                        if sum(ws[i] for i in range(n_it) if m >> i & 1) <= cap
+                        and sum(vol[i] for i in range(n_it) if m >> i & 1) <= 10)
+            assert knapsack_multi_np(list(zip(ws, vol)), vs, (cap, 10)) == best2
 
     # -------- DP：LIS --------
     assert lis_length([10, 9, 2, 5, 3, 7, 101, 18]) == 4  # 2,3,7,18
 
     # -------- DP：编辑距离 --------
     assert edit_distance("kitten", "sitting") == 3
+    rnd_ed = random.Random(19)
+    for _ in range(200):
+        x = "".join(rnd_ed.choice("acgt") for _ in range(rnd_ed.randrange(0, 40)))
+        y = "".join(rnd_ed.choice("acgt") for _ in range(rnd_ed.randrange(0, 90)))
+        d = edit_distance(x, y)
+        assert edit_distance_two_row(x, y) == d == myers_distance(x, y)
+        assert edit_distance_banded(x, y, d) == d and edit_distance_banded(x, y, d - 1) == -1
+        dist, aln = hirschberg_alignment(x, y, leaf_cells=8)
+        assert dist == d
+        assert "".join(p for p, _ in aln if p is not None) == x
+        assert "".join(q for _, q in aln if q is not None) == y
+    assert myers_distance("x" * 100 + "kitten", "x" * 100 + "sitting") == 3
+    assert hirschberg_alignment("kitten", "sitting")[1][:2] == [("k", "s"), ("i", "i")]
+
+    # -------- 相似度连接 --------
+    bases = ["".join(rnd_ed.choice("abcde") for _ in range(rnd_ed.randrange(3, 15))) for _ in range(25)]
+    texts = []
+    for base in bases:
+        for _ in range(rnd_ed.randrange(1, 5)):
+            t = list(base)
+            for _ in range(rnd_ed.randrange(3)):
+                t.insert(rnd_ed.randrange(len(t) + 1), rnd_ed.choice("abcde"))
+            texts.append("".join(t))
+    texts += ["", "a", "ab"]
+    for k in (0, 1, 2, 3):
+        brute = [(i, j, edit_distance(texts[i], texts[j])) for i in range(len(texts))
+                 for j in range(i + 1, len(texts)) if edit_distance(texts[i], texts[j]) <= k]
+        assert similarity_join(texts, k) == brute
+        assert similarity_join(texts, k, q=3, batch=7) == brute
+        assert similarity_join(texts, k, method="bktree", batch=9) == brute
+        assert _JOIN_TREE is None
+    assert similarity_join(texts, 2, workers=2, batch=16) == similarity_join(texts, 2)
+    assert similarity_join(texts, 2, method="bktree", workers=2, batch=16) == similarity_join(texts, 2)
+    bk = BKTree(["book", "books", "cake", "boo", "cape", "cart"])
+    assert sorted(bk.words[i] for i, _ in bk.search("bok", 1)) == ["boo", "book"]
 
     # -------- KMP --------
     assert kmp_search("abxabcabcaby", "abcaby") == 6
     assert kmp_search("aaaaa", "bba") == -1
 
+    # -------- 流式 KMP / Z 函数 --------
+    rnd_kmp = random.Random(23)
+    for _ in range(60):
+        text_b = bytes(rnd_kmp.choice(b"ab") for _ in range(rnd_kmp.randrange(0, 300)))
+        pat_b = bytes(rnd_kmp.choice(b"ab") for _ in range(rnd_kmp.randrange(1, 6)))
+        expect = [i for i in range(len(text_b) - len(pat_b) + 1) if text_b[i:i + len(pat_b)] == pat_b]
+        cuts = sorted(rnd_kmp.sample(range(len(text_b) + 1), min(len(text_b) + 1, 6)))
+        pieces = [text_b[a:b] for a, b in zip([0] + cuts, cuts + [len(text_b)])]
+        assert list(KMPMatcher(pat_b).finditer(pieces)) == expect
+        mv = memoryview(bytearray(text_b))
+        assert list(KMPMatcher(pat_b).finditer(mv[a:b] for a, b in zip([0] + cuts, cuts + [len(text_b)]))) == expect
+        assert z_find_all(text_b, pat_b) == expect == z_find_all(mv, pat_b)
+        assert z_extend(text_b, pat_b) == [len(os.path.commonprefix([text_b[i:], pat_b])) for i in range(len(text_b))]
+        assert z_function(text_b) == [len(os.path.commonprefix([text_b, text_b[i:]])) for i in range(len(text_b))]
+    mt = KMPMatcher("aba")
+    assert mt.feed("xab") == [] and mt.feed("abab") == [1, 3] and mt.pos == 7
+    assert z_count_many("abababa", ["aba", "b", "c"]) == {"aba": 3, "b": 3, "c": 0}
+
+    # -------- 后缀数组 / 后缀自动机 --------
+    rnd_sa = random.Random(21)
+    for text in ["", "a", "banana", "mississippi", "aaaaaaa", "中文中文字",
+                 "".join(rnd_sa.choice("ab") for _ in range(200)), bytes(rnd_sa.randrange(3) for _ in range(150))]:
+        n_t = len(text)
+        assert list(suffix_array(text)) == sorted(range(n_t), key=lambda i: text[i:])
+        idx = SuffixIndex(text)
+        sam = SuffixAutomaton(text)
+        subs = {text[i:j] for i in range(n_t) for j in range(i + 1, n_t + 1)}
+        assert idx.distinct_substrings() == sam.distinct_substrings() == len(subs)
+        rep = [t for t in subs if sum(text.startswith(t, i) for i in range(n_t)) >= 2]
+        assert len(idx.longest_repeated()) == max(map(len, rep), default=0)
+        pats = list(subs)[:40] + [text[:0], text[:3] + text[:1], text[-2:] * 3]
+        for pat in pats:
+            occ = [i for i in range(n_t) if text.startswith(pat, i)]
+            assert idx.find_all(pat) == occ and idx.count(pat) == sam.count(pat) == len(occ)
+            assert sam.contains(pat) == (len(occ) > 0 or not pat)
+    assert SuffixIndex("banana").longest_repeated() == "ana"
+    assert SuffixAutomaton("xabcdy").longest_common_substring("zzabcz") == (3, 5)
+    with tempfile.TemporaryDirectory() as tmp:
+        for text in ("abracadabra 中文", b"abracadabra"):
+            path = os.path.join(tmp, "sa.idx")
+            SuffixIndex(text).save(path)
+            loaded = SuffixIndex.load(path)
+            assert loaded.text == text and loaded.find_all(text[:4]) == [0, 7]
+            assert loaded.distinct_substrings() == SuffixIndex(text).distinct_substrings()
+            loaded.close()
+
     # -------- Rolling Hash --------
     get_hash = rolling_hash_getter("banana")
     assert get_hash(0, 3) == get_hash(0, 3)  # "ban" == "ban"
     assert get_hash(1, 3) != get_hash(0, 2)  # "an" != "ba" (通常不同)
+    rnd_rh = random.Random(22)
+    for text in ["", "banana", "中文abc中文", "".join(rnd_rh.choice("abc") for _ in range(300)),
+                 bytes(rnd_rh.randrange(4) for _ in range(200))]:
+        rh = RollingHash(text, seed=1)
+        n_t = len(text)
+        pairs_rh = [(l, r) for l in range(min(n_t, 40)) for r in range(l, min(n_t, 40) + 1)]
+        single = [rh.get(l, r) for l, r in pairs_rh]
+        assert list(rh.get_many(pairs_rh)) == single
+        assert all(rh.hash_of(text[l:r]) == x for (l, r), x in zip(pairs_rh, single))
+        assert len(set(single)) == len({text[l:r] for l, r in pairs_rh})
+        assert list(rh.window_hashes(3)) == [rh.get(i, i + 3) for i in range(n_t - 2)]
+        pats = [text[3:6], text[10:12], text[:1], text[:0], text[5:9] + text[:1]] if n_t else ["x"]
+        found = rabin_karp_multi(text, pats, rh)
+        for pat in pats:
+            assert found[pat] == ([i for i in range(n_t - len(pat) + 1) if text[i:i + len(pat)] == pat]
+                                  if pat else [])
+        for m in (1, 3, 8):
+            ref: Dict[Any, List[int]] = defaultdict(list)
+            for i in range(n_t - m + 1):
+                ref[text[i:i + m]].append(i)
+            assert duplicate_substrings(text, m, rh) == {k: v for k, v in ref.items() if len(v) >= 2}
+        assert len(longest_duplicate_substring(text, rh)) == len(SuffixIndex(text).longest_repeated())
+    assert longest_duplicate_substring("banana") == "ana"
 
     # -------- 前缀和 --------
     rs = prefix_sum_getter([1, 2, 3, 4])
@@ -833,12 +5110,80 @@ def _run_tests() -> None:
     # [0,0] +7 => [7,0,0,0,0]
     # [1,3] +2 => [7,2,2,2,0]
     assert arr == [7, 2, 2, 2, 0]
+    assert difference_range_add(3, [(0, 2, 10**20)]) == [10**20] * 3
+    assert difference_range_add(2, [(0, 1, 2**62), (0, 1, 2**62)]) == [2**63] * 2
+    assert difference_range_add(3, [(0, 5, 5), (2, 3, 1)]) == [5, 5, 6]  # r 越过末尾
+    if np is not None:
+        assert rs(1, 3) == prefix_sum_getter(np.array([1, 2, 3, 4]))(1, 3)
+        ps_np = prefix_sums_np([1, 2, 3, 4])
+        assert range_sums_np(ps_np, [0, 1], [4, 3]).tolist() == [10, 5]
+        mat = np.arange(12).reshape(3, 4)
+        P = prefix_sums_2d_np(mat)
+        assert rect_sums_np(P, [0, 1], [0, 1], [3, 3], [4, 3]).tolist() == [mat.sum(), mat[1:3, 1:3].sum()]
+        assert difference_range_add_np(5, [1, 0, 1], [3, 0, 1], [2, 7, 1]).tolist() == [7, 3, 2, 2, 0]
+        grid_add = difference_rect_add_np(3, 3, [0, 1], [0, 1], [1, 2], [1, 2], [1, 5])
+        assert grid_add.tolist() == [[1, 1, 0], [1, 6, 5], [0, 5, 5]]
+        assert difference_rect_add_np(2, 2, [0], [1], [9], [9], [3]).tolist() == [[0, 3], [0, 3]]
+        big = np.array([2**63 + 1, 1], dtype=np.uint64)
+        ps_u = prefix_sums_np(big)
+        assert ps_u.dtype == np.uint64 and int(ps_u[2]) == 2**63 + 2
+        assert prefix_sums_2d_np(big.reshape(1, 2)).dtype == np.uint64
+        du = difference_range_add_np(3, [0, 1], [2, 1], np.array([2**63, 1], dtype=np.uint64))
+        assert du.dtype == np.uint64 and du.tolist() == [2**63, 2**63 + 1, 2**63]
 
     # -------- 线段树 --------
     st = SegTreeSum([1, 3, 5, 7, 9, 11])
     assert st.query(1, 3) == 3 + 5 + 7
     st.update(1, 10)  # 3 -> 10
     assert st.query(1, 3) == 10 + 5 + 7
+    sg = SegTree([1, 3, 5, 7, 9, 11], operator.add, 0)
+    assert sg.query(1, 3) == 15 and sg.query(0, 5) == 36
+    sg.update_many([(1, 10), (4, 0)])
+    assert sg.query_many([(1, 3), (0, 5), (4, 4)]) == [22, 34, 0]
+    smin = SegTree([5, 2, 8, 1, 9], min, math.inf)
+    assert smin.query(0, 2) == 2 and smin.query(2, 4) == 1
+    scat = SegTree(list("abcde"), operator.add, "")  # 非交换幺半群
+    assert scat.query(1, 3) == "bcd"
+    rt = RangeTree([1, 3, 5, 7, 9, 11])
+    rt.range_add(1, 4, 10)        # [1, 13, 15, 17, 19, 11]
+    assert rt.range_sum(0, 5) == 76 and rt.range_min(1, 5) == 11 and rt.range_max(0, 5) == 19
+    rt.range_assign(2, 3, 0)      # [1, 13, 0, 0, 19, 11]
+    rt.range_add(0, 2, 1)         # [2, 14, 1, 0, 19, 11]
+    assert [rt.get(i)[0] for i in range(6)] == [2, 14, 1, 0, 19, 11]
+    assert rt.query_many([(0, 2), (2, 3)]) == [(17, 1, 14, 3), (1, 0, 1, 2)]
+
+    rnd = random.Random(23)
+    ref = [rnd.randint(-50, 50) for _ in range(37)]
+    rt = RangeTree(ref)
+    for _ in range(300):
+        l = rnd.randrange(37)
+        r = rnd.randrange(l, 37)
+        kind, v = rnd.randrange(3), rnd.randint(-9, 9)
+        if kind == 0:
+            rt.range_add(l, r, v)
+            ref[l:r + 1] = [x + v for x in ref[l:r + 1]]
+        elif kind == 1:
+            rt.range_assign(l, r, v)
+            ref[l:r + 1] = [v] * (r - l + 1)
+        else:
+            assert (rt.range_sum(l, r), rt.range_min(l, r), rt.range_max(l, r)) == \
+                (sum(ref[l:r + 1]), min(ref[l:r + 1]), max(ref[l:r + 1]))
+
+    # -------- 稀疏表 / Mo 算法 --------
+    data = [5, 2, 8, 1, 9, 3, 7, 4, 6]
+    for op, fn in (("min", min), ("max", max)):
+        sp = SparseTable(data, op)
+        assert all(sp.query(l, r) == fn(data[l:r + 1]) for l in range(9) for r in range(l, 9))
+        ls = [l for l in range(9) for r in range(l, 9)]
+        rs = [r for l in range(9) for r in range(l, 9)]
+        assert list(sp.query_many(ls, rs)) == [fn(data[l:r + 1]) for l, r in zip(ls, rs)]
+    sp = SparseTable([12, 18, 24, 9], "gcd")
+    assert sp.query(0, 2) == 6 and sp.query(0, 3) == 3
+    sp = SparseTable(["b", "a", "c"], lambda x, y: min(x, y))
+    assert sp.query(0, 2) == "a" and sp.query_many([1, 2], [2, 2]) == ["a", "c"]
+    qs = [(0, 4), (2, 6), (1, 1), (0, 8), (5, 8)]
+    arr_mo = [1, 2, 1, 3, 2, 2, 4, 1, 4]
+    assert range_distinct_counts(arr_mo, qs) == [len(set(arr_mo[l:r + 1])) for l, r in qs]
 
     # -------- 双指针 / 滑窗 / 单调栈 --------
     assert two_sum_sorted([1, 2, 4, 7, 11], 9) == (1, 3)  # 2+7
@@ -849,10 +5194,580 @@ def _run_tests() -> None:
     assert gcd(12, 18) == 6
     assert lcm(12, 18) == 36
     assert sieve(10) == [2, 3, 5, 7]
+    ref_primes = sieve(5000)
+    for n_s in (0, 1, 2, 3, 4, 9, 25, 97, 5000):
+        assert primes_upto(n_s) == [p for p in ref_primes if p <= n_s]
+        if np is not None:
+            assert sieve_np(n_s).tolist() == primes_upto(n_s)
+    assert list(iter_primes(0, 5000, segment=64)) == ref_primes
+    assert list(iter_primes(1000, 1200, segment=30)) == [p for p in ref_primes if 1000 <= p <= 1200]
+    assert list(itertools.islice(iter_primes(4000, segment=50), 20)) == [p for p in ref_primes if p >= 4000][:20]
+    for lo_c, hi_c in ((0, 5000), (2, 2), (3, 3), (4, 4), (1, 1), (1000, 4999), (4990, 5000)):
+        assert count_primes(lo_c, hi_c, segment=100) == sum(lo_c <= p <= hi_c for p in ref_primes)
+    assert count_primes(1, 10**6) == 78498
+    lp, spf = linear_sieve(5000)
+    assert lp == ref_primes
+    if np is not None:
+        assert spf_table_np(5000).tolist() == list(spf)
+    for x in (1, 2, 12, 97, 360, 4096, 4999):
+        fac = factorize_spf(x, spf)
+        assert math.prod(p ** e for p, e in fac) == x and all(spf[p] == p for p, _ in fac)
     assert mod_pow(2, 10, 1000) == 24
+    rnd_nt = random.Random(25)
+    if np is not None:
+        bs_nt = [rnd_nt.randrange(-10**12, 10**12) for _ in range(200)]
+        es_nt = [rnd_nt.randrange(0, 10**6) for _ in range(200)]
+        for mod in (1, 2, 97, 10**9 + 7, (1 << 31) - 1):
+            assert mod_pow_np(bs_nt, 12345, mod).tolist() == [pow(b, 12345, mod) for b in bs_nt]
+            assert mod_pow_np(bs_nt, es_nt, mod).tolist() == [pow(b, e, mod) for b, e in zip(bs_nt, es_nt)]
+        assert mod_pow_np([3, 5], 0, 7).tolist() == [1, 1]
+    mc = ModComb(1000, 10**9 + 7)
+    pairs_nc = [(rnd_nt.randrange(-2, 1001), rnd_nt.randrange(-2, 1001)) for _ in range(300)]
+    ref_nc = [math.comb(n, r) % (10**9 + 7) if 0 <= r <= n else 0 for n, r in pairs_nc]
+    assert [mc.ncr(n, r) for n, r in pairs_nc] == ref_nc
+    assert list(mc.ncr_many([n for n, _ in pairs_nc], [r for _, r in pairs_nc])) == ref_nc
+    assert mc.npr(10, 3) == 720
+    assert [x for x in range(2000) if is_prime(x)] == primes_upto(1999)
+    assert all(is_prime(x) for x in (2**61 - 1, 1_000_000_007, 998244353, 2**89 - 1))
+    assert not is_prime(318665857834031151167461)  # 底 2..37 的强伪素数，底 41 识破
+    assert not is_prime(3215031751) and not is_prime(2**61 - 3) and not is_prime(561)
+    for x in (1, 2, 97, 360, 2**61 - 1, 600851475143, (2**31 - 1) * (2**61 - 1), 1_000_000_007 ** 2 * 12,
+              rnd_nt.randrange(1, 10**18)):
+        fac = factorize(x)
+        assert math.prod(p ** e for p, e in fac) == x and all(is_prime(p) for p, _ in fac)
+        assert [p for p, _ in fac] == sorted({p for p, _ in fac})
+    assert crt([2, 3, 2], [3, 5, 7]) == (23, 105)
+    assert crt([1, 3], [4, 6]) == (9, 12) and crt([1, 2], [4, 6]) is None
+    g_e, x_e, y_e = ext_gcd(240, 46)
+    assert g_e == 2 and 240 * x_e + 46 * y_e == 2
 
     print("✅ All tests passed!")
 
 
+# ============================================================
+# 11) 基准测试（python algo_lib.py bench [名称 ...]）
+# ============================================================
+
+def _timeit(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """返回 fn 多次运行中的最短耗时（秒）。"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak_bytes(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """用 tracemalloc 测量 build() 的峰值分配字节数，返回 (结果, 字节数)。"""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        obj = build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return obj, peak
+
+
+def _bench_csr(n: int = 200_000, m: int = 1_000_000) -> None:
+    rnd = random.Random(1)
+    edges = [(rnd.randrange(n), rnd.randrange(n), rnd.randint(1, 100)) for _ in range(m)]
+
+    def build_dict(weighted: bool) -> Dict[int, List[Any]]:
+        g: Dict[int, List[Any]] = defaultdict(list)
+        for u, v, w in edges:
+            g[u].append((v, w) if weighted else v)
+        return g
+
+    g_dict, mem_dict = _peak_bytes(lambda: build_dict(True))
+    g_csr, mem_csr = _peak_bytes(lambda: CSRGraph.from_edges(n, edges))
+    print(f"graph n={n} m={m}")
+    print(f"  memory   dict {mem_dict / 2**20:8.1f} MiB   csr {mem_csr / 2**20:8.1f} MiB")
+    g_plain = build_dict(False)
+    g_csr_plain = CSRGraph(n, g_csr.offsets, g_csr.targets)
+    for name, fn, gd, gc in (
+        ("bfs", bfs_shortest_unweighted, g_plain, g_csr_plain),
+        ("dfs", dfs_reachable, g_plain, g_csr_plain),
+        ("dijkstra", dijkstra, g_dict, g_csr),
+    ):
+        td = _timeit(lambda: fn(gd, 0), repeat=1)
+        tc = _timeit(lambda: fn(gc, 0), repeat=1)
+        print(f"  {name:<8} dict {td:8.3f} s   csr {tc:8.3f} s")
+
+
+def _bench_p2p(side: int = 300) -> None:
+    g = _grid_graph(side, side)
+    s, t = (side // 4, side // 4), (3 * side // 4, 3 * side // 4)
+    h = lambda v: abs(v[0] - t[0]) + abs(v[1] - t[1])
+    print(f"grid {side}x{side}, {s} -> {t}")
+    for name, fn in (
+        ("dijkstra", lambda: astar(g, s, t)),
+        ("bidir", lambda: bidirectional_dijkstra(g, s, t, rg=g)),
+        ("astar", lambda: astar(g, s, t, h)),
+    ):
+        res = fn()
+        print(f"  {name:<8} dist {res.dist}  settled {res.settled:>8}  {_timeit(fn, repeat=1):.3f} s")
+
+
+def _bench_alt(side: int = 200, k: int = 8, queries: int = 200) -> None:
+    rnd = random.Random(3)
+    n = side * side
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            for dr, dc in ((1, 0), (0, 1)):
+                if r + dr < side and c + dc < side:
+                    w = rnd.randint(1, 10)
+                    edges.append((r * side + c, (r + dr) * side + c + dc, w))
+                    edges.append(((r + dr) * side + c + dc, r * side + c, w))
+    g = CSRGraph.from_edges(n, edges)
+    t_build = _timeit(lambda: ALTIndex.build(g, k=k), repeat=1)
+    idx = ALTIndex.build(g, k=k)
+    pairs = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(queries)]
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "bench.alt")
+        idx.save(fn)
+        t_load = _timeit(lambda: ALTIndex.load(fn).close())
+        loaded = ALTIndex.load(fn)
+        settled_d = sum(astar(g, s, t).settled for s, t in pairs)
+        settled_a = sum(loaded.query(s, t).settled for s, t in pairs)
+        t_d = _timeit(lambda: [dijkstra_path(g, s, t) for s, t in pairs], repeat=1)
+        t_a = _timeit(lambda: [loaded.query(s, t) for s, t in pairs], repeat=1)
+        loaded.close()
+    print(f"grid {side}x{side} random weights, k={k} landmarks, {queries} queries")
+    print(f"  build {t_build:.2f} s   load(mmap) {t_load * 1e3:.2f} ms")
+    print(f"  dijkstra {t_d / queries * 1e3:8.2f} ms/query  settled {settled_d // queries:>7}")
+    print(f"  alt      {t_a / queries * 1e3:8.2f} ms/query  settled {settled_a // queries:>7}")
+
+
+def _bench_bellman_ford(n: int = 20_000, m: int = 100_000) -> None:
+    rnd = random.Random(5)
+    # 随机 DAG 式的正向边 + 少量负权，保证无负环
+    edges = []
+    for _ in range(m):
+        a, b = sorted(rnd.sample(range(n), 2))
+        edges.append((a, b, rnd.randint(-5, 50)))
+    print(f"n={n} m={m}")
+    print(f"  bellman_ford     {_timeit(lambda: bellman_ford(n, edges, 0), repeat=1):8.3f} s")
+    print(f"  spfa             {_timeit(lambda: spfa(n, edges, 0), repeat=1):8.3f} s")
+    if np is not None:
+        u, v, w = (np.array(x) for x in zip(*edges))
+        print(f"  bellman_ford_np  {_timeit(lambda: bellman_ford_np(n, u, v, w, 0), repeat=1):8.3f} s")
+
+
+def _bench_dsu(n: int = 1_000_000, m: int = 2_000_000) -> None:
+    rnd = random.Random(7)
+    pairs = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(m)]
+
+    def run_list() -> None:
+        d = DSU(n)
+        for a, b in pairs:
+            d.union(a, b)
+
+    def run_array() -> None:
+        ArrayDSU(n).union_many(pairs)
+
+    _, mem_list = _peak_bytes(lambda: DSU(n))
+    _, mem_arr = _peak_bytes(lambda: ArrayDSU(n))
+    t_list, t_arr = _timeit(run_list, repeat=1), _timeit(run_array, repeat=1)
+    print(f"n={n} unions={m}")
+    print(f"  DSU       {t_list:6.2f} s  {m / t_list / 1e6:5.2f} M unions/s  {mem_list / 2**20:6.1f} MiB")
+    print(f"  ArrayDSU  {t_arr:6.2f} s  {m / t_arr / 1e6:5.2f} M unions/s  {mem_arr / 2**20:6.1f} MiB")
+
+
+def _bench_mst(n: int = 200_000, m: int = 2_000_000) -> None:
+    rnd = random.Random(13)
+    edges = [(rnd.randint(1, 10**6), rnd.randrange(n), rnd.randrange(n)) for _ in range(m)]
+    print(f"n={n} m={m}")
+    print(f"  kruskal_mst        {_timeit(lambda: kruskal_mst(n, edges), repeat=1):7.2f} s")
+    print(f"  kruskal_msf        {_timeit(lambda: kruskal_msf(n, edges), repeat=1):7.2f} s")
+    if np is not None:
+        w, u, v = (np.array(x) for x in zip(*edges))
+        print(f"  filter_kruskal_np  {_timeit(lambda: filter_kruskal_np(n, u, v, w), repeat=1):7.2f} s")
+        print(f"  boruvka_np         {_timeit(lambda: boruvka_np(n, u, v, w), repeat=1):7.2f} s")
+
+
+def _bench_trie(count: int = 300_000) -> None:
+    import string
+
+    rnd = random.Random(17)
+    words = ["".join(rnd.choices(string.ascii_lowercase[:12], k=rnd.randint(4, 12))) for _ in range(count)]
+
+    def build_trie() -> Trie:
+        t = Trie()
+        for w in words:
+            t.insert(w)
+        return t
+
+    _, mem_trie = _peak_bytes(build_trie)
+    pt, mem_pt = _peak_bytes(lambda: PackedTrie.build(words))
+    prefixes = [w[:3] for w in words[:10_000]]
+    print(f"{count} words")
+    print(f"  Trie        build peak {mem_trie / 2**20:7.1f} MiB")
+    print(f"  PackedTrie  build peak {mem_pt / 2**20:7.1f} MiB  stored {pt.nbytes() / 2**20:.1f} MiB")
+    print(f"  complete(limit=10) x{len(prefixes)}: {_timeit(lambda: [pt.complete(p, 10) for p in prefixes], 1):.3f} s")
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "bench.trie")
+        pt.save(fn)
+        print(f"  load(mmap) {_timeit(lambda: PackedTrie.load(fn).close()) * 1e3:.2f} ms")
+
+
+def _bench_aho_corasick(n_patterns: int = 2_000, text_len: int = 200_000) -> None:
+    import string
+
+    rnd = random.Random(19)
+    alphabet = string.ascii_lowercase
+    patterns = list({"".join(rnd.choices(alphabet, k=rnd.randint(4, 8))) for _ in range(n_patterns)})
+    text = "".join(rnd.choices(alphabet, k=text_len))
+    t_build = _timeit(lambda: AhoCorasick(patterns), repeat=1)
+    ac = AhoCorasick(patterns)
+    t_ac = _timeit(lambda: ac.find_all(text), repeat=1)
+    sample = patterns[:100]
+    t_kmp = _timeit(lambda: [kmp_search(text, p) for p in sample], repeat=1) * len(patterns) / len(sample)
+    print(f"{len(patterns)} patterns, text {text_len} chars, {len(ac.find_all(text))} matches")
+    print(f"  aho-corasick  build {t_build:.3f} s  scan {t_ac:.3f} s")
+    print(f"  kmp_search x{len(patterns)} (extrapolated from {len(sample)})  {t_kmp:.2f} s")
+
+
+def _bench_segtree(n: int = 1_000_000, ops: int = 200_000) -> None:
+    rnd = random.Random(29)
+    a = [rnd.randint(0, 1000) for _ in range(n)]
+    ranges = []
+    for _ in range(ops):
+        l = rnd.randrange(n)
+        ranges.append((l, rnd.randrange(l, n)))
+    updates = [(rnd.randrange(n), rnd.randint(0, 1000)) for _ in range(ops)]
+    old = SegTreeSum(a)
+    new = SegTree(a, operator.add, 0)
+    print(f"n={n}, {ops} ops each")
+    print(f"  build    SegTreeSum {_timeit(lambda: SegTreeSum(a), 1):6.2f} s   SegTree {_timeit(lambda: SegTree(a, operator.add, 0), 1):6.2f} s")
+    t_old = _timeit(lambda: [old.update(p, v) for p, v in updates], 1)
+    t_new = _timeit(lambda: new.update_many(updates), 1)
+    print(f"  update   SegTreeSum {t_old:6.2f} s   SegTree.update_many {t_new:6.2f} s")
+    t_old = _timeit(lambda: [old.query(l, r) for l, r in ranges], 1)
+    t_new = _timeit(lambda: new.query_many(ranges), 1)
+    print(f"  query    SegTreeSum {t_old:6.2f} s   SegTree.query_many  {t_new:6.2f} s")
+    rt = RangeTree(a[:n // 10])
+    m = n // 10
+    lazy_ops = [(l % m, min(r % m + l % m, m - 1)) for l, r in ranges[:ops // 10]]
+    print(f"  RangeTree n={m}: {len(lazy_ops)} range_add + range_sum "
+          f"{_timeit(lambda: [(rt.range_add(l, r, 1), rt.range_sum(l, r)) for l, r in lazy_ops], 1):6.2f} s")
+
+
+def _bench_range_queries(n: int = 1_000_000, q: int = 1_000_000) -> None:
+    rnd = random.Random(31)
+    a = [rnd.randint(0, 10**9) for _ in range(n)]
+    ls = [rnd.randrange(n) for _ in range(q)]
+    rs = [min(n - 1, l + rnd.randint(0, 1000)) for l in ls]
+    print(f"n={n}, {q} window-min queries")
+    st_py = SparseTable(a, lambda x, y: x if x < y else y)
+    print(f"  SparseTable (python)  build {_timeit(lambda: SparseTable(a, min), 1):6.2f} s"
+          f"  query_many {_timeit(lambda: st_py.query_many(ls, rs), 1):6.2f} s")
+    if np is not None:
+        a_np, ls_np, rs_np = np.array(a), np.array(ls), np.array(rs)
+        st = SparseTable(a_np, "min")
+        print(f"  SparseTable (numpy)   build {_timeit(lambda: SparseTable(a_np, 'min'), 1):6.2f} s"
+              f"  query_many {_timeit(lambda: st.query_many(ls_np, rs_np), 1):6.2f} s")
+    seg = SegTree(a, min, math.inf)
+    sample = list(zip(ls, rs))[: q // 10]
+    print(f"  SegTree(min) query_many on {len(sample)} (for scale)  {_timeit(lambda: seg.query_many(sample), 1):6.2f} s")
+
+
+def _bench_prefix(n: int = 2_000_000, ops: int = 1_000_000) -> None:
+    rnd = random.Random(37)
+    a = [rnd.randint(0, 1000) for _ in range(n)]
+    triples = []
+    for _ in range(ops):
+        l = rnd.randrange(n)
+        triples.append((l, rnd.randrange(l, n), rnd.randint(-5, 5)))
+
+    def old_prefix() -> None:
+        ps = [0]
+        for x in a:
+            ps.append(ps[-1] + x)
+
+    print(f"n={n}, {ops} range-add ops")
+    print(f"  prefix   append-loop {_timeit(old_prefix, 1):6.3f} s   accumulate "
+          f"{_timeit(lambda: prefix_sum_getter(a), 1):6.3f} s")
+    if np is None:
+        return
+    a_np = np.array(a)
+    ls, rs, vals = (np.array(x) for x in zip(*triples))
+    print(f"  prefix   numpy cumsum {_timeit(lambda: prefix_sums_np(a_np), 1):6.3f} s")
+    diff = [0] * (n + 1)
+
+    def old_diff() -> None:
+        for l, r, val in triples:
+            diff[l] += val
+            if r + 1 < n:
+                diff[r + 1] -= val
+        cur = 0
+        for i in range(n):
+            cur += diff[i]
+
+    print(f"  diff     python loop {_timeit(old_diff, 1):6.3f} s   np.add.at "
+          f"{_timeit(lambda: difference_range_add_np(n, ls, rs, vals), 1):6.3f} s")
+
+
+def _bench_sort(n: int = 100_000) -> None:
+    rnd = random.Random(43)
+    dists: Dict[str, List[int]] = {
+        "random": [rnd.randrange(10**9) for _ in range(n)],
+        "sorted": list(range(n)),
+        "reversed": list(range(n, 0, -1)),
+        "all_equal": [7] * n,
+        "few_unique": [rnd.randrange(4) for _ in range(n)],
+        "organ_pipe": list(range(n // 2)) + list(range(n // 2, 0, -1)),
+        "sawtooth": [i % 1000 for i in range(n)],
+        "nearly_sorted": [i + rnd.randint(-5, 5) for i in range(n)],
+    }
+    algos: Dict[str, Callable[[List[int]], Any]] = {
+        "sorted": sorted,
+        "introsort": introsort,
+        "merge_bu": mergesort_bottom_up,
+        "radix": radix_sort,
+        "mergesort": mergesort,
+        "quicksort": quicksort_inplace,
+    }
+    print(f"n={n}  (seconds; '-' = RecursionError)")
+    print("  " + "dist".ljust(14) + "".join(name.rjust(11) for name in algos))
+    for dname, data in dists.items():
+        row = []
+        for fn in algos.values():
+            try:
+                row.append(f"{_timeit(lambda: fn(data[:]), 1):11.3f}")
+            except RecursionError:
+                row.append("-".rjust(11))
+        print("  " + dname.ljust(14) + "".join(row))
+
+
+def _bench_external_sort(n: int = 5_000_000, run_size: int = 1_000_000) -> None:
+    rnd = random.Random(47)
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.bin"), os.path.join(tmp, "out.bin")
+        with open(src, "wb") as f:
+            array("q", (rnd.getrandbits(62) for _ in range(n))).tofile(f)
+        for workers in sorted({1, os.cpu_count() or 1}):
+            st = external_sort_file(src, dst, run_size=run_size, workers=workers)
+            print(f"  n={n} runs={st.runs} workers={workers}: run {st.run_seconds:.2f} s  merge "
+                  f"{st.merge_seconds:.2f} s  {st.throughput / 1e6:.2f} M rec/s  "
+                  f"spilled {st.bytes_spilled / 2**20:.0f} MiB  peak rss {st.peak_rss / 2**20:.0f} MiB")
+
+
+def _bench_searchsorted(n: int = 1_000_000, q: int = 1_000_000) -> None:
+    rnd = random.Random(48)
+    col = sorted(rnd.randrange(10**12) for _ in range(n))
+    qs = [rnd.randrange(10**12) for _ in range(q)]
+    t_loop = _timeit(lambda: [bisect.bisect_left(col, x) for x in qs], 1)
+    t_many = _timeit(lambda: searchsorted_many(col, qs), 1)
+    ez = EytzingerIndex(col)
+    t_ez = _timeit(lambda: ez.lower_bound_many(qs), 1)
+    print(f"  n={n} q={q}: bisect loop {t_loop * 1e3:.0f} ms  searchsorted_many {t_many * 1e3:.0f} ms  "
+          f"eytzinger batch {t_ez * 1e3:.0f} ms  (numpy={'yes' if np is not None else 'no'})")
+    if np is not None:
+        col_np, qs_np = np.asarray(col), np.asarray(qs)
+        t_np = _timeit(lambda: np.searchsorted(col_np, qs_np), 3)
+        print(f"  ndarray in, ndarray out: np.searchsorted {t_np * 1e3:.1f} ms")
+
+
+def _bench_edit_distance(n: int = 2_000, big: int = 20_000, k: int = 64) -> None:
+    rnd = random.Random(49)
+
+    def mutate(s: str, edits: int) -> str:
+        t = list(s)
+        for _ in range(edits):
+            i = rnd.randrange(len(t))
+            op = rnd.randrange(3)
+            if op == 0:
+                t[i] = rnd.choice("abcd")
+            elif op == 1:
+                t.insert(i, rnd.choice("abcd"))
+            else:
+                del t[i]
+        return "".join(t)
+
+    a = "".join(rnd.choice("abcd") for _ in range(n))
+    b = mutate(a, k // 2)
+    for name, fn in (("full dp", edit_distance), ("two_row", edit_distance_two_row),
+                     ("myers", myers_distance), ("banded k=" + str(k), lambda x, y: edit_distance_banded(x, y, k)),
+                     ("hirschberg", lambda x, y: hirschberg_alignment(x, y)[0])):
+        print(f"  n={n} {name:>12}: {_timeit(lambda: fn(a, b), 1) * 1e3:8.1f} ms  d={fn(a, b)}")
+    a = "".join(rnd.choice("abcd") for _ in range(big))
+    b = mutate(a, k // 2)
+    print(f"  n={big} {'myers':>12}: {_timeit(lambda: myers_distance(a, b), 1) * 1e3:8.1f} ms  "
+          f"peak {_peak_bytes(lambda: myers_distance(a, b))[1] / 2**10:.0f} KiB")
+    print(f"  n={big} {'banded k=' + str(k):>12}: {_timeit(lambda: edit_distance_banded(a, b, k), 1) * 1e3:8.1f} ms  "
+          f"peak {_peak_bytes(lambda: edit_distance_banded(a, b, k))[1] / 2**10:.0f} KiB")
+
+
+def _bench_similarity_join(n: int = 5_000, k: int = 2, brute_n: int = 600) -> None:
+    rnd = random.Random(50)
+    bases = ["".join(rnd.choice("abcdefghij") for _ in range(rnd.randrange(15, 40))) for _ in range(n // 4)]
+    texts = []
+    for _ in range(n):
+        t = list(rnd.choice(bases))
+        for _ in range(rnd.randrange(4)):
+            t[rnd.randrange(len(t))] = rnd.choice("abcdefghij")
+        texts.append("".join(t))
+    sub = texts[:brute_n]
+    t_brute = _timeit(lambda: [(i, j) for i in range(len(sub)) for j in range(i + 1, len(sub))
+                               if edit_distance_banded(sub[i], sub[j], k) >= 0], 1)
+    print(f"  brute (banded) n={brute_n}: {t_brute * 1e3:.0f} ms  -> est. n={n}: {t_brute * (n / brute_n) ** 2:.1f} s")
+    for q in (2, 3, 4):
+        for workers in sorted({1, os.cpu_count() or 1}):
+            pairs: List[Any] = []
+            t = _timeit(lambda: pairs.append(similarity_join(texts, k, q=q, workers=workers)), 1)
+            print(f"  qgram q={q} n={n} k={k} workers={workers}: {t * 1e3:.0f} ms  pairs={len(pairs[-1])}")
+    sub = texts[:brute_n * 2]
+    t = _timeit(lambda: similarity_join(sub, k, method="bktree"), 1)
+    print(f"  bktree n={len(sub)} k={k}: {t * 1e3:.0f} ms  (长串 + 小字母表时三角不等式剪枝很弱)")
+
+
+def _bench_knapsack(cap: int = 1_000_000, n: int = 100, n_py: int = 5) -> None:
+    rnd = random.Random(51)
+    ws = [rnd.randrange(1, cap // 10) for _ in range(n)]
+    vs = [rnd.randrange(1, 10**6) for _ in range(n)]
+    t_py = _timeit(lambda: knapsack_01(ws[:n_py], vs[:n_py], cap), 1)
+    print(f"  cap={cap} 0/1 python loop: {t_py / n_py * 1e3:.0f} ms/item  -> est. n={n}: {t_py / n_py * n:.1f} s")
+    t_ss = _timeit(lambda: subset_sums_bitset(ws, cap), 1)
+    print(f"  cap={cap} subset_sums_bitset n={n}: {t_ss * 1e3:.0f} ms")
+    if np is None:
+        print("  (numpy 未安装，跳过向量化版本)")
+        return
+    for name, fn in (("0/1 numpy", lambda: knapsack_01_np(ws, vs, cap)),
+                     ("0/1 numpy + items", lambda: knapsack_01_np(ws, vs, cap, return_items=True)),
+                     ("unbounded numpy", lambda: knapsack_unbounded_np(ws, vs, cap)),
+                     ("bounded numpy (cnt=5)", lambda: knapsack_bounded_np(ws, vs, [5] * n, cap))):
+        print(f"  cap={cap} {name} n={n}: {_timeit(fn, 1) * 1e3:.0f} ms")
+
+
+def _bench_suffix(n: int = 1_000_000, q: int = 2_000) -> None:
+    rnd = random.Random(52)
+    words = ["".join(rnd.choice("abcdefghijklmnop") for _ in range(rnd.randrange(3, 9))) for _ in range(5000)]
+    text = " ".join(rnd.choice(words) for _ in range(n // 6))[:n]
+    pats = [rnd.choice(words) for _ in range(q)]
+    t_sa = _timeit(lambda: suffix_array(text), 1)
+    idx = SuffixIndex(text, suffix_array(text), array("i"))
+    t_lcp = _timeit(lambda: lcp_kasai(text, idx.sa), 1)
+    t_sam = _timeit(lambda: SuffixAutomaton(text[:n // 10]), 1)
+    print(f"  n={len(text)}: suffix_array {t_sa:.2f} s  lcp_kasai {t_lcp:.2f} s  "
+          f"SAM(n/10) {t_sam:.2f} s  (numpy={'yes' if np is not None else 'no'})")
+    t_idx = _timeit(lambda: [idx.count(p) for p in pats], 1)
+    t_scan = _timeit(lambda: [text.count(p) for p in pats[:q // 10]], 1) * 10
+    print(f"  {q} 个模式计数: SuffixIndex {t_idx * 1e3:.0f} ms  str.count 全文扫描 {t_scan * 1e3:.0f} ms")
+
+
+def _bench_rolling_hash(n: int = 2_000_000, q: int = 200_000) -> None:
+    rnd = random.Random(53)
+    text = "".join(rnd.choice("abcdefgh") for _ in range(n))
+    t_old = _timeit(lambda: rolling_hash_getter(text), 1)
+    t_new = _timeit(lambda: RollingHash(text), 1)
+    print(f"  n={n} 预处理: rolling_hash_getter {t_old * 1e3:.0f} ms  RollingHash {t_new * 1e3:.0f} ms "
+          f"(numpy={'yes' if np is not None else 'no'})")
+    rh = RollingHash(text)
+    ranges = [(l, l + rnd.randrange(1, 100)) for l in (rnd.randrange(n - 100) for _ in range(q))]
+    t_loop = _timeit(lambda: [rh.get(l, r) for l, r in ranges], 1)
+    t_many = _timeit(lambda: rh.get_many(ranges), 1)
+    print(f"  {q} 次取哈希: get 循环 {t_loop * 1e3:.0f} ms  get_many {t_many * 1e3:.0f} ms")
+    pats = list({text[i:i + rnd.randrange(6, 12)] for i in (rnd.randrange(n - 12) for _ in range(5000))})
+    t_rk = _timeit(lambda: rabin_karp_multi(text, pats, rh), 1)
+    t_find = _timeit(lambda: [text.count(p) for p in pats[:len(pats) // 10]], 1) * 10
+    print(f"  {len(pats)} 个模式: rabin_karp_multi {t_rk * 1e3:.0f} ms  str.count 逐个（估算） {t_find * 1e3:.0f} ms")
+    t_dup = _timeit(lambda: longest_duplicate_substring(text[:n // 4], RollingHash(text[:n // 4])), 1)
+    print(f"  longest_duplicate_substring n={n // 4}: {t_dup * 1e3:.0f} ms")
+
+
+def _bench_stream_kmp(mb: int = 8, chunk: int = 1 << 16) -> None:
+    rnd = random.Random(54)
+    words = [bytes(rnd.choice(b"<>/abcdefghij ") for _ in range(rnd.randrange(3, 12))) for _ in range(2000)]
+    data = b" ".join(rnd.choice(words) for _ in range(mb * (1 << 20) // 8))
+    chunks = [memoryview(data)[i:i + chunk] for i in range(0, len(data), chunk)]
+    for pat in (b"</html>", words[0] + b" " + words[1], b"a"):
+        t_mv = _timeit(lambda: sum(1 for _ in KMPMatcher(pat).finditer(chunks)), 1)
+        raw = [bytes(c) for c in chunks]
+        t_b = _timeit(lambda: sum(1 for _ in KMPMatcher(pat).finditer(raw)), 1)
+        hits = sum(1 for _ in KMPMatcher(pat).finditer(raw))
+        print(f"  {len(data) / 2**20:.0f} MiB / {chunk // 1024} KiB 块, 模式 {pat[:12]!r}: "
+              f"memoryview {t_mv * 1e3:.0f} ms  bytes(带 find 跳跃) {t_b * 1e3:.0f} ms  命中 {hits}")
+
+
+def _bench_sieve(n: int = 10**7, big: int = 10**9) -> None:
+    t_list = _timeit(lambda: sieve(n), 1)
+    t_odd = _timeit(lambda: sieve_odd(n), 1)
+    mem_list = _peak_bytes(lambda: sieve(n))[1]
+    mem_odd = _peak_bytes(lambda: sieve_odd(n))[1]
+    print(f"  n={n:.0e}: sieve {t_list * 1e3:.0f} ms / {mem_list / 2**20:.0f} MiB  "
+          f"sieve_odd {t_odd * 1e3:.0f} ms / {mem_odd / 2**20:.0f} MiB")
+    if np is not None:
+        print(f"  n={n:.0e}: sieve_np {_timeit(lambda: sieve_np(n), 1) * 1e3:.0f} ms")
+    print(f"  n={n:.0e}: linear_sieve {_timeit(lambda: linear_sieve(n // 10), 1) * 10e3:.0f} ms (按 n/10 估算)"
+          + (f"  spf_table_np {_timeit(lambda: spf_table_np(n), 1) * 1e3:.0f} ms" if np is not None else ""))
+    t0 = time.perf_counter()
+    cnt = count_primes(1, big)
+    print(f"  count_primes(1, {big:.0e}) = {cnt}: {time.perf_counter() - t0:.1f} s")
+
+
+def _bench_number_theory(n: int = 1_000_000, mod: int = 10**9 + 7) -> None:
+    rnd = random.Random(55)
+    bases = [rnd.randrange(mod) for _ in range(n)]
+    e = mod - 2  # 批量求逆元
+    t_loop = _timeit(lambda: [mod_pow(b, e, mod) for b in bases[:n // 10]], 1) * 10
+    t_pow = _timeit(lambda: [pow(b, e, mod) for b in bases], 1)
+    print(f"  {n} 个底数 ^ (p-2) mod p: mod_pow 循环（估算） {t_loop:.2f} s  内置 pow 循环 {t_pow:.2f} s", end="")
+    if np is not None:
+        arr = np.asarray(bases, dtype=np.int64)
+        print(f"  mod_pow_np {_timeit(lambda: mod_pow_np(arr, e, mod), 1):.2f} s")
+    else:
+        print()
+    mc = ModComb(n, mod)
+    qs = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(n)]
+    qs = [(max(a, b), min(a, b)) for a, b in qs]
+    t_nc = _timeit(lambda: [mc.ncr(a, b) for a, b in qs], 1)
+    t_ncm = _timeit(lambda: mc.ncr_many([a for a, _ in qs], [b for _, b in qs]), 1)
+    print(f"  ModComb({n}) 构建 {_timeit(lambda: ModComb(n, mod), 1):.2f} s  {n} 次 ncr {t_nc:.2f} s  ncr_many {t_ncm:.2f} s")
+    semis = [(1_000_000_007 * 998244353), (2**31 - 1) * (2**61 - 1), 4611686014132420609]
+    for x in semis:
+        print(f"  factorize({x}) = {factorize(x)}: {_timeit(lambda: factorize(x), 1) * 1e3:.1f} ms")
+
+
+_BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "csr": _bench_csr,
+    "p2p": _bench_p2p,
+    "alt": _bench_alt,
+    "bellman_ford": _bench_bellman_ford,
+    "dsu": _bench_dsu,
+    "mst": _bench_mst,
+    "trie": _bench_trie,
+    "aho_corasick": _bench_aho_corasick,
+    "segtree": _bench_segtree,
+    "range_queries": _bench_range_queries,
+    "prefix": _bench_prefix,
+    "sort": _bench_sort,
+    "external_sort": _bench_external_sort,
+    "searchsorted": _bench_searchsorted,
+    "edit_distance": _bench_edit_distance,
+    "similarity_join": _bench_similarity_join,
+    "knapsack": _bench_knapsack,
+    "suffix": _bench_suffix,
+    "rolling_hash": _bench_rolling_hash,
+    "stream_kmp": _bench_stream_kmp,
+    "sieve": _bench_sieve,
+    "number_theory": _bench_number_theory,
+}
+
+
+def _run_benchmarks(names: Sequence[str]) -> None:
+    for name in names or list(_BENCHMARKS):
+        if name not in _BENCHMARKS:
+            raise SystemExit(f"unknown benchmark {name!r}; choose from {sorted(_BENCHMARKS)}")
+        print(f"== {name} ==")
+        _BENCHMARKS[name]()
+
+
 if __name__ == "__main__":
-    _run_tests()
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _run_benchmarks(sys.argv[2:])
+    else:
+        _run_tests()
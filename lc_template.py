@@ -14,6 +14,7 @@ Notes:
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
 from collections import deque, defaultdict, Counter
 from typing import (
@@ -31,10 +32,16 @@ from typing import (
     Tuple,
     TypeVar,
 )
+from itertools import accumulate
 import bisect
 import heapq
 import math
 
+try:  # optional: vectorized builds when the input is already a numpy array
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 T = TypeVar("T")
 
 # ----------------------------
@@ -50,6 +57,17 @@ DIR8: Tuple[Tuple[int, int], ...] = (
     (1, 1), (1, -1), (-1, 1), (-1, -1),
 )
 
+
+def manhattan(r1: int, c1: int, r2: int, c2: int) -> int:
+    """Admissible grid heuristic for DIR4 moves."""
+    return abs(r1 - r2) + abs(c1 - c2)
+
+
+def chebyshev(r1: int, c1: int, r2: int, c2: int) -> int:
+    """Admissible grid heuristic for DIR8 moves (diagonal costs 1)."""
+    return max(abs(r1 - r2), abs(c1 - c2))
+
+
 def dbg(*args: Any) -> None:
     """Debug print (safe to leave in code; controlled by DEBUG)."""
     if DEBUG:
@@ -106,10 +124,37 @@ class Fenwick:
     - add(i, delta): O(log n)
     - sum(i): sum of [0..i], O(log n)
     - range_sum(l,r): sum of [l..r], O(log n)
+    - from_array(a): O(n) build; lower_bound(target): O(log n) order statistic
+    typecode (e.g. "q", "d") stores the tree in array.array: 8 bytes/slot instead of a list of ints.
     """
-    def __init__(self, n: int):
+    def __init__(self, n: int, typecode: Optional[str] = None):
         self.n = n
-        self.bit = [0] * (n + 1)
+        self.bit = [0] * (n + 1) if typecode is None else array(typecode, [0]) * (n + 1)
+
+    @classmethod
+    def from_array(cls, a: Sequence[int], typecode: Optional[str] = None) -> "Fenwick":
+        """O(n) build: bit[i] = ps[i] - ps[i - lowbit(i)] (1-based). numpy input is built vectorized."""
+        n = len(a)
+        fw = cls(0, typecode)
+        fw.n = n
+        if np is not None and isinstance(a, np.ndarray):
+            ps = np.zeros(n + 1, dtype=np.dtype(typecode) if typecode else a.dtype)
+            np.cumsum(a, out=ps[1:])
+            i = np.arange(1, n + 1)
+            bit = np.zeros_like(ps)
+            bit[1:] = ps[i] - ps[i - (i & -i)]
+            if typecode is None:
+                fw.bit = bit.tolist()
+            else:
+                fw.bit = array(typecode)
+                fw.bit.frombytes(bit.tobytes())
+            return fw
+        ps = [0, *accumulate(a)]
+        bit = [0] * (n + 1)
+        for i in range(1, n + 1):
+            bit[i] = ps[i] - ps[i - (i & -i)]
+        fw.bit = bit if typecode is None else array(typecode, bit)
+        return fw
 
     def add(self, i: int, delta: int) -> None:
         i += 1
@@ -130,6 +175,102 @@ class Fenwick:
             return 0
         return self.sum(r) - (self.sum(l - 1) if l > 0 else 0)
 
+    def lower_bound(self, target: int) -> int:
+        """Smallest i with sum(i) >= target (needs all values >= 0); n if none. Binary lifting."""
+        pos, rem = 0, target
+        step = 1 << self.n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.bit[nxt] < rem:
+                pos = nxt
+                rem -= self.bit[nxt]
+            step >>= 1
+        return pos
+
+
+class RangeFenwick:
+    """
+    Range add + range sum (dual BIT).
+    prefix(i) = b1.sum(i) * (i+1) - b2.sum(i), where b1 holds the difference array d
+    and b2 holds j * d[j]; both ops O(log n), closed intervals [l, r].
+    """
+    def __init__(self, n: int, typecode: Optional[str] = None):
+        self.n = n
+        self.b1 = Fenwick(n, typecode)
+        self.b2 = Fenwick(n, typecode)
+
+    @classmethod
+    def from_array(cls, a: Sequence[int], typecode: Optional[str] = None) -> "RangeFenwick":
+        """O(n) build: initial values go into b2 as -a (so prefix(i) = sum a[0..i]).
+        Unsigned numpy input is cast to a signed dtype first; negating it in place would wrap."""
+        rf = cls(0, typecode)
+        rf.n = len(a)
+        rf.b1 = Fenwick(rf.n, typecode)
+        if np is not None and isinstance(a, np.ndarray):
+            if typecode is not None:
+                a = a.astype(np.dtype(typecode))
+            elif a.dtype.kind in "bu":
+                a = a.astype(np.int64)
+            neg: Sequence[int] = -a
+        else:
+            neg = [-x for x in a]
+        rf.b2 = Fenwick.from_array(neg, typecode)
+        return rf
+
+    def range_add(self, l: int, r: int, delta: int) -> None:
+        self.b1.add(l, delta)
+        self.b1.add(r + 1, -delta)
+        self.b2.add(l, delta * l)
+        self.b2.add(r + 1, -delta * (r + 1))
+
+    def prefix(self, i: int) -> int:
+        """sum of [0..i]."""
+        if i < 0:
+            return 0
+        return self.b1.sum(i) * (i + 1) - self.b2.sum(i)
+
+    def range_sum(self, l: int, r: int) -> int:
+        if l > r:
+            return 0
+        return self.prefix(r) - self.prefix(l - 1)
+
+
+class Fenwick2D:
+    """2D BIT for grid counting: point add, rectangle sum, O(log R * log C)."""
+    def __init__(self, R: int, C: int):
+        self.R, self.C = R, C
+        self.bit = [[0] * (C + 1) for _ in range(R + 1)]
+
+    def add(self, r: int, c: int, delta: int) -> None:
+        i = r + 1
+        while i <= self.R:
+            row = self.bit[i]
+            j = c + 1
+            while j <= self.C:
+                row[j] += delta
+                j += j & -j
+            i += i & -i
+
+    def sum(self, r: int, c: int) -> int:
+        """sum of rectangle [0..r] x [0..c]."""
+        s = 0
+        i = r + 1
+        while i > 0:
+            row = self.bit[i]
+            j = c + 1
+            while j > 0:
+                s += row[j]
+                j -= j & -j
+            i -= i & -i
+        return s
+
+    def rect_sum(self, r1: int, c1: int, r2: int, c2: int) -> int:
+        """sum of rectangle [r1..r2] x [c1..c2]."""
+        if r1 > r2 or c1 > c2:
+            return 0
+        return (self.sum(r2, c2) - self.sum(r1 - 1, c2)
+                - self.sum(r2, c1 - 1) + self.sum(r1 - 1, c1 - 1))
+
 
 class SegTreeSum:
     """Segment Tree: range sum + point update."""
@@ -176,6 +317,45 @@ class SegTreeSum:
         return go(1, 0, self.n - 1)
 
 
+class SegTree:
+    """
+    Iterative segment tree over a monoid (op, e); size 2*pow2, no recursion.
+    - set(pos, val) / query(l, r) on closed [l, r]: O(log n)
+    e.g. SegTree(a, operator.add, 0), SegTree(a, min, INF)
+    """
+    def __init__(self, a: Sequence[Any], op: Callable[[Any, Any], Any], e: Any):
+        self.n = len(a)
+        self.op, self.e = op, e
+        self.size = 1 << max(self.n - 1, 0).bit_length()
+        self.d = [e] * (2 * self.size)
+        self.d[self.size:self.size + self.n] = a
+        for i in range(self.size - 1, 0, -1):
+            self.d[i] = op(self.d[2 * i], self.d[2 * i + 1])
+
+    def set(self, pos: int, val: Any) -> None:
+        i = pos + self.size
+        self.d[i] = val
+        i >>= 1
+        while i:
+            self.d[i] = self.op(self.d[2 * i], self.d[2 * i + 1])
+            i >>= 1
+
+    def query(self, l: int, r: int) -> Any:
+        sml = smr = self.e
+        l += self.size
+        r += self.size + 1
+        while l < r:
+            if l & 1:
+                sml = self.op(sml, self.d[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                smr = self.op(self.d[r], smr)
+            l >>= 1
+            r >>= 1
+        return self.op(sml, smr)
+
+
 class TrieNode:
     __slots__ = ("ch", "end")
     def __init__(self):
@@ -262,6 +442,132 @@ def dijkstra(
     return dist
 
 
+def astar_grid(
+    grid: List[List[int]],
+    sr: int, sc: int, tr: int, tc: int,
+    passable: Callable[[int, int], bool],
+    dirs: Tuple[Tuple[int, int], ...] = DIR4,
+    h: Optional[Callable[[int, int, int, int], int]] = None,
+) -> Tuple[int, int]:
+    """
+    Grid A* (unit step cost). h defaults to manhattan for DIR4, chebyshev otherwise.
+    returns (steps, expanded); steps = -1 if unreachable.
+    """
+    R, C = len(grid), len(grid[0]) if grid else 0
+    if not (0 <= sr < R and 0 <= sc < C and 0 <= tr < R and 0 <= tc < C):
+        return -1, 0
+    if not (passable(sr, sc) and passable(tr, tc)):
+        return -1, 0
+    if h is None:
+        h = manhattan if dirs is DIR4 else chebyshev
+    g = [[INF] * C for _ in range(R)]
+    g[sr][sc] = 0
+    # ties on f: prefer larger g (closer to target)
+    pq: List[Tuple[int, int, int, int]] = [(h(sr, sc, tr, tc), 0, sr, sc)]
+    expanded = 0
+    while pq:
+        _, nd, r, c = heapq.heappop(pq)
+        d = -nd
+        if d != g[r][c]:
+            continue
+        expanded += 1
+        if r == tr and c == tc:
+            return d, expanded
+        for dr, dc in dirs:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < R and 0 <= nc < C and d + 1 < g[nr][nc] and passable(nr, nc):
+                g[nr][nc] = d + 1
+                heapq.heappush(pq, (d + 1 + h(nr, nc, tr, tc), -(d + 1), nr, nc))
+    return -1, expanded
+
+
+def bfs_grid_bidirectional(
+    grid: List[List[int]],
+    sr: int, sc: int, tr: int, tc: int,
+    passable: Callable[[int, int], bool],
+    dirs: Tuple[Tuple[int, int], ...] = DIR4,
+) -> Tuple[int, int]:
+    """
+    Bidirectional grid BFS: expand the smaller frontier one full level at a time.
+    returns (steps, expanded); steps = -1 if unreachable.
+    """
+    R, C = len(grid), len(grid[0]) if grid else 0
+    if not (0 <= sr < R and 0 <= sc < C and 0 <= tr < R and 0 <= tc < C):
+        return -1, 0
+    if not (passable(sr, sc) and passable(tr, tc)):
+        return -1, 0
+    if (sr, sc) == (tr, tc):
+        return 0, 0
+    dist = ({(sr, sc): 0}, {(tr, tc): 0})
+    front = [[(sr, sc)], [(tr, tc)]]
+    expanded = 0
+    while front[0] and front[1]:
+        side = 0 if len(front[0]) <= len(front[1]) else 1
+        mine, other = dist[side], dist[1 - side]
+        best = -1
+        nxt: List[Tuple[int, int]] = []
+        for r, c in front[side]:
+            expanded += 1
+            for dr, dc in dirs:
+                p = (r + dr, c + dc)
+                if p in other:
+                    cand = mine[(r, c)] + 1 + other[p]
+                    if best == -1 or cand < best:
+                        best = cand
+                elif p not in mine and 0 <= p[0] < R and 0 <= p[1] < C and passable(*p):
+                    mine[p] = mine[(r, c)] + 1
+                    nxt.append(p)
+        if best != -1:
+            return best, expanded
+        front[side] = nxt
+    return -1, expanded
+
+
+def dijkstra_multi(
+    g: List[List[Tuple[int, int]]],
+    sources: Iterable[int],
+    targets: Optional[Iterable[int]] = None,
+) -> Tuple[List[int], List[int]]:
+    """
+    Multi-source Dijkstra on an indexed graph g[u] = [(v,w), ...] (nodes 0..n-1).
+    Stops once every node in targets is settled (if given).
+    Returns (dist, parent) lists; INF / -1 = unreached / source.
+    """
+    n = len(g)
+    dist = [INF] * n
+    parent = [-1] * n
+    pq: List[Tuple[int, int]] = []
+    for s in sources:
+        dist[s] = 0
+        pq.append((0, s))
+    heapq.heapify(pq)
+    remaining = set(targets) if targets is not None else None
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for v, w in g[u]:
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, parent
+
+
+def build_path(parent: Sequence[int], t: int) -> List[int]:
+    """Walk the parent array back from t (caller checks reachability)."""
+    path = [t]
+    while parent[path[-1]] != -1:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
 def topo_sort(n: int, edges: List[Tuple[int, int]]) -> Optional[List[int]]:
     """Kahn topo sort. Returns order or None if has cycle."""
     g: DefaultDict[int, List[int]] = defaultdict(list)
@@ -381,6 +687,16 @@ class Solution:
         """Return first index i with nums[i] >= x."""
         return bisect.bisect_left(nums, x)
 
+    def lowerBoundMany(self, nums: List[int], xs: List[int]) -> List[int]:
+        """Batched lowerBound: sort the queries once and sweep nums, O(n + q log q)."""
+        res = [0] * len(xs)
+        i = 0
+        for j in sorted(range(len(xs)), key=xs.__getitem__):
+            while i < len(nums) and nums[i] < xs[j]:
+                i += 1
+            res[j] = i
+        return res
+
     # ---- 图：无权 BFS (示例) ----
     def shortestPathBinaryMatrix(self, grid: List[List[int]]) -> int:
         """
@@ -419,6 +735,7 @@ def _self_test() -> None:
     # Solution.twoSum
     sol = Solution()
     assert sol.twoSum([2, 7, 11, 15], 9) == [0, 1]
+    assert sol.lowerBoundMany([1, 2, 4, 4, 7], [8, 4, 0, 5]) == [5, 2, 0, 4]
 
     # KMP
     assert kmp_search("abxabcabcaby", "abcaby") == 6
@@ -448,12 +765,59 @@ def _self_test() -> None:
     bit.add(3, 2)
     assert bit.range_sum(0, 3) == 7
     assert bit.range_sum(1, 2) == 0
+    vals = [3, 0, 2, 5, 1, 4]
+    for fb in (Fenwick.from_array(vals), Fenwick.from_array(vals, "q")):
+        assert [fb.sum(i) for i in range(6)] == list(accumulate(vals))
+        assert fb.lower_bound(1) == 0 and fb.lower_bound(4) == 2 and fb.lower_bound(15) == 5
+        assert fb.lower_bound(16) == 6
+    if np is not None:
+        fb = Fenwick.from_array(np.array(vals), "q")
+        assert fb.range_sum(2, 4) == 8 and isinstance(fb.bit, array)
+        for a_np, tc in ((np.array([1, 2], dtype=np.uint32), None), (np.array([1, 2], dtype=np.uint32), "q")):
+            rf_np = RangeFenwick.from_array(a_np, tc)
+            rf_np.range_add(0, 0, 3)
+            assert [rf_np.range_sum(i, i) for i in range(2)] == [4, 2] and rf_np.range_sum(0, 1) == 6
+    rf = RangeFenwick.from_array(vals)
+    rf.range_add(1, 3, 10)
+    rf.range_add(0, 5, -1)
+    expect = [2, 9, 11, 14, 0, 3]
+    assert [rf.range_sum(i, i) for i in range(6)] == expect
+    assert rf.range_sum(1, 4) == sum(expect[1:5]) and rf.range_sum(0, 5) == sum(expect)
+    f2 = Fenwick2D(3, 4)
+    f2.add(0, 0, 1)
+    f2.add(1, 2, 5)
+    f2.add(2, 3, 2)
+    assert f2.sum(2, 3) == 8 and f2.rect_sum(1, 1, 2, 3) == 7 and f2.rect_sum(0, 1, 0, 3) == 0
+
+    # Grid A* / bidirectional BFS
+    grid = [[0] * 20 for _ in range(20)]
+    for r in range(15):
+        grid[r][10] = 1
+    ok = lambda r, c: grid[r][c] == 0
+    base = bfs_grid_shortest(grid, 0, 0, ok)[0][19]
+    steps, expanded = astar_grid(grid, 0, 0, 0, 19, ok)
+    assert steps == base == 49 and expanded < 20 * 20 - 15
+    assert bfs_grid_bidirectional(grid, 0, 0, 0, 19, ok)[0] == base
+    assert astar_grid(grid, 0, 0, 19, 19, ok, DIR8)[0] == 24
+    assert bfs_grid_bidirectional(grid, 0, 0, 19, 19, ok, DIR8)[0] == 24
+    assert astar_grid(grid, 0, 0, 0, 10, ok) == (-1, 0)
+
+    # Dijkstra (multi-source / early exit / path)
+    g = [[(1, 1), (2, 4)], [(2, 2), (3, 5)], [(3, 1)], []]
+    dist, parent = dijkstra_multi(g, [0], targets=[3])
+    assert dist[3] == 4 and build_path(parent, 3) == [0, 1, 2, 3]
+    dist, parent = dijkstra_multi(g, [0, 2])
+    assert dist == [0, 1, 0, 1] and build_path(parent, 3) == [2, 3]
 
     # Segment tree
     st = SegTreeSum([1, 3, 5, 7, 9, 11])
     assert st.query(1, 3) == 15
     st.update(1, 10)
     assert st.query(1, 3) == 22
+    sg = SegTree([1, 3, 5, 7, 9, 11], min, INF)
+    assert sg.query(1, 3) == 3
+    sg.set(2, -1)
+    assert sg.query(0, 5) == -1 and sg.query(3, 5) == 7
 
     print("✅ lc_template self-test passed!")
 